@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.analytics.rollups import rebuild, refresh
+
+
+class Command(BaseCommand):
+    help = 'Fold events since the last watermark into the employer dashboard rollups'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true',
+                            help='Drop the rollups and recompute them from the whole history')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        events = rebuild() if options['full'] else refresh()
+        self.stdout.write(self.style.SUCCESS(
+            f'Folded {events} events into rollups in {time.perf_counter() - started:.2f}s'
+        ))
@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.db import models
+
+from apps.jobs.models import Job
+
+
+class RollupWatermark(models.Model):
+    """How far the incremental rollups have read the event tables."""
+    name = models.CharField(max_length=50, unique=True)
+    value = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.value}"
+
+
+class EmployerDailyStats(models.Model):
+    """Applications and saves received by an employer's postings on one day."""
+    employer = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='daily_stats')
+    day = models.DateField()
+    applications = models.PositiveIntegerField(default=0)
+    saves = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        # (employer, day) to tez indeks pod odczyt zakresu dni na dashboardzie
+        unique_together = ('employer', 'day')
+
+    def __str__(self):
+        return f"{self.employer_id} {self.day}: {self.applications}/{self.saves}"
+
+
+class JobStats(models.Model):
+    """Per-job rollup of application statuses; totals live on Job's counters."""
+    job = models.OneToOneField(Job, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    status_counts = models.JSONField(default=dict)
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.job_id}: {self.status_counts}"
@@ -0,0 +1,177 @@
+"""Incremental rollups behind the employer dashboard.
+
+Each refresh reads only the events newer than a stored watermark:
+applications and saves are added to per-employer daily counts, and jobs
+whose applications were created or changed status get their status
+breakdown recomputed. The watermark trails the clock by
+``ANALYTICS_ROLLUP_LAG`` seconds so rows from transactions still in flight
+are not skipped. Deleted applications and saves are only reflected after
+``rebuild()``; the dashboard's totals come from Job's live counters.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from apps.jobs.models import Job, JobApplication, SavedJob
+
+from .models import EmployerDailyStats, JobStats, RollupWatermark
+
+WATERMARK = 'employer-dashboard'
+EPOCH = datetime(2000, 1, 1, tzinfo=dt_timezone.utc)
+CHUNK_SIZE = 500
+
+
+def refresh(now=None):
+    """Folds events newer than the watermark into the rollups; returns the number of events read."""
+    lag = getattr(settings, 'ANALYTICS_ROLLUP_LAG', 5)
+    end = (now or timezone.now()) - timedelta(seconds=lag)
+    with transaction.atomic():
+        # Blokada wiersza znacznika - dwa rownolegle odswiezenia nie policza zdarzen podwojnie
+        RollupWatermark.objects.get_or_create(name=WATERMARK, defaults={'value': EPOCH})
+        mark = RollupWatermark.objects.select_for_update().get(name=WATERMARK)
+        start = mark.value
+        if end <= start:
+            return 0
+        events = _fold_daily(start, end) + _refresh_statuses(start, end)
+        mark.value = end
+        mark.save(update_fields=['value', 'updated_at'])
+    return events
+
+
+def rebuild(now=None):
+    """Drops the rollups and recomputes them from the full event history."""
+    with transaction.atomic():
+        EmployerDailyStats.objects.all().delete()
+        JobStats.objects.all().delete()
+        RollupWatermark.objects.filter(name=WATERMARK).delete()
+        return refresh(now)
+
+
+def _fold_daily(start, end):
+    deltas = defaultdict(lambda: [0, 0])
+    for column, (model, time_field) in enumerate([(JobApplication, 'applied_at'), (SavedJob, 'saved_at')]):
+        rows = (
+            model.objects
+            .filter(**{f'{time_field}__gt': start, f'{time_field}__lte': end})
+            .order_by()
+            .values(employer=F('job__posted_by'), day=TruncDate(time_field))
+            .annotate(count=Count('pk'))
+        )
+        for row in rows:
+            deltas[row['employer'], row['day']][column] += row['count']
+    if not deltas:
+        return 0
+
+    existing = {
+        (stats.employer_id, stats.day): stats
+        for stats in EmployerDailyStats.objects.filter(
+            employer_id__in={employer for employer, _ in deltas}, day__in={day for _, day in deltas},
+        )
+    }
+    created, updated = [], []
+    for (employer, day), (applications, saves) in deltas.items():
+        stats = existing.get((employer, day))
+        if stats is None:
+            created.append(EmployerDailyStats(employer_id=employer, day=day, applications=applications, saves=saves))
+        else:
+            stats.applications += applications
+            stats.saves += saves
+            updated.append(stats)
+    EmployerDailyStats.objects.bulk_create(created)
+    EmployerDailyStats.objects.bulk_update(updated, ['applications', 'saves'])
+    return sum(applications + saves for applications, saves in deltas.values())
+
+
+def _refresh_statuses(start, end):
+    dirty = list(
+        JobApplication.objects.filter(updated_at__gt=start, updated_at__lte=end)
+        .order_by().values_list('job_id', flat=True).distinct()
+    )
+    for offset in range(0, len(dirty), CHUNK_SIZE):
+        chunk = dirty[offset:offset + CHUNK_SIZE]
+        counts = defaultdict(dict)
+        rows = (
+            JobApplication.objects.filter(job_id__in=chunk)
+            .order_by().values('job_id', 'status').annotate(count=Count('pk'))
+        )
+        for row in rows:
+            counts[row['job_id']][row['status']] = row['count']
+        existing = set(JobStats.objects.filter(job_id__in=chunk).values_list('job_id', flat=True))
+        stats = [JobStats(job_id=job_id, status_counts=counts.get(job_id, {})) for job_id in chunk]
+        JobStats.objects.bulk_create([row for row in stats if row.job_id not in existing])
+        JobStats.objects.bulk_update([row for row in stats if row.job_id in existing], ['status_counts'])
+    return len(dirty)
+
+
+def employer_dashboard(employer, days):
+    """Dashboard payload for ``employer`` over the last ``days`` days, read from rollups only."""
+    today = timezone.localdate()
+    since = today - timedelta(days=days - 1)
+    jobs = list(
+        Job.objects.filter(posted_by=employer)
+        .select_related('stats')
+        .only('title', 'is_active', 'created_at', 'save_count', 'application_count', 'view_count',
+              'stats__status_counts')
+        .order_by('-created_at', '-pk')
+    )
+    daily = {
+        row['day']: row
+        for row in EmployerDailyStats.objects.filter(employer=employer, day__gte=since)
+        .values('day', 'applications', 'saves')
+    }
+    watermark = RollupWatermark.objects.filter(name=WATERMARK).values_list('value', flat=True).first()
+
+    statuses = defaultdict(int)
+    job_rows = []
+    for job in jobs:
+        status_counts = _status_counts(job)
+        for status, count in status_counts.items():
+            statuses[status] += count
+        job_rows.append({
+            'id': job.pk,
+            'title': job.title,
+            'is_active': job.is_active,
+            'views': job.view_count,
+            'saves': job.save_count,
+            'applications': job.application_count,
+            'conversion': _rate(job.application_count, job.view_count),
+            'status_breakdown': status_counts,
+        })
+    totals = {
+        'jobs': len(jobs),
+        'views': sum(job.view_count for job in jobs),
+        'saves': sum(job.save_count for job in jobs),
+        'applications': sum(job.application_count for job in jobs),
+    }
+    totals['conversion'] = _rate(totals['applications'], totals['views'])
+    return {
+        'totals': totals,
+        'status_breakdown': dict(statuses),
+        'daily': [
+            {
+                'date': day.isoformat(),
+                'applications': daily[day]['applications'] if day in daily else 0,
+                'saves': daily[day]['saves'] if day in daily else 0,
+            }
+            for day in (since + timedelta(days=offset) for offset in range(days))
+        ],
+        'jobs': job_rows,
+        'refreshed_until': watermark,
+    }
+
+
+def _status_counts(job):
+    try:
+        return job.stats.status_counts
+    except JobStats.DoesNotExist:
+        return {}
+
+
+def _rate(numerator, denominator):
+    # Konwersja wyswietlenie -> zgloszenie; bez wyswietlen nie ma z czego liczyc
+    return round(numerator / denominator, 4) if denominator else None
@@ -0,0 +1,9 @@
+from apps.tasks.queue import task
+
+from .rollups import refresh
+
+
+@task()
+def refresh_rollups():
+    """Folds new applications and saves into the employer dashboard rollups."""
+    return {'events': refresh()}
@@ -0,0 +1,92 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.jobs.models import Job, JobApplication, SavedJob
+
+from .models import EmployerDailyStats, JobStats
+from .rollups import refresh
+
+User = get_user_model()
+
+
+@override_settings(ANALYTICS_ROLLUP_LAG=0)
+class EmployerDashboardTest(TestCase):
+    def setUp(self):
+        self.employer = User.objects.create_user(
+            username='hr@example.com', email='hr@example.com', password='x', user_type='employer'
+        )
+        self.seekers = [
+            User.objects.create_user(username=f's{i}@example.com', email=f's{i}@example.com', password='x')
+            for i in range(3)
+        ]
+        self.jobs = [
+            Job.objects.create(
+                title=f'Job {i}', company='TechCorp', description='Great job.', requirements='Python',
+                job_type='full_time', location='Warsaw, Poland', posted_by=self.employer,
+            )
+            for i in range(2)
+        ]
+        for seeker in self.seekers:
+            JobApplication.objects.create(job=self.jobs[0], applicant=seeker, resume='resumes/cv.pdf')
+            SavedJob.objects.create(user=seeker, job=self.jobs[1])
+        # Dwa zgloszenia sprzed dwoch dni
+        two_days_ago = timezone.now() - timedelta(days=2)
+        JobApplication.objects.filter(applicant__in=self.seekers[:2]).update(applied_at=two_days_ago)
+        Job.objects.filter(pk=self.jobs[0].pk).update(view_count=12)
+        # Zapisy przez ORM omijaja liczniki widokow save_job
+        Job.objects.filter(pk=self.jobs[1].pk).update(save_count=3)
+
+    def _refresh(self):
+        return refresh()
+
+    def test_refresh_is_incremental(self):
+        self.assertEqual(self._refresh(), 6 + 1)
+        self.assertEqual(self._refresh(), 0)
+
+        today = timezone.localdate()
+        daily = dict(EmployerDailyStats.objects.values_list('day', 'applications'))
+        self.assertEqual(daily, {today - timedelta(days=2): 2, today: 1})
+        self.assertEqual(JobStats.objects.get(job=self.jobs[0]).status_counts, {'pending': 3})
+
+        application = JobApplication.objects.get(applicant=self.seekers[0])
+        application.status = 'accepted'
+        application.save()
+        self.assertEqual(self._refresh(), 1)
+        self.assertEqual(JobStats.objects.get(job=self.jobs[0]).status_counts, {'pending': 2, 'accepted': 1})
+        self.assertEqual(sum(EmployerDailyStats.objects.values_list('applications', flat=True)), 3)
+
+    def test_full_rebuild_matches_incremental_state(self):
+        self._refresh()
+        incremental = list(EmployerDailyStats.objects.order_by('day').values_list('day', 'applications', 'saves'))
+
+        call_command('refresh_analytics', '--full', stdout=StringIO())
+
+        rebuilt = list(EmployerDailyStats.objects.order_by('day').values_list('day', 'applications', 'saves'))
+        self.assertEqual(rebuilt, incremental)
+
+    def test_dashboard_reads_rollups_only(self):
+        self._refresh()
+        client = APIClient()
+        client.force_authenticate(self.employer)
+
+        with self.assertNumQueries(3):
+            response = client.get('/api/analytics/employer/', {'days': 7})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.data
+        self.assertEqual(data['totals'], {'jobs': 2, 'views': 12, 'saves': 3, 'applications': 3, 'conversion': 0.25})
+        self.assertEqual(data['status_breakdown'], {'pending': 3})
+        self.assertEqual(len(data['daily']), 7)
+        self.assertEqual(data['daily'][-1], {'date': timezone.localdate().isoformat(), 'applications': 1, 'saves': 3})
+        by_job = {row['id']: row for row in data['jobs']}
+        self.assertEqual(by_job[self.jobs[1].pk]['status_breakdown'], {})
+
+        client.force_authenticate(self.seekers[0])
+        self.assertEqual(client.get('/api/analytics/employer/').status_code, status.HTTP_403_FORBIDDEN)
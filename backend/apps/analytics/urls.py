@@ -0,0 +1,6 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('employer/', views.employer_dashboard_view, name='employer-dashboard'),
+]
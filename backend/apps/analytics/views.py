@@ -0,0 +1,26 @@
+from django.conf import settings
+from rest_framework import permissions, serializers, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from .rollups import employer_dashboard
+
+
+class IsEmployer(permissions.BasePermission):
+    message = 'Only employers have a dashboard.'
+
+    def has_permission(self, request, view):
+        return bool(request.user and request.user.is_authenticated and request.user.user_type == 'employer')
+
+
+class DashboardQuerySerializer(serializers.Serializer):
+    days = serializers.IntegerField(min_value=1, max_value=getattr(settings, 'ANALYTICS_MAX_DAYS', 90), default=30)
+
+
+@api_view(['GET'])
+@permission_classes([IsEmployer])
+def employer_dashboard_view(request):
+    """Stats on the employer's postings, served from rollup tables (O(jobs), not O(events))."""
+    query = DashboardQuerySerializer(data=request.query_params)
+    query.is_valid(raise_exception=True)
+    return Response(employer_dashboard(request.user, query.validated_data['days']), status=status.HTTP_200_OK)
@@ -1,7 +1,19 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.contrib.auth.models import User
-from django.contrib.auth import authenticate
+from django.contrib.auth import authenticate, get_user_model
 from rest_framework.test import APIClient
+from apps.integrations.http import close_clients, reset_breakers
+from apps.integrations.testing import FakeUpstream
+from authentication.google_oauth import google_oauth_service
+
+
+def google_config(url, **overrides):
+    return {'google': {'base_url': url, 'timeout': 2, 'pool_timeout': 1, 'max_connections': 5,
+                       'retries': 2, 'backoff': 0, **overrides}}
+
+
+OLA = {'email': 'ola@gmail.test', 'given_name': 'Ola', 'family_name': 'Nowak',
+       'picture': 'https://img.test/ola.png', 'verified_email': True}
 
 class AuthenticationTest(TestCase):
     def setUp(self):
@@ -22,3 +34,80 @@ class AuthenticationTest(TestCase):
         """Test nieprawidłowej autentykacji"""
         user = authenticate(username='testuser', password='wrongpass')
         self.assertIsNone(user)
+
+
+class AsyncGoogleAuthTest(TestCase):
+    def setUp(self):
+        reset_breakers()
+        google_oauth_service.cache.clear()
+
+    async def _login(self, token):
+        return await self.async_client.post(
+            '/api/auth/google/', {'access_token': token}, content_type='application/json')
+
+    async def test_google_login_creates_user_and_returns_tokens(self):
+        def userinfo(recorded):
+            if recorded['headers']['Authorization'] != 'Bearer good-token':
+                return 401, {'error': 'invalid_token'}
+            return 200, OLA
+
+        with FakeUpstream({('GET', '/oauth2/v2/userinfo'): userinfo}) as google:
+            with override_settings(OUTBOUND_HTTP=google_config(google.url)):
+                response = await self._login('good-token')
+                rejected = await self._login('bad-token')
+                await close_clients()
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['user']['email'], 'ola@gmail.test')
+        self.assertEqual(data['user']['first_name'], 'Ola')
+        self.assertTrue(data['access_token'] and data['refresh_token'])
+        self.assertTrue(await get_user_model().objects.filter(email='ola@gmail.test').aexists())
+        self.assertEqual(rejected.status_code, 400)
+
+    async def test_repeated_login_with_same_token_skips_google(self):
+        with FakeUpstream({('GET', '/oauth2/v2/userinfo'): lambda recorded: (200, OLA)}) as google:
+            with override_settings(OUTBOUND_HTTP=google_config(google.url)):
+                first = await self._login('good-token')
+                second = await self._login('good-token')
+                other = await self._login('other-token')
+                await close_clients()
+
+        self.assertEqual([first.status_code, second.status_code, other.status_code], [200, 200, 200])
+        self.assertEqual(len(google.requests), 2)
+        self.assertNotIn('good-token', ''.join(google_oauth_service.cache._entries))
+
+    async def test_transient_google_errors_are_retried(self):
+        statuses = iter([503, 502])
+
+        def flaky(recorded):
+            status_code = next(statuses, 200)
+            return status_code, OLA if status_code == 200 else {}
+
+        with FakeUpstream({('GET', '/oauth2/v2/userinfo'): flaky}) as google:
+            with override_settings(OUTBOUND_HTTP=google_config(google.url)):
+                response = await self._login('good-token')
+                await close_clients()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(google.requests), 3)
+
+    async def test_circuit_opens_after_repeated_failures(self):
+        with FakeUpstream({('GET', '/oauth2/v2/userinfo'): lambda recorded: (502, {})}) as google:
+            with override_settings(OUTBOUND_HTTP=google_config(google.url, retries=0, failure_threshold=2)):
+                responses = [await self._login(f'token-{i}') for i in range(3)]
+                await close_clients()
+
+        self.assertEqual([response.status_code for response in responses], [503, 503, 503])
+        # Trzecie logowanie nie dotarlo do Google - obwod byl juz otwarty
+        self.assertEqual(len(google.requests), 2)
+
+    def test_sync_service_shares_the_token_cache(self):
+        with FakeUpstream({('GET', '/oauth2/v2/userinfo'): lambda recorded: (200, OLA)}) as google:
+            with override_settings(OUTBOUND_HTTP=google_config(google.url)):
+                google_oauth_service._session = None
+                self.assertEqual(google_oauth_service.get_user_info('sync-token'), OLA)
+                self.assertEqual(google_oauth_service.get_user_info('sync-token'), OLA)
+                google_oauth_service._session = None
+
+        self.assertEqual(len(google.requests), 1)
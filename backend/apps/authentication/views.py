@@ -3,8 +3,13 @@ from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework import status
 from django.contrib.auth import get_user_model
-from rest_framework_simplejwt.tokens import RefreshToken
-import requests
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from apps.integrations.http import UpstreamUnavailable, json_body
+from apps.users.tokens import tokens_for_user
+from authentication.google_oauth import google_oauth_service
 import logging
 
 User = get_user_model()
@@ -31,7 +36,7 @@ def login_user(request):
                         'error': 'Konto uzytkownika jest nieaktywne'
                     }, status=status.HTTP_400_BAD_REQUEST)
                 
-                refresh = RefreshToken.for_user(user)
+                refresh = tokens_for_user(user)
                 return Response({
                     'access': str(refresh.access_token),
                     'refresh': str(refresh),
@@ -58,56 +63,29 @@ def login_user(request):
             'error': 'Server error'
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-@api_view(['POST'])
-@permission_classes([AllowAny])
-def google_auth(request):
+@csrf_exempt
+@require_POST
+async def google_auth(request):
     """Logowanie przez Google OAuth"""
-    logger.info(f'Google auth request received: {request.data}')
-    
-    access_token = request.data.get('access_token')
+    access_token = json_body(request).get('access_token')
     
     if not access_token:
         logger.error('No access token provided')
-        return Response({'error': 'Access token is required'}, status=status.HTTP_400_BAD_REQUEST)
+        return JsonResponse({'error': 'Access token is required'}, status=status.HTTP_400_BAD_REQUEST)
     
     try:
-        # Pobierz dane uzytkownika z Google API
-        headers = {'Authorization': f'Bearer {access_token}'}
-        response = requests.get(
-            'https://www.googleapis.com/oauth2/v2/userinfo',
-            headers=headers,
-            timeout=10
-        )
-        
-        if response.status_code != 200:
-            logger.error(f'Google API error: {response.status_code}')
-            return Response({'error': 'Invalid Google token'}, status=status.HTTP_400_BAD_REQUEST)
+        # Pobierz dane uzytkownika z Google API (bez blokowania workera ASGI)
+        user_info = await google_oauth_service.aget_user_info(access_token)
         
-        user_info = response.json()
-        logger.info(f'Google user info received: {user_info}')
+        if not user_info:
+            return JsonResponse({'error': 'Invalid Google token'}, status=status.HTTP_400_BAD_REQUEST)
         
         email = user_info.get('email')
         if not email:
             logger.error('No email in Google user info')
-            return Response({'error': 'Email not provided by Google'}, status=status.HTTP_400_BAD_REQUEST)
-        
-        # Sprawdz czy uzytkownik juz istnieje
-        try:
-            user = User.objects.get(email=email)
-            logger.info(f'Existing user found: {email}')
-        except User.DoesNotExist:
-            # Utworz nowego uzytkownika
-            user = User.objects.create_user(
-                email=email,
-                username=email,
-                first_name=user_info.get('given_name', ''),
-                last_name=user_info.get('family_name', ''),
-                is_active=True
-            )
-            logger.info(f'Created new user: {email}')
+            return JsonResponse({'error': 'Email not provided by Google'}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Wygeneruj JWT token
-        refresh = RefreshToken.for_user(user)
+        user, refresh = await sync_to_async(_google_user_tokens)(email, user_info)
         
         # Przygotuj pelne dane uzytkownika
         response_data = {
@@ -132,8 +110,30 @@ def google_auth(request):
         }
         
         logger.info(f'Sending complete user data for: {email}')
-        return Response(response_data, status=status.HTTP_200_OK)
+        return JsonResponse(response_data, status=status.HTTP_200_OK)
         
+    except UpstreamUnavailable as e:
+        logger.error(f'Google unavailable: {e}')
+        return JsonResponse({'error': 'Google is temporarily unavailable, please try again.'},
+                            status=status.HTTP_503_SERVICE_UNAVAILABLE)
     except Exception as e:
         logger.error(f'Google auth error: {str(e)}')
-        return Response({'error': f'Google auth failed: {str(e)}'}, status=status.HTTP_400_BAD_REQUEST)
+        return JsonResponse({'error': f'Google auth failed: {str(e)}'}, status=status.HTTP_400_BAD_REQUEST)
+
+def _google_user_tokens(email, user_info):
+    # Zapytania ORM i zapis tokenu (blacklist) sa synchroniczne - jeden skok do watku
+    try:
+        user = User.objects.get(email=email)
+        logger.info(f'Existing user found: {email}')
+    except User.DoesNotExist:
+        # Utworz nowego uzytkownika
+        user = User.objects.create_user(
+            email=email,
+            username=email,
+            first_name=user_info.get('given_name', ''),
+            last_name=user_info.get('family_name', ''),
+            is_active=True
+        )
+        logger.info(f'Created new user: {email}')
+    # Wygeneruj JWT token
+    return user, tokens_for_user(user)
@@ -0,0 +1,177 @@
+"""Pooled async HTTP clients for outbound calls to third-party APIs.
+
+Each upstream configured in ``settings.OUTBOUND_HTTP`` gets its own
+``httpx.AsyncClient``: keep-alive connections are reused across requests,
+``max_connections`` caps how many calls can be in flight to that upstream
+at once and ``pool_timeout`` bounds how long a request waits for a free
+slot before failing fast, so a slow upstream cannot pile up work.
+
+Clients are bound to the event loop they were created on. Under ASGI that
+is one long-lived loop per worker, and ``fluffy_jobs.asgi`` calls
+``keep_clients_alive()`` so the pool lives as long as the worker. Under
+WSGI (and in the task worker) every async call runs on a fresh loop that
+is thrown away afterwards, so the loop's clients are closed as soon as its
+last outbound request finishes - concurrent calls on the loop still share
+one pool and its limits, but no client or socket outlives the loop.
+
+Idempotent requests (GET/HEAD) are retried with exponential backoff on
+connection errors and 502/503/504, and every upstream has a circuit
+breaker shared by the whole process: after ``failure_threshold``
+consecutive failures calls fail immediately for ``reset_timeout`` seconds
+instead of queueing up behind a dead upstream.
+"""
+import asyncio
+import json
+import threading
+import time
+import weakref
+
+import httpx
+from django.conf import settings
+
+_clients = weakref.WeakKeyDictionary()
+_in_flight = weakref.WeakKeyDictionary()
+_keep_alive = False
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+RETRY_METHODS = {'GET', 'HEAD'}
+RETRY_STATUSES = {502, 503, 504}
+
+
+class UpstreamUnavailable(Exception):
+    """The upstream timed out, refused the connection or had no free connection slot."""
+
+    def __init__(self, upstream, reason):
+        super().__init__(f'{upstream}: {reason}')
+        self.upstream = upstream
+
+
+class CircuitBreaker:
+    """Opens after ``failure_threshold`` consecutive failures; lets one probe through after ``reset_timeout``."""
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            # Polotwarty: przepusc jedno zapytanie, kolejna porazka znow otworzy obwod
+            self.opened_at = time.monotonic()
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+def get_breaker(upstream):
+    with _breakers_lock:
+        breaker = _breakers.get(upstream)
+        if breaker is None:
+            config = settings.OUTBOUND_HTTP[upstream]
+            breaker = _breakers[upstream] = CircuitBreaker(
+                config.get('failure_threshold', 5), config.get('reset_timeout', 30),
+            )
+        return breaker
+
+
+def reset_breakers():
+    with _breakers_lock:
+        _breakers.clear()
+
+
+def keep_clients_alive():
+    """Keeps each loop's clients open between requests; only for long-lived loops (ASGI workers)."""
+    global _keep_alive
+    _keep_alive = True
+
+
+def get_client(upstream):
+    loop = asyncio.get_running_loop()
+    clients = _clients.setdefault(loop, {})
+    client = clients.get(upstream)
+    if client is None:
+        config = settings.OUTBOUND_HTTP[upstream]
+        client = clients[upstream] = httpx.AsyncClient(
+            base_url=config['base_url'],
+            timeout=httpx.Timeout(config['timeout'], pool=config.get('pool_timeout', 1)),
+            limits=httpx.Limits(
+                max_connections=config['max_connections'],
+                max_keepalive_connections=config['max_connections'],
+            ),
+        )
+    return client
+
+
+async def request(upstream, method, url, **kwargs):
+    loop = asyncio.get_running_loop()
+    _in_flight[loop] = _in_flight.get(loop, 0) + 1
+    try:
+        return await _send(upstream, method, url, **kwargs)
+    finally:
+        _in_flight[loop] -= 1
+        # Petla z WSGI/workera znika po wywolaniu - zamknij klientow, zanim zostawi otwarte gniazda
+        if not _keep_alive and not _in_flight[loop]:
+            await close_clients()
+
+
+async def _send(upstream, method, url, **kwargs):
+    breaker = get_breaker(upstream)
+    if not breaker.allow():
+        raise UpstreamUnavailable(upstream, 'circuit open')
+    config = settings.OUTBOUND_HTTP[upstream]
+    retries = config.get('retries', 0) if method.upper() in RETRY_METHODS else 0
+    for attempt in range(retries + 1):
+        if attempt:
+            await asyncio.sleep(config.get('backoff', 0.2) * 2 ** (attempt - 1))
+        try:
+            response = await get_client(upstream).request(method, url, **kwargs)
+        except httpx.PoolTimeout:
+            # Pelna pula to nasz limit wspolbieznosci, a nie awaria upstreamu
+            raise UpstreamUnavailable(upstream, 'too many concurrent requests')
+        except httpx.TransportError as exc:
+            error = UpstreamUnavailable(upstream, 'timed out' if isinstance(exc, httpx.TimeoutException)
+                                        else f'connection failed ({exc.__class__.__name__})')
+            continue
+        if response.status_code in RETRY_STATUSES:
+            error = None
+            continue
+        breaker.record_success()
+        return response
+    breaker.record_failure()
+    if error is not None:
+        raise error
+    return response
+
+
+async def close_clients():
+    """Closes the clients of the running loop (ASGI lifespan shutdown, tests)."""
+    clients = _clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        await client.aclose()
+
+
+def json_body(request):
+    """Body of an incoming request to a plain (non-DRF) async view: JSON or form data."""
+    if request.content_type == 'application/json':
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            return {}
+        return data if isinstance(data, dict) else {}
+    return request.POST.dict()
@@ -0,0 +1,68 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+
+class FakeUpstream:
+    """Local HTTP server standing in for Google/Stripe in tests.
+
+    ``routes`` maps ``(method, path)`` to a callable taking the recorded
+    request dict and returning ``(status, json_payload)``. Every request is
+    kept in ``requests`` for assertions.
+    """
+
+    def __init__(self, routes):
+        self.routes = routes
+        self.requests = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f'http://{host}:{port}'
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler_class(self):
+        upstream = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _handle(self):
+                parts = urlsplit(self.path)
+                body = self.rfile.read(int(self.headers.get('Content-Length') or 0)).decode()
+                recorded = {
+                    'method': self.command,
+                    'path': parts.path,
+                    'query': dict(parse_qsl(parts.query)),
+                    'headers': dict(self.headers),
+                    'form': dict(parse_qsl(body)),
+                }
+                with upstream._lock:
+                    upstream.requests.append(recorded)
+                route = upstream.routes.get((self.command, parts.path))
+                status, payload = route(recorded) if route else (404, {'error': 'not found'})
+                content = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            do_GET = do_POST = _handle
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,151 @@
+import copy
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from .models import Job, SavedJob
+from .serializers import get_saved_job_ids
+
+JOB_TYPES = [value for value, _ in Job.JOB_TYPES]
+# Pseudo-partycja stron ?sort=popular - ich kolejnosc zmieniaja tez zapisy ofert
+POPULAR = 'popular'
+
+
+def get_cache():
+    return caches[getattr(settings, 'JOBS_CACHE_ALIAS', 'default')]
+
+
+def _version_key(job_type):
+    return f'jobs:version:{job_type}'
+
+
+def partition_versions(job_types):
+    """Timestamps (ns) of the last change in each job_type partition."""
+    keys = {_version_key(job_type): job_type for job_type in job_types}
+    stored = get_cache().get_many(keys)
+    return {job_type: stored.get(key, 0) for key, job_type in keys.items()}
+
+
+def invalidate_jobs(job_ids=(), job_types=None):
+    """Drops cached detail entries of ``job_ids`` and list pages touching ``job_types``.
+
+    List pages are keyed by the version of every job_type partition they can
+    contain, so bumping one partition leaves pages filtered to other job
+    types untouched. ``job_types=None`` bumps every partition, which is what
+    bulk writes that bypass signals should use.
+    """
+    cache = get_cache()
+    keys = [_version_key(job_type) for job_type in (job_types or JOB_TYPES)]
+    previous = cache.get_many(keys)
+    now = time.time_ns()
+    # Zegar o niskiej rozdzielczosci (Windows) nie moze dac tej samej wersji dwa razy
+    cache.set_many({key: max(now, previous.get(key, 0) + 1) for key in keys}, timeout=None)
+    if job_ids:
+        cache.delete_many([detail_cache_key(job_id) for job_id in job_ids])
+
+
+def saved_ids_version(user_id):
+    """Version of the user's saved-job set, read from the database.
+
+    One indexed aggregate over the user's SavedJob rows: every save raises
+    ``max(id)`` and every unsave lowers the count, so the version changes on
+    each write without any per-process state. A version kept in a local
+    memory cache would not see saves made by other worker processes.
+    """
+    state = SavedJob.objects.filter(user_id=user_id).order_by().aggregate(
+        count=Count('pk'), last_id=Max('pk'), last_saved=Max('saved_at'),
+    )
+    last_saved = state['last_saved'].timestamp() if state['last_saved'] else 0
+    return f"{state['count']}.{state['last_id'] or 0}.{last_saved:.6f}"
+
+
+def detail_cache_key(job_id):
+    return f'jobs:detail:{job_id}'
+
+
+def list_cache_key(request, versions):
+    params = sorted(
+        (name, sorted(value for value in request.query_params.getlist(name) if value))
+        for name in request.query_params
+    )
+    raw = repr((request.get_host(), params, sorted(versions.items())))
+    return 'jobs:list:' + hashlib.md5(raw.encode()).hexdigest()
+
+
+def list_partitions(request):
+    """Job types a list request can be affected by.
+
+    The first page carries facet counts over every job type, so it depends on
+    all partitions; later pages only on the job types they are filtered to.
+    ``?sort=popular`` pages also depend on the ``POPULAR`` partition, bumped
+    by save count changes. Other pages keep the counters they were cached
+    with until the cache timeout, like view counts.
+    """
+    if not request.query_params.get('cursor'):
+        partitions = JOB_TYPES
+    else:
+        selected = [job_type for job_type in request.query_params.getlist('job_type') if job_type in JOB_TYPES]
+        partitions = selected or JOB_TYPES
+    if request.query_params.get('sort') == 'popular':
+        return [*partitions, POPULAR]
+    return partitions
+
+
+def make_entry(data, last_modified):
+    """Shared, user-independent cache entry built from serialized data."""
+    data = copy.deepcopy(data)
+    for job in _jobs_in(data):
+        job['is_saved'] = False
+    return {
+        'data': data,
+        'etag': hashlib.md5(repr(data).encode()).hexdigest(),
+        'last_modified': last_modified,
+    }
+
+
+def cached_response(request, entry, response_class):
+    """Builds a response from a cache entry, overlaying the user's is_saved flags."""
+    data = entry['data']
+    etag = entry['etag']
+    authenticated = request.user.is_authenticated
+    if authenticated:
+        data = _with_saved_flags(data, get_saved_job_ids(request))
+        flags = ''.join('1' if job['is_saved'] else '0' for job in _jobs_in(data))
+        etag = f"{etag}-{hashlib.md5(flags.encode()).hexdigest()[:12]}"
+
+    # Last-Modified nie obejmuje zapisanych ofert, wiec tylko dla anonimowych
+    last_modified = None if authenticated else entry['last_modified']
+    conditional = get_conditional_response(
+        request._request, etag=quote_etag(etag), last_modified=last_modified
+    )
+    response = conditional or response_class(data)
+    response['ETag'] = quote_etag(etag)
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    patch_vary_headers(response, ['Authorization'])
+    return response
+
+
+def versions_last_modified(versions):
+    newest = max(versions.values(), default=0) or time.time_ns()
+    return newest // 1_000_000_000
+
+
+def _with_saved_flags(data, saved_ids):
+    # Kopie tylko tych slownikow, ktore zmieniamy - wpis w cache musi zostac nietkniety
+    if isinstance(data, dict) and 'results' in data:
+        return {**data, 'results': [
+            {**job, 'is_saved': job['id'] in saved_ids} for job in data['results']
+        ]}
+    return {**data, 'is_saved': data['id'] in saved_ids}
+
+
+def _jobs_in(data):
+    if isinstance(data, dict) and 'results' in data:
+        return data['results']
+    return [data]
@@ -0,0 +1,123 @@
+"""Denormalized per-job counters: saves, applications and views.
+
+Saves and applications are adjusted with ``F()`` updates in the same
+transaction as the row they count. Views are too frequent for a write per
+hit, so they are summed in process memory and flushed in batches; hits
+buffered in a process that dies before flushing are lost, which is fine for
+a popularity signal. ``repair_counters`` recomputes saves and applications
+from the source tables when they drift (bulk writes bypass these paths).
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+from .cache import POPULAR, detail_cache_key, get_cache, invalidate_jobs
+from .models import Job, JobApplication, SavedJob
+
+logger = logging.getLogger(__name__)
+
+
+def adjust(job_id, **deltas):
+    """Adds ``deltas`` (e.g. ``save_count=1``) to the job's counters in one UPDATE.
+
+    Once the caller's transaction commits, the job's cached detail is
+    dropped and, for save count changes, the ``?sort=popular`` pages. Other
+    list pages keep the old counters until the cache timeout, as with view
+    counts, so one user's save does not empty the shared list cache.
+    """
+    # Licznik rozjechany w dol (np. po imporcie) nie moze zejsc ponizej zera
+    Job.objects.filter(pk=job_id).update(**{
+        field: F(field) + delta if delta >= 0 else Greatest(F(field) + delta, 0)
+        for field, delta in deltas.items()
+    })
+    # Po commicie - inaczej rownolegly odczyt zapisalby w cache stan sprzed zmiany
+    if 'save_count' in deltas:
+        transaction.on_commit(lambda: invalidate_jobs(job_ids=[job_id], job_types=[POPULAR]))
+    else:
+        transaction.on_commit(lambda: get_cache().delete(detail_cache_key(job_id)))
+
+
+class ViewCounter:
+    """Buffers view hits per job and writes them out in batches.
+
+    A flush happens on the first hit after ``flush_interval`` seconds or once
+    ``max_pending`` hits are buffered, and at interpreter exit. Jobs with the
+    same number of buffered hits share one UPDATE, so a flush costs a handful
+    of statements however many jobs were viewed.
+    """
+
+    def __init__(self, flush_interval=None, max_pending=None):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._pending = Counter()
+        self._buffered = 0
+        self._last_flush = time.monotonic()
+
+    def hit(self, job_id):
+        with self._lock:
+            self._pending[job_id] += 1
+            self._buffered += 1
+            due = (self._buffered >= self._setting('max_pending', 'JOBS_VIEW_FLUSH_MAX_PENDING', 1000)
+                   or time.monotonic() - self._last_flush >= self._setting(
+                       'flush_interval', 'JOBS_VIEW_FLUSH_INTERVAL', 10))
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Writes the buffered hits; returns how many were written."""
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            self._buffered = 0
+            self._last_flush = time.monotonic()
+        if not pending:
+            return 0
+        by_delta = defaultdict(list)
+        for job_id, hits in pending.items():
+            by_delta[hits].append(job_id)
+        try:
+            for hits, job_ids in by_delta.items():
+                Job.objects.filter(pk__in=job_ids).update(view_count=F('view_count') + hits)
+        except Exception:
+            # Baza chwilowo niedostepna - trafienia wracaja do bufora na nastepna probe
+            logger.exception('Flushing job view counts failed')
+            with self._lock:
+                self._pending.update(pending)
+                self._buffered += sum(pending.values())
+            return 0
+        return sum(pending.values())
+
+    def _setting(self, attribute, name, default):
+        value = getattr(self, attribute)
+        return value if value is not None else getattr(settings, name, default)
+
+
+view_counter = ViewCounter()
+
+
+@atexit.register
+def _flush_on_exit():
+    try:
+        view_counter.flush()
+    except Exception:
+        pass
+
+
+def _count_per_job(model):
+    rows = model.objects.filter(job=OuterRef('pk')).order_by().values('job')
+    return Coalesce(Subquery(rows.annotate(count=Count('pk')).values('count'), output_field=IntegerField()), 0)
+
+
+def repair_counters():
+    """Recomputes save/application counters in one set-based UPDATE; returns how many jobs were off."""
+    saves, applications = _count_per_job(SavedJob), _count_per_job(JobApplication)
+    return Job.objects.filter(~Q(save_count=saves) | ~Q(application_count=applications)).update(
+        save_count=saves, application_count=applications,
+    )
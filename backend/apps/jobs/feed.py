@@ -0,0 +1,197 @@
+"""Personalized job feed built from the user's saved jobs.
+
+The profile is read from the most recent ``JOBS_FEED_PROFILE_SAVES`` saves
+(newer saves weigh more): skill, location and job_type preferences plus a
+preferred salary. Candidates come only from indexes: the newest jobs per
+preferred skill (JobSkill), per preferred (job_type, location) pair
+(job_type_location_idx), and the precomputed neighbours of recent saves
+(SimilarJob). They are scored together in NumPy arrays. The ranked ids are
+cached per user under the saved-set version (read from the database), so
+every save or unsave invalidates the feed, and new jobs show up after
+``JOBS_FEED_CACHE_TIMEOUT``. Users without saves get the most saved jobs.
+"""
+import math
+from collections import defaultdict
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+from .cache import get_cache, saved_ids_version
+from .models import Job, JobSkill, SavedJob, SimilarJob
+
+# Ile najnowszych ofert brac z kazdego indeksu
+PER_SOURCE = 100
+TOP_SKILLS = 8
+TOP_LOCATIONS = 3
+TOP_JOB_TYPES = 2
+SIMILAR_SEEDS = 50
+# Polowa wagi zapisu po tylu nowszych zapisach
+PROFILE_HALF_LIFE = 100
+FRESHNESS_HALF_LIFE_DAYS = 30
+SALARY_SIGMA = 0.3
+CHUNK_SIZE = 500
+ROW_FIELDS = ('pk', 'location', 'job_type', 'salary_min', 'salary_max', 'created_at')
+WEIGHTS = {'skills': 0.45, 'location': 0.2, 'job_type': 0.1, 'salary': 0.1, 'similar': 0.1, 'freshness': 0.05}
+
+
+def feed_size():
+    return getattr(settings, 'JOBS_FEED_SIZE', 100)
+
+
+def ranked_feed(user):
+    """(job ids, personalized) for ``user``, best first, from cache when the saved set has not changed."""
+    cache = get_cache()
+    key = feed_cache_key(user.pk)
+    entry = cache.get(key)
+    if entry is None:
+        profile = build_profile(user)
+        ids = score_candidates(user, profile) if profile else popular_jobs()
+        entry = (ids, bool(profile))
+        cache.set(key, entry, getattr(settings, 'JOBS_FEED_CACHE_TIMEOUT', 600))
+    return entry
+
+
+def feed_cache_key(user_id):
+    # Wersja z bazy - zapis na innym workerze tez zmienia klucz
+    return f'jobs:feed:{user_id}:{saved_ids_version(user_id)}'
+
+
+def build_profile(user):
+    """Preference weights from the user's recent saves, or None when nothing is saved."""
+    limit = getattr(settings, 'JOBS_FEED_PROFILE_SAVES', 500)
+    saves = list(
+        SavedJob.objects.filter(user=user).order_by('-saved_at', '-id')
+        .values_list('job_id', 'job__location', 'job__job_type', 'job__salary_min', 'job__salary_max')[:limit]
+    )
+    if not saves:
+        return None
+    recency = {job_id: 0.5 ** (position / PROFILE_HALF_LIFE) for position, (job_id, *_) in enumerate(saves)}
+    locations, job_types, salaries = defaultdict(float), defaultdict(float), []
+    for job_id, location, job_type, salary_min, salary_max in saves:
+        locations[location] += recency[job_id]
+        job_types[job_type] += recency[job_id]
+        midpoint = _midpoint(salary_min, salary_max)
+        if midpoint:
+            salaries.append((math.log(midpoint), recency[job_id]))
+    skills = defaultdict(float)
+    for job_id, skill_id in JobSkill.objects.filter(job_id__in=list(recency)).values_list('job_id', 'skill_id'):
+        skills[skill_id] += recency[job_id]
+
+    salary = None
+    if salaries:
+        logs, weights = np.array(salaries).T
+        salary = float(np.average(logs, weights=weights))
+    return {
+        'skills': _top(skills, TOP_SKILLS),
+        'locations': _top(locations, TOP_LOCATIONS),
+        'job_types': _top(job_types, TOP_JOB_TYPES),
+        'log_salary': salary,
+        'seeds': [job_id for job_id, *_ in saves[:SIMILAR_SEEDS]],
+    }
+
+
+def _top(weights, count):
+    # Udzialy najczestszych wartosci - waga profilu sumuje sie do 1 w kazdej grupie
+    top = sorted(weights.items(), key=lambda item: item[1], reverse=True)[:count]
+    total = sum(weight for _, weight in top) or 1
+    return {value: weight / total for value, weight in top}
+
+
+def _midpoint(salary_min, salary_max):
+    values = [float(value) for value in (salary_min, salary_max) if value]
+    return sum(values) / len(values) if values else None
+
+
+def candidates(profile):
+    """Scoring rows of active jobs from the indexes the profile points at, and their similar-jobs scores.
+
+    Each source returns the scoring columns directly, so candidates are not
+    read a second time by id.
+    """
+    rows = {}
+    active = Job.objects.filter(is_active=True).order_by('-pk')
+    for skill_id in profile['skills']:
+        # Od strony JobSkill - indeks (skill, job) daje od razu najnowsze oferty z umiejetnoscia
+        rows.update((row[0], row) for row in JobSkill.objects.filter(skill_id=skill_id, job__is_active=True)
+                    .order_by('-job_id').values_list(*(f'job__{field}' for field in ROW_FIELDS))[:PER_SOURCE])
+    for job_type in profile['job_types']:
+        for location in profile['locations']:
+            rows.update((row[0], row) for row in active.filter(job_type=job_type, location=location)
+                        .values_list(*ROW_FIELDS)[:PER_SOURCE])
+    similar = {}
+    neighbours = SimilarJob.objects.filter(job_id__in=profile['seeds'], similar__is_active=True).values_list(
+        'score', *(f'similar__{field}' for field in ROW_FIELDS))
+    for score, *row in neighbours:
+        rows.setdefault(row[0], tuple(row))
+        similar[row[0]] = max(similar.get(row[0], 0.0), score)
+    return rows, similar
+
+
+def score_candidates(user, profile):
+    """Ids of the best-scoring candidates the user has not saved, at most ``feed_size()``."""
+    rows, similar = candidates(profile)
+    saved = set(SavedJob.objects.filter(user=user).order_by().values_list('job_id', flat=True))
+    job_ids = sorted(set(rows) - saved)
+    if not job_ids:
+        return [job_id for job_id in popular_jobs() if job_id not in saved]
+    links = []
+    for offset in range(0, len(job_ids), CHUNK_SIZE):
+        links.extend(
+            JobSkill.objects.filter(job_id__in=job_ids[offset:offset + CHUNK_SIZE], skill_id__in=list(profile['skills']))
+            .values_list('job_id', 'skill_id')
+        )
+    return rank(profile, [rows[job_id] for job_id in job_ids], links, similar)[:feed_size()]
+
+
+def rank(profile, rows, links, similar):
+    """Orders candidate rows (pk, location, job_type, salary_min, salary_max, created_at) by profile score."""
+    ids = np.array([row[0] for row in rows], dtype=np.int64)
+    position = {job_id: index for index, job_id in enumerate(ids.tolist())}
+
+    skills = np.zeros(len(ids))
+    matched = [(position[job_id], profile['skills'][skill_id]) for job_id, skill_id in links if job_id in position]
+    if matched:
+        indices, weights = np.array(matched).T
+        np.add.at(skills, indices.astype(np.int64), weights)
+
+    features = {
+        'skills': skills,
+        'location': _lookup([row[1] for row in rows], profile['locations']),
+        'job_type': _lookup([row[2] for row in rows], profile['job_types']),
+        'salary': _salary_fit(rows, profile['log_salary']),
+        'similar': np.array([similar.get(job_id, 0.0) for job_id in ids.tolist()]),
+        'freshness': _freshness([row[5] for row in rows]),
+    }
+    score = sum(WEIGHTS[name] * values for name, values in features.items())
+    # Przy rownym wyniku nowsza oferta pierwsza
+    order = np.lexsort((-ids, -score))
+    return ids[order].tolist()
+
+
+def _lookup(values, weights):
+    # Jedno wyszukanie w slowniku na unikalna wartosc, nie na kandydata
+    unique, inverse = np.unique(np.array(values, dtype=str), return_inverse=True)
+    return np.array([weights.get(value, 0.0) for value in unique.tolist()])[inverse]
+
+
+def _salary_fit(rows, log_salary):
+    if log_salary is None:
+        return np.zeros(len(rows))
+    midpoints = np.array([_midpoint(row[3], row[4]) or np.nan for row in rows], dtype=float)
+    # Dopasowanie w skali logarytmicznej: +-30% od preferencji to nadal ~0.6
+    fit = np.exp(-((np.log(midpoints) - log_salary) ** 2) / (2 * SALARY_SIGMA ** 2))
+    return np.nan_to_num(fit, nan=0.0)
+
+
+def _freshness(created):
+    now = timezone.now().timestamp()
+    ages = (now - np.array([value.timestamp() for value in created])) / 86400
+    return 0.5 ** (np.maximum(ages, 0) / FRESHNESS_HALF_LIFE_DAYS)
+
+
+def popular_jobs():
+    """Most saved active jobs - the feed of a user who has not saved anything yet."""
+    return list(
+        Job.objects.filter(is_active=True).order_by('-save_count', '-id').values_list('pk', flat=True)[:feed_size()]
+    )
@@ -0,0 +1,75 @@
+from django.db.models import Count, Q
+
+from .geo import near_geohashes
+from .models import JobSkill
+
+SALARY_BUCKETS = [
+    ('0-5000', 0, 5000),
+    ('5000-10000', 5000, 10000),
+    ('10000-15000', 10000, 15000),
+    ('15000-20000', 15000, 20000),
+    ('20000+', 20000, None),
+]
+
+MAX_LOCATION_FACETS = 50
+
+
+def filter_jobs(queryset, filters, exclude=None):
+    """Applies validated JobFilterSerializer data; ``exclude`` skips one facet dimension."""
+    if filters.get('job_type') and exclude != 'job_type':
+        queryset = queryset.filter(job_type__in=filters['job_type'])
+    if filters.get('location') and exclude != 'location':
+        queryset = queryset.filter(location__in=filters['location'])
+    if exclude != 'salary':
+        # Zakresy sie nakladaja: oferta 10-15k pasuje do filtra salary_min=12000
+        if filters.get('salary_min') is not None:
+            queryset = queryset.filter(salary_max__gte=filters['salary_min'])
+        if filters.get('salary_max') is not None:
+            queryset = queryset.filter(salary_min__lte=filters['salary_max'])
+    if filters.get('near'):
+        # Promien liczony na punktach gazetteera; oferty filtruje indeks job_active_geohash_idx
+        queryset = queryset.filter(geohash__in=near_geohashes(filters['near'], filters['radius_km']))
+    if filters.get('is_premium') is not None:
+        queryset = queryset.filter(is_premium=filters['is_premium'])
+    if filters.get('posted_since'):
+        queryset = queryset.filter(created_at__gte=filters['posted_since'])
+    # Podzapytania po indeksie (skill, job) zamiast LIKE po requirements
+    for key in filters.get('skills_all', []):
+        queryset = queryset.filter(pk__in=JobSkill.objects.filter(skill__key=key).values('job_id'))
+    if filters.get('skills_any'):
+        queryset = queryset.filter(
+            pk__in=JobSkill.objects.filter(skill__key__in=filters['skills_any']).values('job_id')
+        )
+    return queryset
+
+
+def job_facets(queryset, filters):
+    """Counts per job type, location and salary bucket.
+
+    Each facet is counted with every filter applied except its own, so the
+    sidebar still shows the alternatives to an already selected value.
+    """
+    by_type = (
+        filter_jobs(queryset, filters, exclude='job_type')
+        .order_by().values('job_type').annotate(count=Count('pk'))
+    )
+    by_location = (
+        filter_jobs(queryset, filters, exclude='location')
+        .order_by().values('location').annotate(count=Count('pk'))
+        .order_by('-count', 'location')[:MAX_LOCATION_FACETS]
+    )
+    salary = filter_jobs(queryset, filters, exclude='salary').order_by().aggregate(**{
+        label: Count('pk', filter=_bucket_q(low, high)) for label, low, high in SALARY_BUCKETS
+    })
+    return {
+        'job_type': {row['job_type']: row['count'] for row in by_type},
+        'location': [{'value': row['location'], 'count': row['count']} for row in by_location],
+        'salary': [{'range': label, 'count': salary[label]} for label, _, _ in SALARY_BUCKETS],
+    }
+
+
+def _bucket_q(low, high):
+    condition = Q(salary_min__gte=low)
+    if high is not None:
+        condition &= Q(salary_min__lt=high)
+    return condition
@@ -0,0 +1,205 @@
+"""Offline geocoding of Job.location and radius search.
+
+Locations are matched against a bundled gazetteer (``data/gazetteer.csv``:
+city centres of Poland and the larger European tech hubs). No network is
+involved. A matched job stores its place's coordinates and their geohash.
+
+Every geocoded job sits exactly on a gazetteer point. A radius search
+therefore runs over the gazetteer, not over the jobs: a degree grid gives
+the places inside the bounding box, exact haversine distances are computed
+for those candidates in one NumPy pass, and the list filter becomes an
+indexed ``geohash IN (...)`` over a handful of values. That combines with
+every other filter at the cost of one more indexed condition.
+"""
+import csv
+import math
+import os
+import re
+from collections import defaultdict, namedtuple
+from functools import lru_cache
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Count
+
+from .search import fold
+
+GAZETTEER_PATH = os.path.join(os.path.dirname(__file__), 'data', 'gazetteer.csv')
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+GRID_DEGREES = 1.0
+GEOHASH_PRECISION = 9
+
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+# "Warsaw, Poland", "Krakow / Remote", "Wroclaw (hybrid)" - miasto to jeden z fragmentow
+_PARTS_RE = re.compile(r'[,/|;()\[\]]')
+
+Place = namedtuple('Place', 'name country latitude longitude geohash')
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    """Standard base32 geohash of a point."""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        interval, coordinate = (lon_range, longitude) if even else (lat_range, latitude)
+        middle = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits, value = 0, 0
+    return ''.join(chars)
+
+
+def haversine_km(latitude, longitude, latitudes, longitudes):
+    """Great-circle distances (km) from one point to arrays of points, all in degrees."""
+    lat1, lon1 = math.radians(latitude), math.radians(longitude)
+    lat2, lon2 = np.radians(latitudes), np.radians(longitudes)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class Gazetteer:
+    """Places by folded name/alias plus a degree grid over their coordinates."""
+
+    def __init__(self, places):
+        self.places = places
+        self.latitudes = np.array([place.latitude for place in places])
+        self.longitudes = np.array([place.longitude for place in places])
+        self._by_name = {}
+        self.by_geohash = {place.geohash: place for place in places}
+        self._grid = defaultdict(list)
+        for index, place in enumerate(places):
+            self._grid[_cell(place.latitude, place.longitude)].append(index)
+
+    @classmethod
+    def load(cls, path=GAZETTEER_PATH):
+        places, names = [], []
+        with open(path, newline='', encoding='utf-8') as source:
+            for row in csv.DictReader(source):
+                latitude, longitude = float(row['latitude']), float(row['longitude'])
+                places.append(Place(row['name'], row['country'], latitude, longitude,
+                                    encode_geohash(latitude, longitude)))
+                names.append([row['name'], *filter(None, (row.get('aliases') or '').split('|'))])
+        gazetteer = cls(places)
+        for place, aliases in zip(places, names):
+            for alias in aliases:
+                # Pierwsze wystapienie wygrywa - plik jest uporzadkowany od najwazniejszych miast
+                gazetteer._by_name.setdefault(_key(alias), place)
+        return gazetteer
+
+    def lookup(self, text):
+        """Place named in a free-text location ("Warszawa (hybrid)", "Krakow, Poland"), or None."""
+        if not text:
+            return None
+        place = self._by_name.get(_key(text))
+        if place is not None:
+            return place
+        for part in _PARTS_RE.split(text):
+            place = self._by_name.get(_key(part))
+            if place is not None:
+                return place
+        return None
+
+    def within(self, latitude, longitude, radius_km):
+        """Places within ``radius_km`` of the point: grid cells of the bounding box, then exact distances."""
+        lat_delta = radius_km / KM_PER_DEGREE
+        # Przy biegunie pas dlugosci geograficznej obejmuje caly swiat
+        cos_lat = math.cos(math.radians(min(abs(latitude) + lat_delta, 90.0)))
+        lon_delta = 180.0 if cos_lat < 1e-6 else min(radius_km / (KM_PER_DEGREE * cos_lat), 180.0)
+        south, north = latitude - lat_delta, latitude + lat_delta
+        west, east = longitude - lon_delta, longitude + lon_delta
+
+        candidates = []
+        for row in range(_grid_index(south), _grid_index(north) + 1):
+            for column in range(_grid_index(west), _grid_index(east) + 1):
+                # Kolumny za +-180 stopni zawijaja sie na druga strone poludnika
+                wrapped = (column + int(180 / GRID_DEGREES)) % int(360 / GRID_DEGREES) - int(180 / GRID_DEGREES)
+                candidates.extend(self._grid.get((row, wrapped), ()))
+        if not candidates:
+            return []
+        candidates = np.unique(np.array(candidates))
+        distances = haversine_km(latitude, longitude, self.latitudes[candidates], self.longitudes[candidates])
+        return [self.places[index] for index in candidates[distances <= radius_km]]
+
+
+def _key(text):
+    return ' '.join(fold(text).replace('-', ' ').split())
+
+
+def _grid_index(degrees):
+    return math.floor(degrees / GRID_DEGREES)
+
+
+def _cell(latitude, longitude):
+    return _grid_index(latitude), _grid_index(longitude)
+
+
+@lru_cache(maxsize=1)
+def get_gazetteer():
+    return Gazetteer.load()
+
+
+def max_radius_km():
+    return getattr(settings, 'JOBS_GEO_MAX_RADIUS_KM', 500)
+
+
+def default_radius_km():
+    return getattr(settings, 'JOBS_GEO_DEFAULT_RADIUS_KM', 25)
+
+
+def geocode(location):
+    """(latitude, longitude, geohash) of a free-text location; (None, None, '') when not in the gazetteer."""
+    place = get_gazetteer().lookup(location)
+    if place is None:
+        return None, None, ''
+    return place.latitude, place.longitude, place.geohash
+
+
+def set_coordinates(job):
+    job.latitude, job.longitude, job.geohash = geocode(job.location)
+
+
+@lru_cache(maxsize=1024)
+def near_geohashes(place_name, radius_km):
+    """Geohashes of the places within ``radius_km`` of a gazetteer place - the values to filter jobs on."""
+    gazetteer = get_gazetteer()
+    place = gazetteer.lookup(place_name)
+    if place is None:
+        return ()
+    return tuple(sorted(match.geohash for match in gazetteer.within(place.latitude, place.longitude, radius_km)))
+
+
+def place_counts(queryset):
+    """Gazetteer places with the number of jobs in ``queryset`` at each, most jobs first."""
+    by_geohash = get_gazetteer().by_geohash
+    rows = queryset.exclude(geohash='').order_by().values_list('geohash').annotate(count=Count('pk'))
+    places = [(by_geohash[geohash], count) for geohash, count in rows if geohash in by_geohash]
+    places.sort(key=lambda item: (-item[1], item[0].name))
+    return [
+        {'name': place.name, 'country': place.country, 'latitude': place.latitude,
+         'longitude': place.longitude, 'count': count}
+        for place, count in places
+    ]
+
+
+def backfill(model, only_missing=True):
+    """Geocodes stored jobs with one UPDATE per distinct location string; returns the number of rows updated."""
+    queryset = model.objects.all()
+    if only_missing:
+        queryset = queryset.filter(geohash='')
+    updated = 0
+    for location in queryset.order_by().values_list('location', flat=True).distinct():
+        latitude, longitude, geohash = geocode(location)
+        if geohash or not only_missing:
+            updated += queryset.filter(location=location).update(
+                latitude=latitude, longitude=longitude, geohash=geohash,
+            )
+    return updated
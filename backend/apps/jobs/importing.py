@@ -0,0 +1,280 @@
+import csv
+import json
+import os
+import time
+from collections import defaultdict
+from decimal import Decimal, InvalidOperation
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .cache import invalidate_jobs
+from .geo import set_coordinates
+from .models import Job
+from .search import index_jobs
+from .similar import mark_dirty
+from .skills import sync_skills
+
+JOB_TYPE_VALUES = {value for value, _ in Job.JOB_TYPES}
+UPDATE_FIELDS = [
+    'description', 'requirements', 'job_type', 'salary_min', 'salary_max',
+    'is_premium', 'is_active', 'updated_at',
+]
+# Pola nadpisywane przy upsercie tylko wtedy, gdy rekord je podaje (flaga _has_<pole> na Job)
+OPTIONAL_UPDATE_FIELDS = ('is_premium', 'is_active')
+
+
+def parse_salary(salary_str):
+    # "15,000 - 20,000 PLN" -> (15000, 20000); nieczytelne widelki to brak widelek, nie zmyslone wartosci
+    try:
+        parts = salary_str.replace(',', '').replace(' PLN', '').split(' - ')
+        return float(parts[0]), float(parts[1])
+    except (AttributeError, ValueError, IndexError):
+        return None, None
+
+
+def normalize_job_type(value):
+    # "Full-time" -> "full_time"
+    job_type = str(value or '').strip().lower().replace('-', '_').replace(' ', '_')
+    if job_type not in JOB_TYPE_VALUES:
+        raise ValueError(f'Unknown job type: {value!r}')
+    return job_type
+
+
+def _decimal(value):
+    if value in (None, ''):
+        return None
+    try:
+        return Decimal(str(value))
+    except InvalidOperation:
+        raise ValueError(f'Invalid salary: {value!r}')
+
+
+def _bool(value, default):
+    if value in (None, ''):
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ('1', 'true', 'yes', 't')
+
+
+def build_job(record, owner):
+    """Maps one feed record onto an unsaved Job. Raises ValueError for unusable rows."""
+    title = (record.get('title') or '').strip()
+    company = (record.get('company') or '').strip()
+    location = (record.get('location') or '').strip()
+    if not (title and company and location):
+        raise ValueError('title, company and location are required')
+
+    if record.get('salary'):
+        salary_min, salary_max = parse_salary(record['salary'])
+        salary_min, salary_max = _decimal(salary_min), _decimal(salary_max)
+    else:
+        salary_min, salary_max = _decimal(record.get('salary_min')), _decimal(record.get('salary_max'))
+
+    requirements = record.get('requirements') or ''
+    if isinstance(requirements, (list, tuple)):
+        requirements = ', '.join(requirements)
+
+    job = Job(
+        title=title[:200],
+        company=company[:100],
+        location=location[:100],
+        description=record.get('description') or '',
+        requirements=requirements,
+        job_type=normalize_job_type(record.get('job_type') or record.get('type')),
+        salary_min=salary_min,
+        salary_max=salary_max,
+        is_premium=_bool(record.get('is_premium'), False),
+        is_active=_bool(record.get('is_active'), True),
+        posted_by=owner,
+    )
+    # bulk_create omija sygnaly - wspolrzedne trzeba ustawic tutaj
+    set_coordinates(job)
+    # Rekord bez is_active/is_premium nie reaktywuje oferty wylaczonej recznie
+    # ani nie zdejmuje promocji oplaconej przez pracodawce
+    job._has_is_active = record.get('is_active') not in (None, '')
+    job._has_is_premium = record.get('is_premium') not in (None, '')
+    return job
+
+
+def detect_format(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.jsonl', '.ndjson', '.json'):
+        return 'jsonl'
+    if extension == '.csv':
+        return 'csv'
+    raise ValueError(f'Cannot detect feed format of {path}, pass --format')
+
+
+def iter_records(path, fmt, start_row=0, start_offset=0):
+    """Yields (row_number, record, offset) reading the feed line by line.
+
+    ``offset`` is the byte position after the record for JSONL feeds, which
+    lets a resumed import seek straight to it. CSV records can span lines,
+    so a resumed CSV import re-reads and skips the first ``start_row`` rows.
+    """
+    if fmt == 'jsonl':
+        with open(path, 'rb') as feed:
+            feed.seek(start_offset)
+            row = start_row
+            for line in iter(feed.readline, b''):
+                offset = feed.tell()
+                if not line.strip():
+                    continue
+                row += 1
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    record = None
+                yield row, record, offset
+    else:
+        with open(path, newline='', encoding='utf-8-sig') as feed:
+            for row, record in enumerate(csv.DictReader(feed), start=1):
+                if row > start_row:
+                    yield row, record, None
+
+
+class Checkpoint:
+    """Progress of an import, written atomically after every committed chunk."""
+
+    def __init__(self, path, source):
+        self.path = path
+        self.source = os.path.abspath(source)
+        self.rows = 0
+        self.offset = 0
+
+    def load(self):
+        try:
+            with open(self.path) as handle:
+                state = json.load(handle)
+        except FileNotFoundError:
+            return False
+        if state.get('source') != self.source:
+            raise ValueError(f'Checkpoint {self.path} belongs to {state.get("source")}')
+        self.rows = state['rows']
+        self.offset = state.get('offset') or 0
+        return True
+
+    def save(self, rows, offset):
+        self.rows, self.offset = rows, offset or 0
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w') as handle:
+            json.dump({'source': self.source, 'rows': self.rows, 'offset': self.offset}, handle)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class JobImporter:
+    """Upserts feed records on (title, company, location), one transaction per chunk.
+
+    Rows go in with bulk_create/bulk_update, which bypass model signals, so the
+    search index and skill links are rebuilt for every touched job inside the
+    same transaction (and the job is flagged for the similar-jobs refresh),
+    and the response cache is invalidated once at the end.
+    """
+
+    def __init__(self, owner, chunk_size=2000):
+        self.owner = owner
+        self.chunk_size = chunk_size
+        self.created = 0
+        self.updated = 0
+        self.skipped = 0
+
+    def run(self, records, checkpoint=None, progress=None):
+        started = time.perf_counter()
+        processed = 0
+        chunk = []
+        last_row, last_offset = (checkpoint.rows, checkpoint.offset) if checkpoint else (0, 0)
+        for row, record, offset in records:
+            try:
+                if record is None:
+                    raise ValueError('Malformed record')
+                chunk.append(build_job(record, self.owner))
+            except ValueError:
+                self.skipped += 1
+            last_row, last_offset = row, offset
+            if len(chunk) >= self.chunk_size:
+                processed += self._flush(chunk)
+                chunk = []
+                if checkpoint:
+                    checkpoint.save(last_row, last_offset)
+                if progress:
+                    progress(last_row, processed / max(time.perf_counter() - started, 1e-9))
+        if chunk:
+            processed += self._flush(chunk)
+        if checkpoint:
+            checkpoint.save(last_row, last_offset)
+        if processed:
+            invalidate_jobs()
+        return processed, time.perf_counter() - started
+
+    def _flush(self, jobs):
+        # Ostatni rekord z danym kluczem wygrywa, tak jak przy zapisie wiersz po wierszu
+        by_key = {(job.title, job.company, job.location): job for job in jobs}
+        with transaction.atomic():
+            existing = {}
+            for job in Job.objects.filter(
+                title__in={key[0] for key in by_key},
+                company__in={key[1] for key in by_key},
+                location__in={key[2] for key in by_key},
+            ).only('pk', 'title', 'company', 'location'):
+                existing.setdefault((job.title, job.company, job.location), job.pk)
+
+            to_create, to_update = [], []
+            now = timezone.now()
+            for key, job in by_key.items():
+                if key in existing:
+                    job.pk = existing[key]
+                    job.updated_at = now
+                    to_update.append(job)
+                else:
+                    to_create.append(job)
+
+            created = Job.objects.bulk_create(to_create, batch_size=500)
+            self._update(to_update)
+
+            if any(job.pk is None for job in created):
+                # Backend bez RETURNING - doczytaj id nowych ofert po kluczu
+                self._assign_created_pks(created)
+            touched = list(created) + to_update
+            index_jobs(touched)
+            sync_skills(touched)
+            mark_dirty(job.pk for job in touched)
+
+        self.created += len(to_create)
+        self.updated += len(to_update)
+        return len(by_key)
+
+    @staticmethod
+    def _update(jobs):
+        # bulk_update buduje CASE WHEN per wiersz i pole - przy milionach wierszy
+        # zwykly executemany UPDATE jest wielokrotnie szybszy
+        groups = defaultdict(list)
+        for job in jobs:
+            skipped = frozenset(name for name in OPTIONAL_UPDATE_FIELDS if not getattr(job, f'_has_{name}', True))
+            groups[skipped].append(job)
+        for skipped, group in groups.items():
+            fields = [Job._meta.get_field(name) for name in UPDATE_FIELDS if name not in skipped]
+            quote = connection.ops.quote_name
+            assignments = ', '.join(f'{quote(field.column)} = %s' for field in fields)
+            sql = f'UPDATE {quote(Job._meta.db_table)} SET {assignments} WHERE {quote(Job._meta.pk.column)} = %s'
+            rows = [
+                [field.get_db_prep_save(getattr(job, field.attname), connection) for field in fields] + [job.pk]
+                for job in group
+            ]
+            with connection.cursor() as cursor:
+                cursor.executemany(sql, rows)
+
+    @staticmethod
+    def _assign_created_pks(jobs):
+        by_key = {(job.title, job.company, job.location): job for job in jobs}
+        for pk, title, company, location in Job.objects.filter(
+            title__in={key[0] for key in by_key}
+        ).values_list('pk', 'title', 'company', 'location'):
+            job = by_key.get((title, company, location))
+            if job is not None:
+                job.pk = pk
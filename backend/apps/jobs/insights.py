@@ -0,0 +1,314 @@
+"""Salary insights computed in NumPy over an in-process columnar snapshot.
+
+The snapshot holds one row per active job with a salary. Its columns are
+the salary midpoint as float64, job_type and location as integer codes,
+and (row, skill) pairs. Rows are kept sorted by salary, so every filtered
+subset is already sorted: percentiles and histograms are index arithmetic,
+and per-group medians only need a stable sort of small integer group codes.
+Nothing is a per-row Python object once the snapshot is built.
+
+Each process keeps its own snapshot. It is refreshed at most every
+``JOBS_INSIGHTS_REFRESH_INTERVAL`` seconds by re-reading only the jobs
+whose ``updated_at`` passed the watermark. One request refreshes while
+the others keep answering from the previous snapshot. Deletes leave no
+trace in ``updated_at``, so a mismatch with the count of active jobs
+triggers a full rebuild.
+"""
+import threading
+import time
+from itertools import islice
+
+import numpy as np
+from django.conf import settings
+from django.db.models import FloatField, Max, Q
+from django.db.models.functions import Cast
+
+from .models import Job, JobSkill, Skill
+
+JOB_TYPES = [value for value, _ in Job.JOB_TYPES]
+QUANTILES = {'p10': 0.1, 'p25': 0.25, 'p50': 0.5, 'p75': 0.75, 'p90': 0.9}
+GROUP_QUANTILES = {'p25': 0.25, 'median': 0.5, 'p75': 0.75}
+HAS_SALARY = Q(salary_min__isnull=False) | Q(salary_max__isnull=False)
+BATCH_SIZE = 50000
+CHUNK_SIZE = 500
+RESULT_CACHE_SIZE = 256
+
+
+def refresh_interval():
+    return getattr(settings, 'JOBS_INSIGHTS_REFRESH_INTERVAL', 60)
+
+
+class SalarySnapshot:
+    """Immutable salary columns of the active jobs; ``refreshed()`` returns an updated copy."""
+
+    def __init__(self, ids, salaries, job_types, locations, pair_jobs, pair_skills, location_names, watermark):
+        order = np.argsort(salaries, kind='stable')
+        self.ids = ids[order]
+        self.salaries = salaries[order]
+        self.job_types = job_types[order]
+        self.locations = locations[order]
+        self.location_names = location_names
+        self.location_index = {name: code for code, name in enumerate(location_names)}
+        self.watermark = watermark
+        self.built_at = time.monotonic()
+
+        # Pary (wiersz, skill) w kolejnosci wierszy - wynagrodzenia par tez wychodza posortowane
+        id_order = np.argsort(self.ids, kind='stable')
+        pair_rows = id_order[np.searchsorted(self.ids, pair_jobs, sorter=id_order)] if len(pair_jobs) else pair_jobs
+        pair_order = np.argsort(pair_rows, kind='stable')
+        self.pair_rows = pair_rows[pair_order].astype(np.int32)
+        self.pair_skills = pair_skills[pair_order].astype(np.int32)
+        # Pary wiersza i to pair_starts[i]:pair_starts[i + 1]
+        self.pair_starts = np.concatenate(([0], np.cumsum(np.bincount(self.pair_rows, minlength=len(self.ids)))))
+        self._results = {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def build(cls):
+        """Reads every active job with a salary and its skill links."""
+        watermark = Job.objects.aggregate(mark=Max('updated_at'))['mark']
+        location_names = []
+        ids, salaries, job_types, locations, _ = _read_jobs(Job.objects.filter(HAS_SALARY, is_active=True),
+                                                            location_names)
+        pairs = _read_pairs(JobSkill.objects.filter(
+            Q(job__salary_min__isnull=False) | Q(job__salary_max__isnull=False), job__is_active=True,
+        ))
+        return cls(ids, salaries, job_types, locations, pairs[:, 0], pairs[:, 1], location_names, watermark)
+
+    def refreshed(self):
+        """Snapshot with the jobs changed since the watermark re-read (a full rebuild if counts disagree)."""
+        if self.watermark is None:
+            return self.build()
+        watermark = Job.objects.aggregate(mark=Max('updated_at'))['mark']
+        location_names = list(self.location_names)
+        ids, salaries, job_types, locations, active = _read_jobs(
+            Job.objects.filter(updated_at__gte=self.watermark), location_names, self.location_index,
+        )
+        live = active & ~np.isnan(salaries)
+        keep = ~np.isin(self.ids, ids)
+        keep_pairs = keep[self.pair_rows]
+        live_ids = ids[live].tolist()
+        new_pairs = [
+            _read_pairs(JobSkill.objects.filter(job_id__in=live_ids[offset:offset + CHUNK_SIZE]))
+            for offset in range(0, len(live_ids), CHUNK_SIZE)
+        ]
+        pairs = np.concatenate([
+            np.column_stack((self.ids[self.pair_rows[keep_pairs]], self.pair_skills[keep_pairs])),
+            *new_pairs,
+        ])
+        snapshot = SalarySnapshot(
+            np.concatenate((self.ids[keep], ids[live])),
+            np.concatenate((self.salaries[keep], salaries[live])),
+            np.concatenate((self.job_types[keep], job_types[live])),
+            np.concatenate((self.locations[keep], locations[live])),
+            pairs[:, 0], pairs[:, 1], location_names, watermark or self.watermark,
+        )
+        if Job.objects.filter(HAS_SALARY, is_active=True).count() != len(snapshot):
+            return self.build()
+        return snapshot
+
+    def insights(self, job_types=(), locations=(), skill_id=None, bins=20, max_groups=20):
+        """Salary statistics of the rows matching the filters, overall and per job type, location and skill.
+
+        Results are memoized per snapshot, so repeated slices cost a dict lookup.
+        """
+        key = (tuple(sorted(job_types)), tuple(sorted(locations)), skill_id, bins, max_groups)
+        result = self._results.get(key)
+        if result is None:
+            if len(self._results) >= RESULT_CACHE_SIZE:
+                self._results.clear()
+            result = self._results[key] = self._compute(job_types, locations, skill_id, bins, max_groups)
+        return result
+
+    def _compute(self, job_types, locations, skill_id, bins, max_groups):
+        if job_types or locations or skill_id is not None:
+            mask = np.ones(len(self), dtype=bool)
+            # Tablica przynaleznosci kodow zamiast np.isin - jeden odczyt na wiersz
+            if job_types:
+                mask &= _allowed(len(JOB_TYPES), [JOB_TYPES.index(job_type) for job_type in job_types])[self.job_types]
+            if locations:
+                mask &= _allowed(len(self.location_names), [self.location_index[name] for name in locations
+                                                            if name in self.location_index])[self.locations]
+            if skill_id is not None:
+                has_skill = np.zeros(len(self), dtype=bool)
+                has_skill[self.pair_rows[self.pair_skills == skill_id]] = True
+                mask &= has_skill
+            rows = np.flatnonzero(mask)
+            pairs = self._pairs_of(rows)
+            values, job_type_codes, location_codes = self.salaries[rows], self.job_types[rows], self.locations[rows]
+        else:
+            pairs = slice(None)
+            values, job_type_codes, location_codes = self.salaries, self.job_types, self.locations
+        return {
+            'count': len(values),
+            'mean': _money(values.mean()) if len(values) else None,
+            'percentiles': {name: _money(_quantile(values, q)) for name, q in QUANTILES.items()},
+            'histogram': _histogram(values, bins),
+            'by_job_type': _groups(job_type_codes, values, max_groups, 'job_type', JOB_TYPES),
+            'by_location': _groups(location_codes, values, max_groups, 'location', self.location_names),
+            'by_skill': _groups(self.pair_skills[pairs], self.salaries[self.pair_rows[pairs]], max_groups, 'skill'),
+        }
+
+    def _pairs_of(self, rows):
+        # Indeksy par wybranych wierszy bez przegladania wszystkich par - koszt rosnie z wielkoscia wycinka
+        starts = self.pair_starts[rows]
+        lengths = self.pair_starts[rows + 1] - starts
+        return np.repeat(starts - (np.cumsum(lengths) - lengths), lengths) + np.arange(lengths.sum())
+
+
+def _allowed(size, codes):
+    allowed = np.zeros(size, dtype=bool)
+    allowed[codes] = True
+    return allowed
+
+
+def _read_jobs(queryset, location_names, location_index=None):
+    """Salary columns of ``queryset``; new locations are appended to ``location_names``."""
+    location_index = dict(location_index or {})
+    rows = queryset.order_by().values_list(
+        'pk', Cast('salary_min', FloatField()), Cast('salary_max', FloatField()), 'job_type', 'location', 'is_active',
+    ).iterator(chunk_size=BATCH_SIZE)
+    type_codes = {job_type: code for code, job_type in enumerate(JOB_TYPES)}
+    parts = []
+    while batch := list(islice(rows, BATCH_SIZE)):
+        ids, lows, highs, job_types, locations, active = zip(*batch)
+        codes = []
+        for name in locations:
+            code = location_index.get(name)
+            if code is None:
+                code = location_index[name] = len(location_names)
+                location_names.append(name)
+            codes.append(code)
+        parts.append((
+            np.array(ids, dtype=np.int64),
+            _midpoints(np.array(lows, dtype=np.float64), np.array(highs, dtype=np.float64)),
+            np.array([type_codes.get(job_type, 0) for job_type in job_types], dtype=np.int8),
+            np.array(codes, dtype=np.int32),
+            np.array(active, dtype=bool),
+        ))
+    if not parts:
+        return (np.empty(0, dtype=np.int64), np.empty(0), np.empty(0, dtype=np.int8), np.empty(0, dtype=np.int32),
+                np.empty(0, dtype=bool))
+    return tuple(np.concatenate(column) for column in zip(*parts))
+
+
+def _read_pairs(queryset):
+    rows = queryset.order_by().values_list('job_id', 'skill_id').iterator(chunk_size=BATCH_SIZE)
+    parts = [np.empty((0, 2), dtype=np.int64)]
+    while batch := list(islice(rows, BATCH_SIZE)):
+        parts.append(np.array(batch, dtype=np.int64))
+    return np.concatenate(parts)
+
+
+def _midpoints(lows, highs):
+    # Widelki -> srodek; jedna granica -> ona sama; brak obu -> NaN (oferta wypada ze snapshotu)
+    return np.where(np.isnan(lows), highs, np.where(np.isnan(highs), lows, (lows + highs) / 2))
+
+
+def _quantile(values, q):
+    """Linear-interpolated quantile of an ascending array (numpy's default method, without sorting)."""
+    if not len(values):
+        return None
+    position = q * (len(values) - 1)
+    low = int(position)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (position - low)
+
+
+def _histogram(values, bins):
+    if not len(values):
+        return {'edges': [], 'counts': []}
+    edges = np.linspace(values[0], values[-1], bins + 1)
+    # Przedzialy domkniete z lewej, ostatni obustronnie - jak np.histogram
+    bounds = np.concatenate(([0], np.searchsorted(values, edges[1:-1], side='left'), [len(values)]))
+    return {'edges': [_money(edge) for edge in edges], 'counts': np.diff(bounds).tolist()}
+
+
+def _groups(codes, values, limit, name, labels=None):
+    """Count and quartiles of the ``limit`` largest groups; ``values`` ascending, aligned with ``codes``.
+
+    Groups are labelled ``labels[code]`` under ``name``, or with the raw code without ``labels``.
+    """
+    if not len(codes):
+        return []
+    counts = np.bincount(codes)
+    top = np.argsort(-counts, kind='stable')[:limit]
+    top = top[counts[top] > 0]
+    # Pozostale grupy trafiaja do kubla ``len(top)`` na koncu - bez kosztownego wycinania maska
+    remap = np.full(len(counts), len(top), dtype=np.int8 if len(top) < 127 else np.int16)
+    remap[top] = np.arange(len(top))
+    sizes = counts[top]
+    # Stabilne sortowanie malych liczb (radix) zachowuje rosnace wynagrodzenia w grupie
+    order = np.argsort(remap[codes], kind='stable')[:sizes.sum()]
+    grouped = values[order]
+    starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    stats = {stat: _group_quantile(grouped, starts, sizes, q) for stat, q in GROUP_QUANTILES.items()}
+    return [
+        {
+            name: labels[code] if labels is not None else int(code),
+            'count': int(size),
+            **{stat: _money(column[index]) for stat, column in stats.items()},
+        }
+        for index, (code, size) in enumerate(zip(top, sizes))
+    ]
+
+
+def _group_quantile(grouped, starts, sizes, q):
+    position = starts + q * (sizes - 1)
+    low = np.floor(position).astype(np.int64)
+    high = np.minimum(low + 1, starts + sizes - 1)
+    return grouped[low] + (grouped[high] - grouped[low]) * (position - low)
+
+
+def _money(value):
+    return None if value is None else round(float(value), 2)
+
+
+_snapshot = None
+_lock = threading.Lock()
+
+
+def get_snapshot():
+    """The process-wide snapshot, built on first use and refreshed when older than the interval."""
+    global _snapshot
+    snapshot = _snapshot
+    if snapshot is None:
+        with _lock:
+            if _snapshot is None:
+                _snapshot = _warmed(SalarySnapshot.build())
+            return _snapshot
+    if time.monotonic() - snapshot.built_at >= refresh_interval() and _lock.acquire(blocking=False):
+        # Jeden watek odswieza, pozostale odpowiadaja z poprzedniego snapshotu
+        try:
+            _snapshot = snapshot = _warmed(snapshot.refreshed())
+        finally:
+            _lock.release()
+    return snapshot
+
+
+def _warmed(snapshot):
+    # Strona bez filtrow to najczestsze i najdrozsze zapytanie - liczona przed podmiana snapshotu
+    snapshot.insights(max_groups=getattr(settings, 'JOBS_INSIGHTS_MAX_GROUPS', 20))
+    return snapshot
+
+
+def reset_snapshot():
+    """Drops this process's snapshot; the next request rebuilds it."""
+    global _snapshot
+    with _lock:
+        _snapshot = None
+
+
+def salary_insights(job_type=(), location=(), skill=None, bins=20):
+    """Salary insights payload; ``skill`` is a skill key (see apps.jobs.skills)."""
+    snapshot = get_snapshot()
+    skill_id = None
+    if skill:
+        # Nieznana umiejetnosc - id, ktorego nie ma zaden wiersz
+        skill_id = Skill.objects.filter(key=skill).values_list('pk', flat=True).first() or -1
+    data = snapshot.insights(job_type, location, skill_id, bins, getattr(settings, 'JOBS_INSIGHTS_MAX_GROUPS', 20))
+    names = dict(Skill.objects.filter(pk__in=[row['skill'] for row in data['by_skill']]).values_list('pk', 'name'))
+    # Wynik jest zapamietany w snapshocie - nazwy wstawiane do kopii
+    return {**data, 'by_skill': [{**row, 'skill': names.get(row['skill'], '')} for row in data['by_skill']]}
@@ -0,0 +1,107 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.jobs.models import Job, SavedJob
+
+User = get_user_model()
+
+AUDITED_TABLES = ('jobs_', 'users_')
+
+# Zapytania GET wysylane przez widoki jobs/users; {job} podmieniane na id oferty
+ENDPOINTS = [
+    '/api/jobs/',
+    '/api/jobs/?page_size=1',
+    '/api/jobs/?q=python',
+    '/api/jobs/?skills_all=python,django',
+    '/api/jobs/?sort=popular',
+    '/api/jobs/?near=Warsaw&radius_km=100&job_type=full_time',
+    '/api/jobs/locations/',
+    '/api/jobs/{job}/',
+    '/api/jobs/saved/',
+    '/api/jobs/{job}/check-saved/',
+    '/api/users/profile/',
+]
+
+# "SCAN t USING INDEX i" to odczyt po indeksie (np. ORDER BY ... LIMIT), pelny skan nie ma "USING"
+_SQLITE_SCAN = re.compile(r'\bSCAN (?:TABLE )?(\w+)(?:\s+(?:AS \w+\s+)?USING)?')
+_POSTGRES_SCAN = re.compile(r'Seq Scan on (\w+)')
+
+
+class Command(BaseCommand):
+    help = 'Run EXPLAIN on the queries issued by the jobs/users views and flag full table scans'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fail-on-scan', action='store_true',
+                            help='Exit with an error if any full table scan is found')
+        parser.add_argument('--verbose-plans', action='store_true',
+                            help='Print the full plan for every query')
+
+    def handle(self, *args, **options):
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            raise CommandError(f'Unsupported database backend: {connection.vendor}')
+
+        findings = []
+        with transaction.atomic():
+            client = self._prepare_client()
+            for template in ENDPOINTS:
+                path = template.format(job=self.job.pk)
+                with CaptureQueriesContext(connection) as captured:
+                    response = client.get(path)
+                self.stdout.write(f'{path} -> {response.status_code}, {len(captured)} queries')
+                for query in captured.captured_queries:
+                    findings.extend(self._audit(path, query['sql'], options['verbose_plans']))
+            transaction.set_rollback(True)
+
+        if not findings:
+            self.stdout.write(self.style.SUCCESS('No full table scans found'))
+            return
+        for path, table, sql in findings:
+            self.stdout.write(self.style.WARNING(f'FULL SCAN on {table} ({path}): {sql}'))
+        if options['fail_on_scan']:
+            raise CommandError(f'{len(findings)} queries use full table scans')
+
+    def _prepare_client(self):
+        user = User.objects.create_user(
+            username='plan-audit@fluffyjobs.com', email='plan-audit@fluffyjobs.com', password='audit'
+        )
+        self.job = Job.objects.create(
+            title='Python Developer', company='TechCorp', description='Audit job.',
+            requirements='Python', job_type='full_time', location='Warsaw, Poland', posted_by=user,
+        )
+        SavedJob.objects.create(user=user, job=self.job)
+        client = APIClient(SERVER_NAME='localhost')
+        client.force_authenticate(user)
+        return client
+
+    def _audit(self, path, sql, verbose):
+        if not sql.lstrip().upper().startswith('SELECT'):
+            return []
+        plan = self._explain(sql)
+        if verbose:
+            self.stdout.write(f'  {sql}\n    ' + '\n    '.join(plan.splitlines()))
+        return [
+            (path, table, sql)
+            for table in dict.fromkeys(self._scanned_tables(plan))
+            if table.startswith(AUDITED_TABLES)
+        ]
+
+    def _scanned_tables(self, plan):
+        if connection.vendor == 'postgresql':
+            return _POSTGRES_SCAN.findall(plan)
+        return [
+            match.group(1)
+            for match in _SQLITE_SCAN.finditer(plan)
+            if 'USING' not in match.group(0)
+        ]
+
+    def _explain(self, sql):
+        prefix = 'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else 'EXPLAIN '
+        with connection.cursor() as cursor:
+            cursor.execute(prefix + sql)
+            rows = cursor.fetchall()
+        return '\n'.join(str(row[-1]) for row in rows)
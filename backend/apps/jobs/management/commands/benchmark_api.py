@@ -0,0 +1,427 @@
+import http.client
+import json
+import platform
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+import tracemalloc
+from wsgiref.simple_server import WSGIRequestHandler, make_server
+
+import django
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import URLPattern, URLResolver, get_resolver
+from django.utils import timezone
+
+from apps.analytics.rollups import refresh as refresh_rollups
+from apps.jobs.cache import get_cache
+from apps.jobs.feed import feed_cache_key
+from apps.jobs.models import Job, JobApplication, SavedJob
+from apps.jobs.similar import refresh_similar
+from apps.jobs.synthetic import generate_dataset
+from apps.payments.models import Payment
+from apps.tasks.models import Task
+from apps.users.tokens import tokens_for_user
+
+User = get_user_model()
+
+HOST = 'localhost'
+PASSWORD = 'loadgen'
+
+# Endpointy wolajace zewnetrzne API - bez mockow nie da sie ich rzetelnie zmierzyc
+SKIPPED = {
+    'google-auth': 'calls the Google userinfo API',
+    'create_checkout_session': 'calls the Stripe API',
+    'create_payment_intent': 'calls the Stripe API',
+    'stripe_webhook': 'needs payloads signed with the Stripe webhook secret',
+    'application-resume': 'synthetic applications have no resume files on disk',
+}
+
+RESUME = b'%PDF-1.4 benchmark resume ' + b'x' * 64 * 1024
+
+
+class Call:
+    def __init__(self, method, path, data=None, token=None, after=None, multipart=False):
+        self.method = method
+        self.path = path
+        self.data = data
+        self.token = token
+        self.after = after
+        self.multipart = multipart
+
+    def body(self):
+        if self.multipart:
+            return encode_multipart(BOUNDARY, self.data), MULTIPART_CONTENT
+        return json.dumps(self.data or {}), 'application/json'
+
+
+class Command(BaseCommand):
+    help = ('Benchmark every API endpoint on a synthetic dataset, in-process and through '
+            'a local WSGI server, and write latency/query/allocation results as JSON')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--jobs', type=int, default=5000)
+        parser.add_argument('--saved', type=int, default=2000)
+        parser.add_argument('--applications', type=int, default=500)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--mode', choices=['all', 'inprocess', 'wsgi'], default='all')
+        parser.add_argument('--only', action='append', dest='only',
+                            help='Run only scenarios whose name starts with this prefix')
+        parser.add_argument('--cold-cache', action='store_true',
+                            help='Clear the response cache before every request')
+        parser.add_argument('--output', help='Write results to this JSON file')
+        parser.add_argument('--compare', help='Baseline JSON file to compare the results against')
+        parser.add_argument('--threshold', type=float, default=20.0,
+                            help='p50 regression (in percent) reported by --compare')
+        parser.add_argument('--fail-on-regression', action='store_true')
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('--iterations must be positive')
+        self.options = options
+        baseline = self._load_baseline(options['compare']) if options['compare'] else None
+
+        # Osobna baza testowa - benchmark nie dotyka danych deweloperskich,
+        # a SQLite w pamieci (shared cache) widzi tez watek serwera WSGI
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        # Tak samo pliki - CV z jobs.apply trafiaja do katalogu tymczasowego, nie do MEDIA_ROOT
+        media_root = tempfile.mkdtemp(prefix='benchmark-media-')
+        media_override = override_settings(MEDIA_ROOT=media_root)
+        media_override.enable()
+        try:
+            self._prepare()
+            results = []
+            modes = ['inprocess', 'wsgi'] if options['mode'] == 'all' else [options['mode']]
+            for mode in modes:
+                results.extend(self._run_mode(mode))
+        finally:
+            media_override.disable()
+            shutil.rmtree(media_root, ignore_errors=True)
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        report = {'meta': self._meta(), 'results': results, 'skipped': self.skipped}
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                json.dump(report, handle, indent=2)
+            self.stdout.write(f'Results written to {options["output"]}')
+        if baseline is not None:
+            self._compare(baseline, results)
+
+    def _prepare(self):
+        options = self.options
+        started = time.perf_counter()
+        users, jobs = generate_dataset(
+            options['users'], options['jobs'], options['saved'], options['applications'], seed=options['seed']
+        )
+        if not jobs:
+            raise CommandError('--jobs must be positive')
+        self.stdout.write(f'Generated {len(users)} users and {len(jobs)} jobs '
+                          f'in {time.perf_counter() - started:.1f}s')
+
+        # Najbardziej aktywny uzytkownik - najgorszy przypadek dla list zapisanych ofert
+        busiest = SavedJob.objects.values('user').annotate(saves=Count('pk')).order_by('-saves').first()
+        self.user = User.objects.get(pk=busiest['user']) if busiest else users[0]
+        self.token = str(tokens_for_user(self.user).access_token)
+        self.job = Job.objects.filter(is_active=True).order_by('-created_at').first()
+        self.unsaved_job = Job.objects.filter(is_active=True).exclude(
+            pk__in=SavedJob.objects.filter(user=self.user).values('job')
+        ).first()
+        self.unapplied_job = Job.objects.filter(is_active=True).exclude(
+            pk__in=JobApplication.objects.filter(applicant=self.user).values('job')
+        ).first()
+        self.counter = 0
+        self.scenarios = self._scenarios()
+        self.skipped = self._uncovered()
+
+    def _scenarios(self):
+        """(name, url name, factory) - factory builds one Call, doing untimed setup."""
+        job, token = self.job, self.token
+        page = Client(SERVER_NAME=HOST).get('/api/jobs/').json()
+        next_page = page['next'].split(HOST, 1)[1] if page.get('next') else '/api/jobs/'
+        page_ids = [row['id'] for row in page['results']]
+
+        def unsave_call():
+            SavedJob.objects.get_or_create(user=self.user, job=self.unsaved_job)
+            return Call('DELETE', f'/api/jobs/{self.unsaved_job.pk}/unsave/', token=token)
+
+        # Dashboard i podobne oferty czytaja gotowe wyniki - liczone raz, poza pomiarem
+        refresh_rollups()
+        refresh_similar()
+        employer_token = str(tokens_for_user(job.posted_by).access_token)
+
+        def feed_uncached_call():
+            # Bez wpisu w cache - ranking liczony od zera, jak po save/unsave
+            get_cache().delete(feed_cache_key(self.user.pk))
+            return Call('GET', '/api/jobs/feed/', token=token)
+
+        def insights_filtered_call():
+            # Za kazdym razem inny wycinek - bez trafien w wyniki zapamietane w snapshocie
+            self.counter += 1
+            bins = self.counter % 100 + 1
+            return Call('GET', f'/api/jobs/insights/salaries/?job_type=full_time&skill=python&bins={bins}')
+
+        def apply_call():
+            # To samo CV w kazdym wywolaniu - po pierwszym zapisie plik jest deduplikowany
+            return Call('POST', f'/api/jobs/{self.unapplied_job.pk}/apply/', {
+                'cover_letter': 'Benchmark application.',
+                'resume': SimpleUploadedFile('cv.pdf', RESUME, 'application/pdf'),
+            }, token=token, multipart=True, after=lambda: JobApplication.objects.filter(
+                job=self.unapplied_job, applicant=self.user).delete())
+
+        def register_call():
+            self.counter += 1
+            email = f'bench{self.counter}@loadgen.fluffyjobs.test'
+            return Call('POST', '/api/users/register/', {
+                'email': email, 'password': PASSWORD, 'password_confirm': PASSWORD,
+                'first_name': 'Bench', 'last_name': 'User', 'user_type': 'jobseeker',
+            }, after=lambda: User.objects.filter(email=email).delete())
+
+        def confirm_payment_call():
+            # Widok tylko kolejkuje zadanie - mierzymy enqueue, worker nie jest uruchamiany
+            self.counter += 1
+            intent_id = f'pi_bench_{self.counter}'
+            return Call('POST', '/api/payments/confirm-payment/', {'payment_intent_id': intent_id}, token=token,
+                        after=lambda: Task.objects.filter(idempotency_key=f'confirm-payment:{intent_id}').delete())
+
+        def payment_status_call():
+            Payment.objects.get_or_create(payment_intent_id='pi_bench_status', defaults={
+                'status': 'succeeded', 'amount': 999, 'currency': 'usd', 'last_event_at': timezone.now(),
+            })
+            return Call('GET', '/api/payments/status/pi_bench_status/')
+
+        def logout_call():
+            return Call('POST', '/api/users/logout/', {'refresh': str(tokens_for_user(self.user))},
+                        token=token)
+
+        credentials = {'email': self.user.email, 'password': PASSWORD}
+        return [
+            ('jobs.list', 'job-list-create', lambda: Call('GET', '/api/jobs/')),
+            ('jobs.list.authenticated', 'job-list-create', lambda: Call('GET', '/api/jobs/', token=token)),
+            ('jobs.list.page2', 'job-list-create', lambda: Call('GET', next_page)),
+            ('jobs.list.search', 'job-list-create', lambda: Call('GET', '/api/jobs/?q=senior+python')),
+            ('jobs.list.filtered', 'job-list-create', lambda: Call(
+                'GET', '/api/jobs/?job_type=full_time&location=Warsaw,+Poland&salary_min=15000')),
+            ('jobs.list.near', 'job-list-create', lambda: Call(
+                'GET', '/api/jobs/?near=Warsaw&radius_km=100&job_type=full_time&salary_min=15000')),
+            ('jobs.locations', 'job-locations', lambda: Call('GET', '/api/jobs/locations/')),
+            ('jobs.detail', 'job-detail', lambda: Call('GET', f'/api/jobs/{job.pk}/', token=token)),
+            ('jobs.similar', 'job-similar', lambda: Call('GET', f'/api/jobs/{job.pk}/similar/')),
+            ('jobs.apply', 'apply-job', apply_call),
+            ('jobs.feed', 'job-feed', lambda: Call('GET', '/api/jobs/feed/', token=token)),
+            ('jobs.feed.uncached', 'job-feed', feed_uncached_call),
+            ('jobs.insights', 'salary-insights', lambda: Call('GET', '/api/jobs/insights/salaries/')),
+            ('jobs.insights.filtered', 'salary-insights', insights_filtered_call),
+            ('jobs.saved', 'saved-jobs-list', lambda: Call('GET', '/api/jobs/saved/', token=token)),
+            ('jobs.saved_ids', 'saved-job-ids', lambda: Call('GET', '/api/jobs/saved/ids/', token=token)),
+            ('jobs.saved_state', 'saved-job-states', lambda: Call(
+                'POST', '/api/jobs/saved/state/', {'job_ids': page_ids}, token=token)),
+            ('jobs.save', 'save-job', lambda: Call(
+                'POST', '/api/jobs/save/', {'job_id': self.unsaved_job.pk}, token=token,
+                after=lambda: SavedJob.objects.filter(user=self.user, job=self.unsaved_job).delete())),
+            ('jobs.unsave', 'unsave-job', unsave_call),
+            ('jobs.check_saved', 'check-saved-job', lambda: Call(
+                'GET', f'/api/jobs/{job.pk}/check-saved/', token=token)),
+            ('auth.login', 'login', lambda: Call('POST', '/api/auth/login/', credentials)),
+            ('auth.refresh', 'token-refresh', lambda: Call(
+                'POST', '/api/auth/refresh/', {'refresh': str(tokens_for_user(self.user))})),
+            ('users.register', 'users:register', register_call),
+            ('users.login', 'users:login', lambda: Call('POST', '/api/users/login/', credentials)),
+            ('users.logout', 'users:logout', logout_call),
+            ('users.profile', 'users:profile', lambda: Call('GET', '/api/users/profile/', token=token)),
+            ('analytics.employer', 'employer-dashboard', lambda: Call(
+                'GET', '/api/analytics/employer/', token=employer_token)),
+            ('payments.config', 'stripe_config', lambda: Call('GET', '/api/payments/config/')),
+            ('payments.test_cards', 'get_test_cards', lambda: Call('GET', '/api/payments/test-cards/')),
+            ('payments.confirm', 'confirm_payment', confirm_payment_call),
+            ('payments.status', 'payment_status', payment_status_call),
+            ('payments.history', 'payment_history', lambda: Call('GET', '/api/payments/history/', token=token)),
+        ]
+
+    def _uncovered(self):
+        covered = {url_name for _, url_name, _ in self.scenarios}
+        skipped = []
+        for url_name in _api_url_names(get_resolver()):
+            if url_name in covered:
+                continue
+            reason = SKIPPED.get(url_name, 'no benchmark scenario')
+            skipped.append({'endpoint': url_name, 'reason': reason})
+            self.stdout.write(self.style.WARNING(f'Skipping {url_name}: {reason}'))
+        return skipped
+
+    def _run_mode(self, mode):
+        send = self._send_inprocess if mode == 'inprocess' else None
+        server = None
+        if mode == 'wsgi':
+            server = make_server('127.0.0.1', 0, WSGIHandler(), handler_class=_QuietHandler)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            port = server.server_address[1]
+            send = lambda call: self._send_wsgi(port, call)
+        else:
+            self.client = Client(SERVER_NAME=HOST)
+
+        results = []
+        try:
+            for name, url_name, factory in self.scenarios:
+                if self.options['only'] and not name.startswith(tuple(self.options['only'])):
+                    continue
+                result = self._measure(mode, name, url_name, factory, send)
+                results.append(result)
+                line = (f'[{mode:9}] {name:26} {result["status"]} p50={result["p50_ms"]:8.2f}ms '
+                        f'p99={result["p99_ms"]:8.2f}ms')
+                if result['queries'] is not None:
+                    line += f' queries={result["queries"]} alloc={result["alloc_peak_kb"]}KB'
+                self.stdout.write(line)
+        finally:
+            if server is not None:
+                server.shutdown()
+                server.server_close()
+        return results
+
+    def _measure(self, mode, name, url_name, factory, send):
+        cache = get_cache()
+        cache.clear()
+        # Rozgrzewka: pierwsze wywolanie laduje moduly i wypelnia cache
+        call = factory()
+        status = self._timed(send, call)[0]
+        timings = []
+        for _ in range(self.options['iterations']):
+            if self.options['cold_cache']:
+                cache.clear()
+            call = factory()
+            timings.append(self._timed(send, call)[1])
+
+        queries = alloc_peak_kb = None
+        if mode == 'inprocess':
+            # Zapytania i alokacje osobno - ich pomiar zaburza czasy
+            call = factory()
+            with CaptureQueriesContext(connection) as captured:
+                self._timed(send, call)
+            queries = len(captured)
+            call = factory()
+            tracemalloc.start()
+            self._timed(send, call)
+            alloc_peak_kb = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+            tracemalloc.stop()
+
+        timings.sort()
+        return {
+            'scenario': name,
+            'endpoint': url_name,
+            'mode': mode,
+            'method': call.method,
+            'path': call.path,
+            'status': status,
+            'iterations': len(timings),
+            'p50_ms': round(statistics.median(timings), 3),
+            'p99_ms': round(_percentile(timings, 99), 3),
+            'mean_ms': round(statistics.fmean(timings), 3),
+            'queries': queries,
+            'alloc_peak_kb': alloc_peak_kb,
+        }
+
+    def _timed(self, send, call):
+        started = time.perf_counter()
+        status = send(call)
+        elapsed = (time.perf_counter() - started) * 1000
+        if call.after:
+            call.after()
+        return status, elapsed
+
+    def _send_inprocess(self, call):
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {call.token}'} if call.token else {}
+        if call.method == 'GET':
+            response = self.client.get(call.path, **headers)
+        else:
+            response = self.client.generic(call.method, call.path, *call.body(), **headers)
+        return response.status_code
+
+    def _send_wsgi(self, port, call):
+        headers = {'Host': HOST}
+        body = None
+        if call.token:
+            headers['Authorization'] = f'Bearer {call.token}'
+        if call.method != 'GET':
+            body, headers['Content-Type'] = call.body()
+        conn = http.client.HTTPConnection('127.0.0.1', port)
+        try:
+            conn.request(call.method, call.path, body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            return response.status
+        finally:
+            conn.close()
+
+    def _meta(self):
+        options = self.options
+        return {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'platform': platform.platform(),
+            'dataset': {key: options[key] for key in ('users', 'jobs', 'saved', 'applications', 'seed')},
+            'iterations': options['iterations'],
+            'cold_cache': options['cold_cache'],
+        }
+
+    def _load_baseline(self, path):
+        try:
+            with open(path) as handle:
+                return json.load(handle)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f'Cannot read baseline {path}: {exc}')
+
+    def _compare(self, baseline, results):
+        previous = {(row['scenario'], row['mode']): row for row in baseline.get('results', [])}
+        regressions = []
+        for row in results:
+            old = previous.get((row['scenario'], row['mode']))
+            if old is None:
+                continue
+            change = (row['p50_ms'] - old['p50_ms']) / max(old['p50_ms'], 0.001) * 100
+            line = (f'[{row["mode"]:9}] {row["scenario"]:26} p50 {old["p50_ms"]:8.2f} -> '
+                    f'{row["p50_ms"]:8.2f}ms ({change:+.1f}%)')
+            if old.get('queries') is not None and row['queries'] is not None \
+                    and row['queries'] != old['queries']:
+                line += f' queries {old["queries"]} -> {row["queries"]}'
+            if change > self.options['threshold']:
+                regressions.append(row['scenario'])
+                self.stdout.write(self.style.WARNING(line))
+            else:
+                self.stdout.write(line)
+        if regressions and self.options['fail_on_regression']:
+            raise CommandError(f'{len(regressions)} scenarios regressed by more than '
+                               f'{self.options["threshold"]}%: {", ".join(regressions)}')
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def _api_url_names(resolver, namespace=''):
+    for pattern in resolver.url_patterns:
+        if isinstance(pattern, URLResolver):
+            if pattern.app_name == 'admin':
+                continue
+            prefix = f'{pattern.namespace}:' if pattern.namespace else ''
+            yield from _api_url_names(pattern, namespace + prefix)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            yield namespace + pattern.name
+
+
+def _percentile(sorted_values, percent):
+    # Metoda najblizszej rangi - przy malej liczbie probek p99 to wartosc maksymalna
+    index = max(0, min(len(sorted_values) - 1, -(-len(sorted_values) * percent // 100) - 1))
+    return sorted_values[int(index)]
@@ -0,0 +1,76 @@
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from apps.jobs.models import Job
+from apps.jobs.synthetic import generate_jobs
+from apps.jobs.views import JobListCreateView
+from fluffy_jobs.renderers import FastJSONRenderer
+
+User = get_user_model()
+
+DEFAULT_PAGE_SIZES = [20, 100, 1000, 5000]
+
+
+class Command(BaseCommand):
+    help = 'Compare CPU time of the stock and orjson-backed JSON renderers on job list payloads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=0,
+                            help='Synthetic jobs to generate for the run (rolled back afterwards)')
+        parser.add_argument('--page-size', type=int, action='append', dest='page_sizes')
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        page_sizes = options['page_sizes'] or DEFAULT_PAGE_SIZES
+        with transaction.atomic():
+            if options['jobs']:
+                self._generate(options['jobs'], options['seed'])
+            self.stdout.write(f'Active jobs: {Job.objects.filter(is_active=True).count()}')
+            self.stdout.write(f'orjson: {"yes" if FastJSONRenderer().uses_orjson() else "no (stdlib fallback)"}')
+
+            stock, fast = JSONRenderer(), FastJSONRenderer()
+            for page_size in page_sizes:
+                data = self._payload(page_size)
+                body = stock.render(data)
+                if fast.render(data) != body:
+                    self.stdout.write(self.style.WARNING(f'page_size={page_size}: renderers disagree'))
+                before = self._measure(lambda: stock.render(data), options['repeat'])
+                after = self._measure(lambda: fast.render(data), options['repeat'])
+                streamed = self._measure(lambda: b''.join(fast.render_chunks(data, 'results')), options['repeat'])
+                self.stdout.write(
+                    f'{len(data["results"]):6} jobs {len(body) / 1024:9.1f}KB | '
+                    f'JSONRenderer cpu p50={before:8.2f}ms | FastJSONRenderer cpu p50={after:8.2f}ms '
+                    f'x{before / max(after, 0.001):.1f} | streamed p50={streamed:8.2f}ms'
+                )
+            transaction.set_rollback(True)
+
+    def _generate(self, count, seed):
+        owner, _ = User.objects.get_or_create(
+            email='benchmark@fluffyjobs.com',
+            defaults={'username': 'benchmark@fluffyjobs.com'}
+        )
+        started = time.perf_counter()
+        jobs = generate_jobs(count, [owner], seed=seed)
+        self.stdout.write(f'Generated and indexed {len(jobs)} jobs in {time.perf_counter() - started:.1f}s')
+
+    def _payload(self, page_size):
+        # Dane odpowiedzi przed renderowaniem - to samo, co dostaje renderer w JobListCreateView
+        with override_settings(JOBS_MAX_PAGE_SIZE=page_size):
+            request = APIRequestFactory(SERVER_NAME='localhost').get('/api/jobs/', {'page_size': page_size})
+            return JobListCreateView.as_view()(request).data
+
+    def _measure(self, func, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.process_time()
+            func()
+            timings.append((time.process_time() - started) * 1000)
+        return statistics.median(timings)
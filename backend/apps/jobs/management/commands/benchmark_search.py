@@ -0,0 +1,77 @@
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.jobs.models import Job
+from apps.jobs.search import search_jobs
+from apps.jobs.synthetic import generate_jobs
+
+User = get_user_model()
+
+DEFAULT_QUERIES = ['python', 'senior react', 'lodz', 'kubernetes terraform', 'dev', 'zabka']
+
+
+class Command(BaseCommand):
+    help = 'Benchmark indexed job search against a full scan of active jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=0,
+                            help='Synthetic jobs to generate for the run (rolled back afterwards)')
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--limit', type=int, default=50)
+        parser.add_argument('--query', action='append', dest='queries')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        queries = options['queries'] or DEFAULT_QUERIES
+        with transaction.atomic():
+            if options['jobs']:
+                self._generate(options['jobs'], options['seed'])
+            total = Job.objects.filter(is_active=True).count()
+            self.stdout.write(f'Active jobs: {total}')
+
+            for query in queries:
+                indexed = self._measure(lambda: self._indexed(query, options['limit']), options['repeat'])
+                scan = self._measure(lambda: self._full_scan(query, options['limit']), options['repeat'])
+                self.stdout.write(
+                    f'{query!r:28} indexed p50={indexed[0]:8.2f}ms p95={indexed[1]:8.2f}ms | '
+                    f'full scan p50={scan[0]:8.2f}ms p95={scan[1]:8.2f}ms | '
+                    f'speedup x{scan[0] / max(indexed[0], 0.001):.1f}'
+                )
+            transaction.set_rollback(True)
+
+    def _generate(self, count, seed):
+        owner, _ = User.objects.get_or_create(
+            email='benchmark@fluffyjobs.com',
+            defaults={'username': 'benchmark@fluffyjobs.com'}
+        )
+        started = time.perf_counter()
+        jobs = generate_jobs(count, [owner], seed=seed)
+        self.stdout.write(f'Generated and indexed {len(jobs)} jobs in {time.perf_counter() - started:.1f}s')
+
+    def _indexed(self, query, limit):
+        return list(search_jobs(Job.objects.filter(is_active=True), query)[:limit])
+
+    def _full_scan(self, query, limit):
+        # Odpowiednik JobContext.searchJobs: pobierz wszystko i filtruj w pamieci
+        term = query.lower()
+        matches = [
+            job for job in Job.objects.filter(is_active=True)
+            if term in job.title.lower() or term in job.company.lower()
+            or term in job.location.lower() or term in job.description.lower()
+            or term in job.requirements.lower()
+        ]
+        return matches[:limit]
+
+    def _measure(self, func, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        return statistics.median(timings), p95
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth import get_user_model
+
+from apps.jobs.synthetic import generate_dataset
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Generate a deterministic synthetic dataset (users, jobs, saved jobs, applications)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--jobs', type=int, default=10000)
+        parser.add_argument('--saved', type=int, default=20000)
+        parser.add_argument('--applications', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        if options['users'] < 1:
+            raise CommandError('At least one user is required to post jobs')
+        if User.objects.filter(email__endswith=f'.s{options["seed"]}@loadgen.fluffyjobs.test').exists():
+            raise CommandError(f'Data for seed {options["seed"]} already exists, pick another --seed')
+
+        users, jobs = generate_dataset(
+            options['users'], options['jobs'], options['saved'], options['applications'], seed=options['seed']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {len(users)} users and {len(jobs)} jobs '
+            f'(up to {options["saved"]} saved jobs, {options["applications"]} applications)'
+        ))
@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.jobs.cache import invalidate_jobs
+from apps.jobs.geo import backfill
+from apps.jobs.models import Job
+
+
+class Command(BaseCommand):
+    help = 'Set coordinates of jobs from the bundled gazetteer'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help='Geocode every job again, not only those without coordinates')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        updated = backfill(Job, only_missing=not options['all'])
+        # UPDATE omija sygnaly - listy z ?near= trzeba odswiezyc recznie
+        invalidate_jobs()
+        self.stdout.write(self.style.SUCCESS(
+            f'Geocoded {updated} jobs in {time.perf_counter() - started:.2f}s'
+        ))
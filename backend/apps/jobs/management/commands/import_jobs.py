@@ -0,0 +1,68 @@
+import os
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.jobs.importing import Checkpoint, JobImporter, detect_format, iter_records
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Stream a JSONL/CSV job feed into the database with batched upserts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Path to a .jsonl or .csv feed')
+        parser.add_argument('--format', choices=['jsonl', 'csv'])
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument('--owner', default='admin@fluffyjobs.com',
+                            help='Email of the user the imported jobs are posted by')
+        parser.add_argument('--checkpoint', help='Checkpoint file (default: <path>.checkpoint)')
+        parser.add_argument('--resume', action='store_true',
+                            help='Continue after the last committed chunk of a previous run')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f'File not found: {path}')
+        try:
+            fmt = options['format'] or detect_format(path)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        owner = self._get_owner(options['owner'])
+        checkpoint = Checkpoint(options['checkpoint'] or f'{path}.checkpoint', path)
+        if options['resume']:
+            try:
+                resumed = checkpoint.load()
+            except ValueError as e:
+                raise CommandError(str(e))
+            if resumed:
+                self.stdout.write(f'Resuming after row {checkpoint.rows}')
+        else:
+            checkpoint.clear()
+
+        importer = JobImporter(owner, chunk_size=options['chunk_size'])
+        records = iter_records(path, fmt, start_row=checkpoint.rows, start_offset=checkpoint.offset)
+        processed, elapsed = importer.run(records, checkpoint=checkpoint, progress=self._progress)
+        checkpoint.clear()
+
+        rate = processed / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {processed} jobs ({importer.created} created, {importer.updated} updated, '
+            f'{importer.skipped} skipped) in {elapsed:.1f}s - {rate:.0f} rows/sec'
+        ))
+
+    def _get_owner(self, email):
+        user, created = User.objects.get_or_create(
+            email=email,
+            defaults={'username': email, 'is_staff': True, 'is_superuser': True}
+        )
+        if created:
+            user.set_unusable_password()
+            user.save()
+            self.stdout.write(f'Created owner user: {user.email}')
+        return user
+
+    def _progress(self, row, rate):
+        self.stdout.write(f'  committed through row {row} ({rate:.0f} rows/sec)')
@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.jobs.similar import refresh_similar
+
+
+class Command(BaseCommand):
+    help = 'Recompute similar-jobs lists for jobs changed since the last refresh'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true',
+                            help='Recompute every vector and neighbour list')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        lists = refresh_similar(full=options['full'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Rewrote {lists} similar-jobs lists in {time.perf_counter() - started:.2f}s'
+        ))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from apps.jobs.cache import invalidate_jobs
+from apps.jobs.counters import repair_counters, view_counter
+
+
+class Command(BaseCommand):
+    help = 'Recompute the save and application counters of every job in one set-based pass'
+
+    def handle(self, *args, **options):
+        view_counter.flush()
+        repaired = repair_counters()
+        if repaired:
+            invalidate_jobs()
+        self.stdout.write(self.style.SUCCESS(f'Repaired counters of {repaired} jobs'))
@@ -0,0 +1,111 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:21
+
+import re
+import unicodedata
+from collections import Counter
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Zamrozona kopia tokenizera z apps.jobs.search z chwili tej migracji -
+# pozniejsze zmiany w aplikacji nie zmieniaja tego, co robi migracja
+FIELD_WEIGHTS = {
+    "title": 10,
+    "company": 6,
+    "requirements": 4,
+    "location": 3,
+    "description": 1,
+}
+MAX_TERM_FREQUENCY = 5
+MAX_TERM_LENGTH = 64
+STOPWORDS = frozenset("""
+a an and are as at be by for from in is it of on or our the to we will with you your
+i w z na do o od po za ze sie jest oraz dla lub nie jak to ten ta tym
+""".split())
+FOLD_TABLE = str.maketrans({
+    "\u0142": "l", "\u0141": "L",
+    "\u00df": "ss",
+    "\u00f8": "o", "\u00d8": "O",
+    "\u0111": "d", "\u0110": "D",
+})
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:[.+#][a-z0-9+#]*)*")
+
+
+def fold(text):
+    decomposed = unicodedata.normalize("NFKD", text.translate(FOLD_TABLE))
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def tokenize(text):
+    if not text:
+        return []
+    tokens = []
+    for match in TOKEN_RE.findall(fold(str(text))):
+        token = match.rstrip(".")[:MAX_TERM_LENGTH]
+        if token and token not in STOPWORDS:
+            tokens.append(token)
+    return tokens
+
+
+def job_terms(job):
+    weights = Counter()
+    for field, field_weight in FIELD_WEIGHTS.items():
+        value = getattr(job, field)
+        if isinstance(value, (list, tuple)):
+            value = ", ".join(value)
+        for term, count in Counter(tokenize(value)).items():
+            weights[term] += field_weight * min(count, MAX_TERM_FREQUENCY)
+    return dict(weights)
+
+
+def backfill_search_index(apps, schema_editor):
+    Job = apps.get_model("jobs", "Job")
+    JobSearchTerm = apps.get_model("jobs", "JobSearchTerm")
+    postings = []
+    for job in Job.objects.order_by("pk").iterator(chunk_size=1000):
+        postings.extend(
+            JobSearchTerm(job_id=job.pk, term=term, weight=weight)
+            for term, weight in job_terms(job).items()
+        )
+        if len(postings) >= 5000:
+            JobSearchTerm.objects.bulk_create(postings)
+            postings = []
+    JobSearchTerm.objects.bulk_create(postings)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobs", "0004_change_requirements_to_json"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="JobSearchTerm",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("term", models.CharField(max_length=64)),
+                ("weight", models.PositiveIntegerField(default=1)),
+                (
+                    "job",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_terms",
+                        to="jobs.job",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("term", "job")},
+            },
+        ),
+        migrations.RunPython(backfill_search_index, migrations.RunPython.noop),
+    ]
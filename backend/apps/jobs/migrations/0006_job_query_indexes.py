@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:26
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobs", "0005_job_search_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="job",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["-created_at", "-id"],
+                name="job_active_recent_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="job",
+            index=models.Index(
+                fields=["job_type", "location"], name="job_type_location_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="job",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["salary_min", "salary_max"],
+                name="job_active_salary_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="savedjob",
+            index=models.Index(
+                fields=["user", "-saved_at", "-id"], name="savedjob_user_recent_idx"
+            ),
+        ),
+    ]
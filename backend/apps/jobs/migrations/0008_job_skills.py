@@ -0,0 +1,119 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:51
+
+import unicodedata
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Zamrozona kopia apps.jobs.skills.split_requirements z chwili tej migracji
+MAX_SKILL_LENGTH = 100
+FOLD_TABLE = str.maketrans({
+    "\u0142": "l", "\u0141": "L",
+    "\u00df": "ss",
+    "\u00f8": "o", "\u00d8": "O",
+    "\u0111": "d", "\u0110": "D",
+})
+
+
+def skill_key(name):
+    decomposed = unicodedata.normalize("NFKD", name.translate(FOLD_TABLE))
+    folded = "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+    return " ".join(folded.split())[:MAX_SKILL_LENGTH]
+
+
+def split_requirements(requirements):
+    names = {}
+    for part in (requirements or "").split(","):
+        name = " ".join(part.split())[:MAX_SKILL_LENGTH]
+        key = skill_key(name)
+        if key and key not in names:
+            names[key] = name
+    return names
+
+
+def backfill_skills(apps, schema_editor):
+    Job = apps.get_model("jobs", "Job")
+    Skill = apps.get_model("jobs", "Skill")
+    JobSkill = apps.get_model("jobs", "JobSkill")
+    skills = {}
+    links = []
+    for job in Job.objects.order_by("pk").iterator(chunk_size=1000):
+        for position, (key, name) in enumerate(split_requirements(job.requirements).items()):
+            if key not in skills:
+                skills[key] = Skill.objects.create(key=key, name=name)
+            links.append(JobSkill(job_id=job.pk, skill=skills[key], position=position))
+        if len(links) >= 5000:
+            JobSkill.objects.bulk_create(links)
+            links = []
+    JobSkill.objects.bulk_create(links)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobs", "0007_job_natural_key_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Skill",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100)),
+                ("key", models.CharField(max_length=100, unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="JobSkill",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("position", models.PositiveSmallIntegerField(default=0)),
+                (
+                    "job",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="job_skills",
+                        to="jobs.job",
+                    ),
+                ),
+                (
+                    "skill",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="job_skills",
+                        to="jobs.skill",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("skill", "job")},
+            },
+        ),
+        migrations.AddField(
+            model_name="job",
+            name="skills",
+            field=models.ManyToManyField(
+                blank=True,
+                related_name="jobs",
+                through="jobs.JobSkill",
+                to="jobs.skill",
+            ),
+        ),
+        migrations.RunPython(backfill_skills, migrations.RunPython.noop),
+    ]
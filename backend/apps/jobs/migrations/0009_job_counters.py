@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:15
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Job = apps.get_model("jobs", "Job")
+    SavedJob = apps.get_model("jobs", "SavedJob")
+    JobApplication = apps.get_model("jobs", "JobApplication")
+
+    def per_job(model):
+        rows = model.objects.filter(job=OuterRef("pk")).order_by().values("job")
+        return Coalesce(
+            Subquery(rows.annotate(count=Count("pk")).values("count"), output_field=IntegerField()),
+            0,
+        )
+
+    Job.objects.update(save_count=per_job(SavedJob), application_count=per_job(JobApplication))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobs", "0008_job_skills"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="job",
+            name="application_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="job",
+            name="save_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="job",
+            name="view_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name="job",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["-save_count", "-id"],
+                name="job_active_popular_idx",
+            ),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
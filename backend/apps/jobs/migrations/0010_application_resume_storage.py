@@ -0,0 +1,97 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:19
+
+from collections import Counter
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+# Zamrozone z apps.analytics.rollups.WATERMARK
+ROLLUP_WATERMARK = "employer-dashboard"
+
+
+def delete_duplicate_applications(apps, schema_editor):
+    """Keeps the newest application of each (job, applicant) pair before the unique constraint."""
+    Job = apps.get_model("jobs", "Job")
+    JobApplication = apps.get_model("jobs", "JobApplication")
+
+    kept, removed = set(), []
+    rows = JobApplication.objects.order_by("-applied_at", "-pk").values_list(
+        "pk", "job_id", "applicant_id", "applied_at", "job__posted_by_id",
+    )
+    for pk, job_id, applicant_id, applied_at, employer_id in rows.iterator():
+        if (job_id, applicant_id) in kept:
+            removed.append((pk, job_id, applied_at, employer_id))
+        else:
+            kept.add((job_id, applicant_id))
+    if not removed:
+        return
+
+    JobApplication.objects.filter(pk__in=[row[0] for row in removed]).delete()
+    for job_id, count in Counter(row[1] for row in removed).items():
+        Job.objects.filter(pk=job_id).update(application_count=Greatest(F("application_count") - count, 0))
+    _forget_in_rollups(apps, JobApplication, removed)
+
+
+def _forget_in_rollups(apps, JobApplication, removed):
+    # Rollupy analityki powstaja pozniej (analytics 0001 zalezy od jobs 0011) i licza sie od zera
+    # z oczyszczonej tabeli; poprawiamy je tylko w bazie, w ktorej juz istnieja
+    try:
+        EmployerDailyStats = apps.get_model("analytics", "EmployerDailyStats")
+        JobStats = apps.get_model("analytics", "JobStats")
+        RollupWatermark = apps.get_model("analytics", "RollupWatermark")
+    except LookupError:
+        return
+    watermark = RollupWatermark.objects.filter(name=ROLLUP_WATERMARK).values_list("value", flat=True).first()
+    if watermark is None:
+        return
+
+    # Zgloszenia sprzed znacznika sa juz w dziennych sumach pracodawcy
+    folded = Counter(
+        (employer_id, timezone.localdate(applied_at) if settings.USE_TZ else applied_at.date())
+        for _, _, applied_at, employer_id in removed
+        if applied_at <= watermark
+    )
+    for (employer_id, day), count in folded.items():
+        EmployerDailyStats.objects.filter(employer_id=employer_id, day=day).update(
+            applications=Greatest(F("applications") - count, 0),
+        )
+    for stats in JobStats.objects.filter(job_id__in={row[1] for row in removed}):
+        status_counts = Counter(
+            JobApplication.objects.filter(job_id=stats.job_id).values_list("status", flat=True)
+        )
+        stats.status_counts = dict(status_counts)
+        stats.save(update_fields=["status_counts"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobs", "0009_job_counters"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="jobapplication",
+            name="resume_filename",
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name="jobapplication",
+            name="resume_sha256",
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name="jobapplication",
+            name="resume_size",
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.RunPython(delete_duplicate_applications, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name="jobapplication",
+            unique_together={("job", "applicant")},
+        ),
+    ]
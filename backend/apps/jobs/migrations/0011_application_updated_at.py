@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:23
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_updated_at(apps, schema_editor):
+    JobApplication = apps.get_model("jobs", "JobApplication")
+    JobApplication.objects.update(updated_at=F("applied_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobs", "0010_application_resume_storage"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="jobapplication",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,169 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:54
+
+import re
+import unicodedata
+
+from django.conf import settings
+from django.db import migrations, models
+
+# Zamrozona kopia gazetteera i geokodera z apps.jobs.geo z chwili tej migracji:
+# (nazwa i aliasy, szerokosc, dlugosc, geohash)
+PLACES = [
+    (("Warsaw", "Warszawa", "Varsovie", "Warschau"), 52.2297, 21.0122, "u3qcnhhs5"),
+    (("Krakow", "Krak\xf3w", "Cracow", "Krakau"), 50.0647, 19.945, "u2yhvf580"),
+    (("Lodz", "\u0141\xf3d\u017a"), 51.7592, 19.456, "u3jy6wrrj"),
+    (("Wroclaw", "Wroc\u0142aw", "Breslau"), 51.1079, 17.0385, "u3h4exzj1"),
+    (("Poznan", "Pozna\u0144", "Posen"), 52.4064, 16.9252, "u3k41hk93"),
+    (("Gdansk", "Gda\u0144sk", "Danzig"), 54.352, 18.6466, "u3tm0q6p3"),
+    (("Szczecin", "Stettin"), 53.4285, 14.5528, "u36rgnm58"),
+    (("Bydgoszcz",), 53.1235, 18.0084, "u3ky1yc6f"),
+    (("Lublin",), 51.2465, 22.5684, "u905991u3"),
+    (("Bialystok", "Bia\u0142ystok"), 53.1325, 23.1688, "u92qr0rp0"),
+    (("Katowice",), 50.2649, 19.0238, "u2vtbykwq"),
+    (("Gdynia",), 54.5189, 18.5305, "u3tnjsv7x"),
+    (("Czestochowa", "Cz\u0119stochowa"), 50.8118, 19.1203, "u3j9544bp"),
+    (("Radom",), 51.4027, 21.1471, "u3ph3jwf7"),
+    (("Torun", "Toru\u0144"), 53.0138, 18.5984, "u3mjx4ygy"),
+    (("Sosnowiec",), 50.2863, 19.1041, "u2vw4dr4v"),
+    (("Rzeszow", "Rzesz\xf3w"), 50.0412, 21.9991, "u2zsster0"),
+    (("Kielce",), 50.8661, 20.6286, "u3n9m7vk9"),
+    (("Gliwice",), 50.2945, 18.6714, "u2vq0gu4e"),
+    (("Olsztyn",), 53.7784, 20.4801, "u3w9fn11u"),
+    (("Zabrze",), 50.3249, 18.7857, "u2vq73r7f"),
+    (("Bielsko-Biala", "Bielsko-Bia\u0142a", "Bielsko"), 49.8224, 19.0584, "u2ve3tvus"),
+    (("Bytom",), 50.3484, 18.9157, "u2vqqmtux"),
+    (("Zielona Gora", "Zielona G\xf3ra"), 51.9356, 15.5062, "u35p2ye6b"),
+    (("Rybnik",), 50.1022, 18.5463, "u2vjn0c42"),
+    (("Ruda Slaska", "Ruda \u015al\u0105ska"), 50.2558, 18.8556, "u2vmvhf1r"),
+    (("Opole",), 50.6751, 17.9213, "u3h8rc1gu"),
+    (("Tychy",), 50.1372, 18.9664, "u2vmpx4ym"),
+    (("Gorzow Wielkopolski", "Gorz\xf3w Wielkopolski", "Gorzow"), 52.7368, 15.2288, "u36u483q0"),
+    (("Elblag", "Elbl\u0105g"), 54.1561, 19.4045, "u3tu1dcfj"),
+    (("Plock", "P\u0142ock"), 52.5463, 19.7065, "u3q4bmvb6"),
+    (("Walbrzych", "Wa\u0142brzych"), 50.7714, 16.2843, "u358fd9ug"),
+    (("Wloclawek", "W\u0142oc\u0142awek"), 52.6483, 19.0677, "u3me9bkdt"),
+    (("Tarnow", "Tarn\xf3w"), 50.0121, 20.9858, "u2yut83ms"),
+    (("Chorzow", "Chorz\xf3w"), 50.2975, 18.9546, "u2vqpk6k4"),
+    (("Koszalin",), 54.1944, 16.1722, "u3es21b1r"),
+    (("Kalisz",), 51.7611, 18.091, "u3hy7wv6q"),
+    (("Legnica",), 51.207, 16.1553, "u357r9gym"),
+    (("Sopot",), 54.4416, 18.5601, "u3tjwqg13"),
+    (("Nowy Sacz", "Nowy S\u0105cz"), 49.6175, 20.7153, "u2ydr2s6v"),
+    (("Slupsk", "S\u0142upsk"), 54.4641, 17.0285, "u3sjg6zu2"),
+    (("Siedlce",), 52.1676, 22.2902, "u3rbg0z4r"),
+    (("Berlin",), 52.52, 13.405, "u33dc0cpp"),
+    (("Munich", "M\xfcnchen", "Muenchen"), 48.1351, 11.582, "u281zd9z2"),
+    (("Hamburg",), 53.5511, 9.9937, "u1x0ektjy"),
+    (("Frankfurt", "Frankfurt am Main"), 50.1109, 8.6821, "u0yjjd6j5"),
+    (("Dresden",), 51.0504, 13.7373, "u31f2t7nn"),
+    (("Leipzig",), 51.3397, 12.3731, "u30u1d1g6"),
+    (("Prague", "Praha", "Prag"), 50.0755, 14.4378, "u2fkbecqc"),
+    (("Brno",), 49.1951, 16.6068, "u2ezcgswn"),
+    (("Ostrava",), 49.8209, 18.2625, "u2ugrtd7g"),
+    (("Vienna", "Wien"), 48.2082, 16.3738, "u2edk8511"),
+    (("Bratislava",), 48.1486, 17.1077, "u2s1vm1my"),
+    (("Budapest",), 47.4979, 19.0402, "u2mw1q8xk"),
+    (("Vilnius", "Wilno"), 54.6872, 25.2797, "u99zp7805"),
+    (("Kaunas",), 54.8985, 23.9036, "u9bbrcynf"),
+    (("Riga",), 56.9496, 24.1052, "ud15ux2g7"),
+    (("Tallinn",), 59.437, 24.7536, "ud9d5k1j8"),
+    (("Kyiv", "Kiev", "Kij\xf3w"), 50.4501, 30.5234, "u8vxn84mn"),
+    (("Lviv", "Lw\xf3w", "Lvov"), 49.8397, 24.0297, "u8c5dc1ck"),
+    (("London", "Londyn"), 51.5074, -0.1278, "gcpvj0duq"),
+    (("Dublin",), 53.3498, -6.2603, "gc7x9813h"),
+    (("Amsterdam",), 52.3676, 4.9041, "u173zt5p3"),
+    (("Rotterdam",), 51.9244, 4.4777, "u15pmus99"),
+    (("Brussels", "Bruxelles", "Brussel"), 50.8503, 4.3517, "u151710b3"),
+    (("Paris", "Pary\u017c"), 48.8566, 2.3522, "u09tvw0f6"),
+    (("Madrid",), 40.4168, -3.7038, "ezjmgtwuz"),
+    (("Barcelona",), 41.3874, 2.1686, "sp3e3q75h"),
+    (("Lisbon", "Lisboa", "Lizbona"), 38.7223, -9.1393, "eycs210vw"),
+    (("Rome", "Roma", "Rzym"), 41.9028, 12.4964, "sr2ykk5te"),
+    (("Milan", "Milano", "Mediolan"), 45.4642, 9.19, "u0nd9hebn"),
+    (("Zurich", "Z\xfcrich"), 47.3769, 8.5417, "u0qjd2eyk"),
+    (("Copenhagen", "K\xf8benhavn", "Kopenhaga"), 55.6761, 12.5683, "u3butzxby"),
+    (("Stockholm", "Sztokholm"), 59.3293, 18.0686, "u6sce0t4h"),
+    (("Oslo",), 59.9139, 10.7522, "u4xsudvxb"),
+    (("Helsinki",), 60.1699, 24.9384, "ud9wr3xe4"),
+    (("Bucharest", "Bucure\u0219ti", "Bukareszt"), 44.4268, 26.1025, "sxfs9zxkb"),
+    (("Sofia",), 42.6977, 23.3219, "sx8dfsykp"),
+    (("Athens", "Ateny"), 37.9838, 23.7275, "swbb5ftzd"),
+    (("Belgrade", "Beograd", "Belgrad"), 44.7866, 20.4489, "srywc34kv"),
+    (("Zagreb",), 45.815, 15.9819, "u25kesmet"),
+    (("Ljubljana", "Lublana"), 46.0569, 14.5058, "u24q406uc"),
+]
+FOLD_TABLE = str.maketrans({
+    "\u0142": "l", "\u0141": "L",
+    "\u00df": "ss",
+    "\u00f8": "o", "\u00d8": "O",
+    "\u0111": "d", "\u0110": "D",
+})
+PARTS_RE = re.compile(r"[,/|;()\[\]]")
+
+
+def place_key(text):
+    decomposed = unicodedata.normalize("NFKD", text.translate(FOLD_TABLE))
+    folded = "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+    return " ".join(folded.replace("-", " ").split())
+
+
+def geocode(by_name, location):
+    if not location:
+        return None
+    place = by_name.get(place_key(location))
+    if place is not None:
+        return place
+    for part in PARTS_RE.split(location):
+        place = by_name.get(place_key(part))
+        if place is not None:
+            return place
+    return None
+
+
+def geocode_jobs(apps, schema_editor):
+    Job = apps.get_model("jobs", "Job")
+    by_name = {}
+    for names, latitude, longitude, geohash in PLACES:
+        for name in names:
+            by_name.setdefault(place_key(name), (latitude, longitude, geohash))
+    pending = Job.objects.filter(geohash="")
+    for location in pending.order_by().values_list("location", flat=True).distinct():
+        place = geocode(by_name, location)
+        if place is not None:
+            latitude, longitude, geohash = place
+            pending.filter(location=location).update(latitude=latitude, longitude=longitude, geohash=geohash)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobs", "0012_similar_jobs"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="job",
+            name="geohash",
+            field=models.CharField(blank=True, default="", max_length=12),
+        ),
+        migrations.AddField(
+            model_name="job",
+            name="latitude",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="job",
+            name="longitude",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="job",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["geohash", "-created_at", "-id"],
+                name="job_active_geohash_idx",
+            ),
+        ),
+        migrations.RunPython(geocode_jobs, migrations.RunPython.noop),
+    ]
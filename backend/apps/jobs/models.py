@@ -22,17 +22,118 @@ class Job(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
+    skills = models.ManyToManyField('Skill', through='JobSkill', related_name='jobs', blank=True)
+    # Liczniki utrzymywane przyrostowo (apps.jobs.counters) - bez COUNT(*) przy odczycie
+    save_count = models.PositiveIntegerField(default=0)
+    application_count = models.PositiveIntegerField(default=0)
+    view_count = models.PositiveIntegerField(default=0)
+    # Wspolrzedne z lokalnego gazetteera (apps.jobs.geo); pusty geohash - lokalizacja nierozpoznana
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    geohash = models.CharField(max_length=12, blank=True, default='')
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['-created_at', '-id'],
+                condition=models.Q(is_active=True),
+                name='job_active_recent_idx',
+            ),
+            models.Index(fields=['job_type', 'location'], name='job_type_location_idx'),
+            models.Index(fields=['title', 'company', 'location'], name='job_natural_key_idx'),
+            models.Index(
+                fields=['salary_min', 'salary_max'],
+                condition=models.Q(is_active=True),
+                name='job_active_salary_idx',
+            ),
+            models.Index(
+                fields=['-save_count', '-id'],
+                condition=models.Q(is_active=True),
+                name='job_active_popular_idx',
+            ),
+            models.Index(
+                fields=['geohash', '-created_at', '-id'],
+                condition=models.Q(is_active=True),
+                name='job_active_geohash_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.title} at {self.company}"
 
+class JobSearchTerm(models.Model):
+    """Posting in the full-text index over Job (see apps.jobs.search)."""
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='search_terms')
+    term = models.CharField(max_length=64)
+    weight = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        unique_together = ('term', 'job')
+
+    def __str__(self):
+        return f"{self.term} -> {self.job_id}"
+
+class JobVector(models.Model):
+    """Hashed term-frequency vector of a job, float32 bytes (see apps.jobs.similar)."""
+    job = models.OneToOneField(Job, on_delete=models.CASCADE, primary_key=True, related_name='vector')
+    vector = models.BinaryField(default=b'')
+    # Oferta zmieniona od ostatniego przeliczenia sasiadow
+    dirty = models.BooleanField(default=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.job_id} ({'dirty' if self.dirty else 'clean'})"
+
+class SimilarJob(models.Model):
+    """Precomputed nearest neighbours of a job, ``rank`` 0 being the closest."""
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='similar_jobs')
+    similar = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='+')
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        # (job, rank) to jedyny odczyt widoku - lista sasiadow po indeksie, w kolejnosci
+        unique_together = ('job', 'rank')
+
+    def __str__(self):
+        return f"{self.job_id} ~ {self.similar_id} ({self.score:.3f})"
+
+class Skill(models.Model):
+    """Normalized skill parsed from Job.requirements (see apps.jobs.skills)."""
+    name = models.CharField(max_length=100)
+    key = models.CharField(max_length=100, unique=True)
+
+    def __str__(self):
+        return self.name
+
+class JobSkill(models.Model):
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='job_skills')
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='job_skills')
+    # Kolejnosc z requirements - frontend pokazuje umiejetnosci w tej kolejnosci
+    position = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        # (skill, job) to indeks odwrotny dla filtrow ?skills_all= / ?skills_any=
+        unique_together = ('skill', 'job')
+
+    def __str__(self):
+        return f"{self.skill_id} -> {self.job_id}"
+
 class JobApplication(models.Model):
     job = models.ForeignKey(Job, on_delete=models.CASCADE)
     applicant = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     cover_letter = models.TextField(default='')
     resume = models.FileField(upload_to='resumes/')
+    # Pliki sa adresowane trescia (apps.jobs.resumes) - ten sam hash to ten sam plik na dysku
+    resume_sha256 = models.CharField(max_length=64, blank=True, db_index=True)
+    resume_size = models.PositiveBigIntegerField(default=0)
+    resume_filename = models.CharField(max_length=255, blank=True)
     applied_at = models.DateTimeField(auto_now_add=True)
     status = models.CharField(max_length=20, default='pending')
+    # Znacznik dla przyrostowych agregatow (apps.analytics) - obejmuje tez zmiany statusu
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        unique_together = ('job', 'applicant')
 
     def __str__(self):
         return f"{self.applicant.username} - {self.job.title}"
@@ -45,6 +146,9 @@ class SavedJob(models.Model):
     class Meta:
         unique_together = ('user', 'job')
         ordering = ['-saved_at']
+        indexes = [
+            models.Index(fields=['user', '-saved_at', '-id'], name='savedjob_user_recent_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.email} - {self.job.title}"
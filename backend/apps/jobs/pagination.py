@@ -0,0 +1,154 @@
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Cursor pagination over the full ordering tuple of the queryset.
+
+    Unlike DRF's CursorPagination, which positions on the first ordering
+    field and uses OFFSET to skip ties, the cursor here stores the value of
+    every ordering field of the boundary row (e.g. ``(created_at, id)``).
+    Each page is a plain ``WHERE (created_at, id) < (...) LIMIT n`` range
+    read, so page 10,000 costs the same as page 1 and rows inserted while a
+    client is paging never shift or duplicate results.
+
+    The ordering is taken from the queryset, with ``ordering`` as the
+    fallback; it must end in a unique field.
+    """
+    ordering = ('-created_at', '-pk')
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self):
+        self.page_size = getattr(settings, 'JOBS_PAGE_SIZE', 20)
+        self.max_page_size = getattr(settings, 'JOBS_MAX_PAGE_SIZE', 100)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.limit = self.get_page_size(request)
+
+        ordering = tuple(queryset.query.order_by) or self.ordering
+        if ordering[-1].lstrip('-') not in ('pk', 'id'):
+            ordering += ('-pk' if ordering[-1].startswith('-') else 'pk',)
+        self.ordering = ordering
+        queryset = queryset.order_by(*ordering)
+
+        self.cursor = self.decode_cursor(request)
+        reverse = False
+        if self.cursor is not None:
+            values, reverse = self.cursor
+            if len(values) != len(ordering):
+                raise NotFound(self.invalid_cursor_message)
+            try:
+                queryset = queryset.filter(self._after(ordering, values, reverse))
+            except (ValidationError, ValueError, TypeError):
+                raise NotFound(self.invalid_cursor_message)
+            if reverse:
+                queryset = queryset.reverse()
+
+        rows = list(queryset[:self.limit + 1])
+        has_more = len(rows) > self.limit
+        rows = rows[:self.limit]
+        if reverse:
+            rows.reverse()
+
+        self.has_next = has_more if not reverse else True
+        self.has_previous = (self.cursor is not None) if not reverse else has_more
+        self.page = rows
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self._link(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self._link(self.page[0], reverse=True)
+
+    def _link(self, row, reverse):
+        values = [self._value(row, field.lstrip('-')) for field in self.ordering]
+        return replace_query_param(self.base_url, self.cursor_query_param,
+                                   self.encode_cursor(values, reverse))
+
+    @staticmethod
+    def _value(row, field):
+        value = row.pk if field == 'pk' else getattr(row, field)
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        if isinstance(value, Decimal):
+            return str(value)
+        return value
+
+    @staticmethod
+    def _after(ordering, values, reverse):
+        """Builds ``(f1, f2, ...) > / < (v1, v2, ...)`` as nested OR/AND lookups."""
+        condition = None
+        for field, value in reversed(list(zip(ordering, values))):
+            descending = field.startswith('-')
+            name = field.lstrip('-')
+            lookup = 'lt' if descending != reverse else 'gt'
+            strict = Q(**{f'{name}__{lookup}': value})
+            condition = strict if condition is None else strict | (Q(**{name: value}) & condition)
+        return condition
+
+    def encode_cursor(self, values, reverse):
+        payload = json.dumps({'v': values, 'r': int(reverse)}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            padded = token + '=' * (-len(token) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+            return list(payload['v']), bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+
+class SavedJobPagination(KeysetPagination):
+    ordering = ('-saved_at', '-pk')
@@ -0,0 +1,233 @@
+"""Resume uploads: streamed to disk, content-addressed, served with range support.
+
+The upload handler writes the multipart body to a temporary file in chunks
+and hashes it on the way, so a resume never sits in worker memory and the
+size cap is enforced before the whole body has arrived. Stored files are
+named by their SHA-256, so the same resume sent with many applications is
+kept once.
+"""
+import hashlib
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.files.uploadhandler import SkipFile, TemporaryFileUploadHandler
+from django.http import FileResponse, HttpResponse
+from django.http.multipartparser import MultiPartParser as DjangoMultiPartParser, MultiPartParserError
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, quote_etag
+from rest_framework import status
+from rest_framework.exceptions import APIException, ParseError
+from rest_framework.negotiation import BaseContentNegotiation
+from rest_framework.parsers import DataAndFiles, MultiPartParser
+
+RESUME_FIELD = 'resume'
+RESUME_DIR = 'resumes'
+
+_RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def max_resume_size():
+    return getattr(settings, 'RESUME_MAX_UPLOAD_SIZE', 10 * 1024 * 1024)
+
+
+class ResumeTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = 'Resume file is too large.'
+    default_code = 'resume_too_large'
+
+
+class ResumeUploadHandler(TemporaryFileUploadHandler):
+    """Streams the ``resume`` field to a temporary file, hashing it chunk by chunk.
+
+    Other file fields are skipped without being stored. A resume over the
+    size cap is dropped (the rest of it is read and discarded) and
+    ``too_large`` is set for the parser to report.
+    """
+    chunk_size = 256 * 1024
+
+    def __init__(self, request=None, max_size=None):
+        super().__init__(request)
+        self.max_size = max_size if max_size is not None else max_resume_size()
+        self.too_large = False
+
+    def new_file(self, field_name, file_name, content_type, content_length, charset=None, content_type_extra=None):
+        if field_name != RESUME_FIELD:
+            raise SkipFile()
+        if content_length is not None and content_length > self.max_size:
+            self.too_large = True
+            raise SkipFile()
+        super().new_file(field_name, file_name, content_type, content_length, charset, content_type_extra)
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.size += len(raw_data)
+        if self.size > self.max_size:
+            self.too_large = True
+            self.file.close()
+            raise SkipFile()
+        self.sha256.update(raw_data)
+        self.file.write(raw_data)
+
+    def file_complete(self, file_size):
+        uploaded = super().file_complete(file_size)
+        uploaded.sha256 = self.sha256.hexdigest()
+        # Parser zamyka handler.file przy pominieciu kolejnego pliku - gotowy plik nie moze zniknac
+        del self.file
+        return uploaded
+
+
+class ResumeUploadParser(MultiPartParser):
+    """Multipart parser that uses only ``ResumeUploadHandler`` (never the in-memory handler)."""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        request = parser_context['request']
+        handler = ResumeUploadHandler(request._request)
+        meta = request.META.copy()
+        meta['CONTENT_TYPE'] = media_type
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        try:
+            data, files = DjangoMultiPartParser(meta, stream, [handler], encoding).parse()
+        except MultiPartParserError as exc:
+            raise ParseError('Multipart form parse error - %s' % str(exc))
+        if handler.too_large:
+            raise ResumeTooLarge(f'Resume must be at most {handler.max_size // (1024 * 1024)} MB.')
+        return DataAndFiles(data, files)
+
+
+def store_resume(uploaded):
+    """Saves an uploaded resume under its content hash; returns (storage name, sha256).
+
+    An identical file already in storage is reused and the upload discarded.
+    """
+    extension = os.path.splitext(uploaded.name)[1].lower()
+    digest = getattr(uploaded, 'sha256', None) or _hash_file(uploaded)
+    name = f'{RESUME_DIR}/{digest[:2]}/{digest}{extension}'
+    if default_storage.exists(name):
+        uploaded.close()
+        return name, digest
+    # Plik tymczasowy jest przenoszony (rename), nie kopiowany
+    saved = default_storage.save(name, uploaded)
+    if saved != name:
+        # Rownolegly upload tego samego pliku zdazyl pierwszy - tresc jest identyczna
+        default_storage.delete(saved)
+    return name, digest
+
+
+def _hash_file(uploaded):
+    sha256 = hashlib.sha256()
+    for chunk in uploaded.chunks():
+        sha256.update(chunk)
+    uploaded.seek(0)
+    return sha256.hexdigest()
+
+
+class IgnoreAcceptNegotiation(BaseContentNegotiation):
+    """Resume downloads answer with the file whatever Accept says (errors still render as JSON)."""
+
+    def select_parser(self, request, parsers):
+        return parsers[0] if parsers else None
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
+
+
+def resume_response(request, application):
+    """Serves an application's resume, honouring If-None-Match and single byte ranges.
+
+    With ``RESUME_SENDFILE_HEADER`` set, the file is handed off to the web
+    server (``X-Accel-Redirect`` for nginx, ``X-Sendfile`` for Apache), which
+    then also handles ranges. Otherwise whole files and ranges to the end of
+    the file go out as a ``FileResponse`` over the open file, which WSGI
+    servers with ``wsgi.file_wrapper`` send with ``sendfile()``.
+    """
+    name = application.resume.name
+    etag = quote_etag(application.resume_sha256 or name)
+    conditional = get_conditional_response(request, etag=etag)
+    if conditional is not None:
+        return conditional
+
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+    filename = application.resume_filename or os.path.basename(name)
+    sendfile_header = getattr(settings, 'RESUME_SENDFILE_HEADER', '')
+    if sendfile_header:
+        response = HttpResponse(content_type=content_type)
+        if sendfile_header.lower() == 'x-sendfile':
+            response[sendfile_header] = default_storage.path(name)
+        else:
+            response[sendfile_header] = getattr(settings, 'RESUME_SENDFILE_PREFIX', '/protected/') + name
+        # Nazwa od kandydata - cudzyslowy, CR/LF i znaki spoza ASCII musza byc zakodowane
+        response['Content-Disposition'] = content_disposition_header(False, filename)
+        response['ETag'] = etag
+        return response
+
+    size = default_storage.size(name)
+    byte_range = None
+    if_range = request.headers.get('If-Range')
+    if 'Range' in request.headers and (if_range is None or if_range == etag):
+        byte_range = _parse_range(request.headers['Range'], size)
+        if byte_range == 'unsatisfiable':
+            response = HttpResponse(status=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+    handle = default_storage.open(name, 'rb')
+    if byte_range is None:
+        response = FileResponse(handle, content_type=content_type, filename=filename)
+    else:
+        start, end = byte_range
+        handle.seek(start)
+        # Zakres do konca pliku to nadal zwykly plik - sendfile dziala od biezacej pozycji
+        body = handle if end == size - 1 else _LimitedReader(handle, end - start + 1)
+        response = FileResponse(body, content_type=content_type, filename=filename,
+                                status=status.HTTP_206_PARTIAL_CONTENT)
+        response['Content-Length'] = end - start + 1
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    return response
+
+
+def _parse_range(header, size):
+    """(start, end) of a single byte range, 'unsatisfiable', or None to send the whole file."""
+    match = _RANGE_RE.match(header.strip())
+    if not match:
+        # Wiele zakresow naraz - RFC 9110 pozwala odpowiedziec calym plikiem
+        return None
+    first, last = match.groups()
+    if not first:
+        if not last:
+            return None
+        suffix = int(last)
+        if suffix == 0 or size == 0:
+            return 'unsatisfiable'
+        return max(size - suffix, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return 'unsatisfiable'
+    return start, end
+
+
+class _LimitedReader:
+    """Reads at most ``length`` bytes of ``handle`` from its current position."""
+
+    def __init__(self, handle, length):
+        self.handle = handle
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.handle.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.handle.close()
@@ -0,0 +1,172 @@
+import re
+import unicodedata
+from collections import Counter
+
+from django.db import connection, transaction
+from django.db.models import Case, F, IntegerField, OuterRef, Q, Subquery, Sum, When
+from django.db.models.functions import Coalesce
+
+from .models import Job, JobSearchTerm
+
+FIELD_WEIGHTS = {
+    'title': 10,
+    'company': 6,
+    'requirements': 4,
+    'location': 3,
+    'description': 1,
+}
+
+# Powtorzenia slowa w opisie nie powinny dominowac rankingu
+MAX_TERM_FREQUENCY = 5
+MAX_TERM_LENGTH = 64
+PREFIX_UPPER_BOUND = '\U0010ffff'
+
+STOPWORDS = frozenset("""
+a an and are as at be by for from in is it of on or our the to we will with you your
+i w z na do o od po za ze sie jest oraz dla lub nie jak to ten ta tym
+""".split())
+
+# Znaki bez dekompozycji NFKD (np. polskie "ł") trzeba zamienic recznie
+_FOLD_TABLE = str.maketrans({
+    'ł': 'l', 'Ł': 'L',
+    'ß': 'ss',
+    'ø': 'o', 'Ø': 'O',
+    'đ': 'd', 'Đ': 'D',
+})
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+(?:[.+#][a-z0-9+#]*)*')
+
+
+def fold(text):
+    """Lowercases text and strips diacritics ("Łódź" -> "lodz")."""
+    decomposed = unicodedata.normalize('NFKD', text.translate(_FOLD_TABLE))
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def tokenize(text):
+    if not text:
+        return []
+    tokens = []
+    for match in _TOKEN_RE.findall(fold(str(text))):
+        token = match.rstrip('.')[:MAX_TERM_LENGTH]
+        if token and token not in STOPWORDS:
+            tokens.append(token)
+    return tokens
+
+
+def job_terms(job):
+    """Returns {term: weight} for a job, weighting title matches above description ones."""
+    weights = Counter()
+    for field, field_weight in FIELD_WEIGHTS.items():
+        value = getattr(job, field)
+        if isinstance(value, (list, tuple)):
+            value = ', '.join(value)
+        for term, count in Counter(tokenize(value)).items():
+            weights[term] += field_weight * min(count, MAX_TERM_FREQUENCY)
+    return dict(weights)
+
+
+def index_job(job):
+    """Brings the postings of a single job in line with its current content.
+
+    Only the differences are written, so re-saving a job whose searchable
+    fields did not change costs a single SELECT.
+    """
+    terms = job_terms(job)
+    existing = dict(JobSearchTerm.objects.filter(job=job).values_list('term', 'weight'))
+
+    stale = [term for term in existing if term not in terms]
+    changed = {term: weight for term, weight in terms.items()
+               if term in existing and existing[term] != weight}
+    added = [JobSearchTerm(job=job, term=term, weight=weight)
+             for term, weight in terms.items() if term not in existing]
+
+    if not (stale or changed or added):
+        return
+
+    with transaction.atomic():
+        if stale:
+            JobSearchTerm.objects.filter(job=job, term__in=stale).delete()
+        for term, weight in changed.items():
+            JobSearchTerm.objects.filter(job=job, term=term).update(weight=weight)
+        if added:
+            JobSearchTerm.objects.bulk_create(added)
+
+
+def rebuild_index(queryset=None, batch_size=1000):
+    """Re-indexes jobs in batches. Returns the number of jobs processed."""
+    if queryset is None:
+        queryset = Job.objects.all()
+
+    processed = 0
+    batch = []
+    for job in queryset.only(*FIELD_WEIGHTS).order_by('pk').iterator(chunk_size=batch_size):
+        batch.append(job)
+        if len(batch) >= batch_size:
+            index_jobs(batch)
+            processed += len(batch)
+            batch = []
+    if batch:
+        index_jobs(batch)
+        processed += len(batch)
+    return processed
+
+
+def index_jobs(jobs):
+    """Replaces the postings of already saved jobs in one pass (bulk path, no diffing)."""
+    postings = [
+        (job.pk, term, weight)
+        for job in jobs
+        for term, weight in job_terms(job).items()
+    ]
+    table = JobSearchTerm._meta.db_table
+    with transaction.atomic():
+        JobSearchTerm.objects.filter(job_id__in=[job.pk for job in jobs]).delete()
+        # Miliony wierszy przy imporcie - executemany omija budowanie instancji modelu
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {connection.ops.quote_name(table)} (job_id, term, weight) VALUES (%s, %s, %s)',
+                postings,
+            )
+
+
+def _prefix_q(token):
+    # Zakres zamiast LIKE 'abc%' - dziala na indeksie niezaleznie od collation
+    return Q(term__gte=token, term__lt=token + PREFIX_UPPER_BOUND)
+
+
+def search_jobs(queryset, query):
+    """Filters ``queryset`` to jobs matching every word of ``query`` and orders them by rank.
+
+    Each word is matched as a prefix ("dev" finds "developer"); exact term
+    matches score twice as much as prefix-only ones.
+    """
+    tokens = list(dict.fromkeys(tokenize(query)))
+    if not tokens:
+        return queryset.none()
+
+    any_token = Q()
+    for token in tokens:
+        any_token |= _prefix_q(token)
+        matching_ids = JobSearchTerm.objects.filter(_prefix_q(token)).values('job_id')
+        queryset = queryset.filter(pk__in=matching_ids)
+
+    rank = (
+        JobSearchTerm.objects
+        .filter(any_token, job=OuterRef('pk'))
+        .values('job')
+        .annotate(rank=Sum(
+            Case(
+                When(term__in=tokens, then=2 * F('weight')),
+                default=F('weight'),
+                output_field=IntegerField(),
+            )
+        ))
+        .values('rank')
+    )
+    return (
+        queryset
+        .annotate(search_rank=Coalesce(Subquery(rank, output_field=IntegerField()), 0))
+        .order_by('-search_rank', '-created_at', '-pk')
+    )
+
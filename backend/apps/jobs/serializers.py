@@ -1,5 +1,23 @@
+import os
+
+from django.conf import settings
 from rest_framework import serializers
-from .models import Job, SavedJob
+from .geo import default_radius_km, get_gazetteer, max_radius_km
+from .models import Job, JobApplication, SavedJob, SimilarJob
+from .resumes import store_resume
+from .skills import skill_key, skill_links
+
+
+def get_saved_job_ids(request):
+    """Ids of jobs saved by the requesting user, loaded once per request."""
+    http_request = getattr(request, '_request', request)
+    saved_ids = getattr(http_request, '_saved_job_ids', None)
+    if saved_ids is None:
+        saved_ids = set(
+            SavedJob.objects.filter(user=request.user).order_by().values_list('job_id', flat=True)
+        )
+        http_request._saved_job_ids = saved_ids
+    return saved_ids
 
 class JobSerializer(serializers.ModelSerializer):
     is_saved = serializers.SerializerMethodField()
@@ -10,19 +28,19 @@ class JobSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'title', 'company', 'description', 'requirements',
             'job_type', 'salary_min', 'salary_max', 'location',
-            'is_premium', 'created_at', 'is_saved'
+            'is_premium', 'created_at', 'is_saved',
+            'save_count', 'application_count', 'view_count',
         ]
+        read_only_fields = ['save_count', 'application_count', 'view_count']
 
     def get_is_saved(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            return SavedJob.objects.filter(user=request.user, job=obj).exists()
+            return obj.id in get_saved_job_ids(request)
         return False
 
     def get_requirements(self, obj):
-        if isinstance(obj.requirements, str):
-            return [req.strip() for req in obj.requirements.split(',') if req.strip()]
-        return obj.requirements if obj.requirements else []
+        return [link.skill.name for link in skill_links(obj)]
 
 class SavedJobSerializer(serializers.ModelSerializer):
     job = JobSerializer(read_only=True)
@@ -32,6 +50,47 @@ class SavedJobSerializer(serializers.ModelSerializer):
         fields = ['id', 'job', 'saved_at']
         read_only_fields = ['saved_at']
 
+class JobApplicationSerializer(serializers.ModelSerializer):
+    resume = serializers.FileField(write_only=True, use_url=False)
+
+    class Meta:
+        model = JobApplication
+        fields = ['id', 'job', 'cover_letter', 'resume', 'resume_filename', 'resume_size', 'status', 'applied_at']
+        read_only_fields = ['job', 'resume_filename', 'resume_size', 'status', 'applied_at']
+
+    def validate_resume(self, value):
+        extension = os.path.splitext(value.name)[1].lower()
+        allowed = getattr(settings, 'RESUME_ALLOWED_EXTENSIONS', ['.pdf', '.doc', '.docx'])
+        if extension not in allowed:
+            raise serializers.ValidationError(f"Unsupported file type, allowed: {', '.join(allowed)}")
+        return value
+
+    def create(self, validated_data):
+        uploaded = validated_data.pop('resume')
+        name, digest = store_resume(uploaded)
+        validated_data.update(
+            resume=name, resume_sha256=digest, resume_size=uploaded.size,
+            resume_filename=os.path.basename(uploaded.name)[:255],
+        )
+        return super().create(validated_data)
+
+class SimilarJobSerializer(serializers.ModelSerializer):
+    """Compact card of a neighbour; the full offer is one click away."""
+    id = serializers.IntegerField(source='similar.id')
+    title = serializers.CharField(source='similar.title')
+    company = serializers.CharField(source='similar.company')
+    location = serializers.CharField(source='similar.location')
+    job_type = serializers.CharField(source='similar.job_type')
+    salary_min = serializers.DecimalField(source='similar.salary_min', max_digits=10, decimal_places=2)
+    salary_max = serializers.DecimalField(source='similar.salary_max', max_digits=10, decimal_places=2)
+    is_premium = serializers.BooleanField(source='similar.is_premium')
+    score = serializers.FloatField()
+
+    class Meta:
+        model = SimilarJob
+        fields = ['id', 'title', 'company', 'location', 'job_type', 'salary_min', 'salary_max', 'is_premium',
+                  'score']
+
 class SaveJobSerializer(serializers.Serializer):
     job_id = serializers.IntegerField()
 
@@ -41,3 +100,78 @@ class SaveJobSerializer(serializers.Serializer):
             return value
         except Job.DoesNotExist:
             raise serializers.ValidationError("Job not found or inactive")
+
+class SavedStateSerializer(serializers.Serializer):
+    job_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=True,
+        max_length=getattr(settings, 'JOBS_SAVED_STATE_MAX_IDS', 2000),
+    )
+
+class FeedQuerySerializer(serializers.Serializer):
+    offset = serializers.IntegerField(min_value=0, default=0)
+    limit = serializers.IntegerField(
+        min_value=1, max_value=getattr(settings, 'JOBS_MAX_PAGE_SIZE', 100),
+        default=getattr(settings, 'JOBS_PAGE_SIZE', 20),
+    )
+
+class SalaryInsightsQuerySerializer(serializers.Serializer):
+    job_type = serializers.ListField(child=serializers.ChoiceField(choices=Job.JOB_TYPES), required=False)
+    location = serializers.ListField(child=serializers.CharField(max_length=100), required=False)
+    skill = serializers.CharField(max_length=100, required=False)
+    bins = serializers.IntegerField(min_value=1, max_value=100, default=20)
+
+    def validate_skill(self, value):
+        return skill_key(value)
+
+class JobFilterSerializer(serializers.Serializer):
+    job_type = serializers.ListField(child=serializers.ChoiceField(choices=Job.JOB_TYPES), required=False)
+    location = serializers.ListField(child=serializers.CharField(max_length=100), required=False)
+    salary_min = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0, required=False)
+    salary_max = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0, required=False)
+    is_premium = serializers.BooleanField(required=False, allow_null=True, default=None)
+    posted_since = serializers.DateTimeField(required=False)
+    skill = serializers.CharField(max_length=100, required=False)
+    skills_all = serializers.ListField(child=serializers.CharField(max_length=100), required=False)
+    skills_any = serializers.ListField(child=serializers.CharField(max_length=100), required=False)
+    sort = serializers.ChoiceField(choices=['recent', 'popular'], required=False)
+    near = serializers.CharField(max_length=100, required=False)
+    radius_km = serializers.FloatField(min_value=0, required=False)
+
+    def validate_near(self, value):
+        # Nazwa z gazetteera - "Warszawa" i "warsaw" daja ten sam klucz cache w apps.jobs.geo
+        place = get_gazetteer().lookup(value)
+        if place is None:
+            raise serializers.ValidationError("Unknown location")
+        return place.name
+
+    def validate_radius_km(self, value):
+        if value > max_radius_km():
+            raise serializers.ValidationError(f"Ensure this value is less than or equal to {max_radius_km()}.")
+        return value
+
+    def validate_skills_all(self, value):
+        return _skill_keys(value)
+
+    def validate_skills_any(self, value):
+        return _skill_keys(value)
+
+    def validate(self, attrs):
+        salary_min = attrs.get('salary_min')
+        salary_max = attrs.get('salary_max')
+        if salary_min is not None and salary_max is not None and salary_min > salary_max:
+            raise serializers.ValidationError("salary_min cannot be greater than salary_max")
+        # ?skill=python to skrot dla ?skills_all=python
+        if attrs.get('skill'):
+            attrs['skills_all'] = list(dict.fromkeys(attrs.get('skills_all', []) + _skill_keys([attrs.pop('skill')])))
+        if attrs.get('near'):
+            attrs.setdefault('radius_km', default_radius_km())
+        elif 'radius_km' in attrs:
+            raise serializers.ValidationError({'radius_km': "radius_km requires near"})
+        return attrs
+
+
+def _skill_keys(values):
+    # Akceptuje zarowno ?skills_any=python&skills_any=react jak i ?skills_any=python,react
+    keys = (skill_key(part) for value in values for part in value.split(','))
+    return list(dict.fromkeys(key for key in keys if key))
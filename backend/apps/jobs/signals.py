@@ -0,0 +1,81 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .cache import invalidate_jobs
+from .counters import adjust
+from .geo import set_coordinates
+from .models import Job, JobApplication, SimilarJob
+from .search import index_job
+from .similar import mark_dirty, schedule_refresh
+from .skills import sync_skills
+
+
+@receiver(post_save, sender=Job)
+def update_search_index(sender, instance, raw=False, **kwargs):
+    # Usuniecie oferty czysci indeks przez CASCADE na JobSearchTerm
+    if raw:
+        return
+    index_job(instance)
+
+
+@receiver(post_save, sender=Job)
+def update_similar_jobs(sender, instance, raw=False, **kwargs):
+    # Po update_search_index - wektor liczy sie z nowych postingow
+    if raw:
+        return
+    mark_dirty([instance.pk])
+    transaction.on_commit(schedule_refresh)
+
+
+@receiver(pre_delete, sender=Job)
+def forget_similar_job(sender, instance, **kwargs):
+    # Listy z usuwana oferta traca wiersz przez CASCADE - trzeba je uzupelnic
+    holders = SimilarJob.objects.filter(similar=instance).values_list('job_id', flat=True)
+    mark_dirty(holders)
+    transaction.on_commit(schedule_refresh)
+
+
+@receiver(post_save, sender=Job)
+def update_skills(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created or instance.requirements != getattr(instance, '_previous_requirements', None):
+        sync_skills([instance])
+
+
+@receiver(pre_save, sender=Job)
+def remember_previous_job_type(sender, instance, raw=False, **kwargs):
+    instance._previous_job_type = instance._previous_requirements = None
+    if instance.pk and not raw:
+        previous = Job.objects.filter(pk=instance.pk).values_list('job_type', 'requirements').first()
+        if previous:
+            instance._previous_job_type, instance._previous_requirements = previous
+
+
+@receiver(pre_save, sender=Job)
+def geocode_location(sender, instance, raw=False, **kwargs):
+    # Wyszukanie w gazetteerze w pamieci - taniej niz sprawdzanie, czy lokalizacja sie zmienila
+    if not raw:
+        set_coordinates(instance)
+
+
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+def invalidate_job_cache(sender, instance, **kwargs):
+    job_types = {instance.job_type, getattr(instance, '_previous_job_type', None)} - {None}
+    invalidate_jobs(job_ids=[instance.pk], job_types=job_types)
+
+
+# Zapisy licza widoki save_job/unsave_job; zgloszenia powstaja w wielu miejscach (panel admina, import)
+@receiver(post_save, sender=JobApplication)
+def count_application(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        adjust(instance.job_id, application_count=1)
+
+
+@receiver(post_delete, sender=JobApplication)
+def uncount_application(sender, instance, origin=None, **kwargs):
+    # Przy usuwaniu calej oferty licznik i tak znika razem z nia
+    if not isinstance(origin, Job):
+        adjust(instance.job_id, application_count=-1)
@@ -0,0 +1,245 @@
+"""Similar jobs: TF-IDF over the search postings, neighbours precomputed with NumPy.
+
+Each job's postings (``JobSearchTerm``, already weighted per field) are
+feature-hashed into a fixed-width float32 term-frequency vector kept in
+``JobVector``, so there is no vocabulary to keep in sync. A refresh stacks
+the active jobs' vectors into one matrix, applies IDF, L2-normalizes the
+rows and takes the top-k cosine neighbours from block matrix products. The
+lists are stored in ``SimilarJob``, so the endpoint is one indexed read.
+
+Refreshes are incremental: jobs marked dirty get new vectors, and only the
+lists they can enter or leave are recomputed. IDF drifts as the corpus
+changes, so unaffected lists keep slightly older scores until a full
+rebuild.
+
+Every refresh still holds all active vectors in memory twice (the raw
+matrix and its TF-IDF copy): about ``2 * 4 * JOBS_SIMILAR_DIMENSIONS``
+bytes per active job, 8 KB at the default 1024 dimensions, so 800 MB for
+100k jobs. Above ``JOBS_SIMILAR_MAX_MATRIX_MB`` a refresh is refused with an
+error in the log and the dirty flags stay set; lower the dimensions or
+raise the limit on a worker that has the memory.
+"""
+import logging
+import time
+import zlib
+from datetime import datetime, timezone as dt_timezone
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Min
+from django.utils import timezone
+
+from apps.tasks.queue import enqueue
+
+from .models import Job, JobSearchTerm, JobVector, SimilarJob
+
+# Ile liczb float32 miesci jeden blok iloczynu macierzy (~64 MB)
+BLOCK_FLOATS = 1 << 24
+CHUNK_SIZE = 500
+
+_columns = {}
+
+logger = logging.getLogger(__name__)
+
+
+def dimensions():
+    return getattr(settings, 'JOBS_SIMILAR_DIMENSIONS', 1024)
+
+
+def top_k():
+    return getattr(settings, 'JOBS_SIMILAR_TOP_K', 10)
+
+
+def matrix_bytes(jobs, dims):
+    """Peak memory of a refresh over ``jobs`` active vectors: the float32 matrix and its TF-IDF copy."""
+    return 2 * jobs * dims * 4
+
+
+def mark_dirty(job_ids):
+    """Flags jobs whose vectors and neighbour lists need recomputing."""
+    job_ids = list(job_ids)
+    for offset in range(0, len(job_ids), CHUNK_SIZE):
+        chunk = job_ids[offset:offset + CHUNK_SIZE]
+        JobVector.objects.bulk_create([JobVector(job_id=job_id) for job_id in chunk], ignore_conflicts=True)
+        JobVector.objects.filter(pk__in=chunk, dirty=False).update(dirty=True)
+
+
+def schedule_refresh():
+    # Zmiany z jednego okna przelicza jedno zadanie
+    window = getattr(settings, 'JOBS_SIMILAR_REFRESH_WINDOW', 30)
+    slot = int(time.time() // window) + 1
+    enqueue('jobs.refresh_similar_jobs', run_at=datetime.fromtimestamp(slot * window, tz=dt_timezone.utc),
+            idempotency_key=f'refresh-similar-jobs:{window}:{slot}')
+
+
+def _column(term, dims):
+    # crc32 zamiast hash() - hash napisow jest losowany per proces
+    column = _columns.get(term)
+    if column is None:
+        column = _columns[term] = zlib.crc32(term.encode('utf-8'))
+    return column % dims
+
+
+def term_vectors(job_ids, dims):
+    """Hashed sublinear term-frequency vectors of ``job_ids``, one float32 row per job."""
+    index = {job_id: row for row, job_id in enumerate(job_ids)}
+    rows, columns, weights = [], [], []
+    for offset in range(0, len(job_ids), CHUNK_SIZE):
+        postings = JobSearchTerm.objects.filter(job_id__in=job_ids[offset:offset + CHUNK_SIZE])
+        for job_id, term, weight in postings.values_list('job_id', 'term', 'weight').iterator(chunk_size=5000):
+            rows.append(index[job_id])
+            columns.append(_column(term, dims))
+            weights.append(weight)
+    matrix = np.zeros((len(job_ids), dims), dtype=np.float32)
+    if rows:
+        np.add.at(matrix, (np.array(rows), np.array(columns)), 1 + np.log(np.array(weights, dtype=np.float32)))
+    return matrix
+
+
+def tfidf(matrix):
+    """IDF-weighted, L2-normalized copy of a term-frequency matrix."""
+    document_frequency = np.count_nonzero(matrix, axis=0)
+    idf = (np.log((1 + len(matrix)) / (1 + document_frequency)) + 1).astype(np.float32)
+    weighted = matrix * idf
+    # einsum zamiast linalg.norm - bez tymczasowej kopii calej macierzy
+    norms = np.sqrt(np.einsum('ij,ij->i', weighted, weighted))[:, None]
+    norms[norms == 0] = 1
+    weighted /= norms
+    return weighted
+
+
+def neighbours(vectors, rows, k):
+    """Yields (rows, indices, scores) blocks: the ``k`` closest other rows of ``vectors``, best first."""
+    k = min(k, len(vectors) - 1)
+    if k <= 0 or not len(rows):
+        return
+    block = max(1, BLOCK_FLOATS // len(vectors))
+    for start in range(0, len(rows), block):
+        batch = rows[start:start + block]
+        scores = vectors[batch] @ vectors.T
+        scores[np.arange(len(batch)), batch] = -np.inf
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind='stable')
+        yield batch, np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+
+
+def refresh_similar(full=False):
+    """Recomputes dirty vectors and the neighbour lists they affect; returns how many lists were rewritten."""
+    dims, k = dimensions(), top_k()
+    needed = matrix_bytes(JobVector.objects.filter(job__is_active=True).count(), dims)
+    limit = getattr(settings, 'JOBS_SIMILAR_MAX_MATRIX_MB', 2048) * 1024 * 1024
+    if needed > limit:
+        logger.error(f'Similar jobs refresh needs {needed // 2 ** 20} MB of vectors, '
+                     f'over JOBS_SIMILAR_MAX_MATRIX_MB={limit // 2 ** 20}; skipped')
+        return 0
+    if full:
+        mark_dirty(Job.objects.filter(is_active=True).filter(vector__isnull=True).values_list('pk', flat=True))
+        JobVector.objects.update(dirty=True)
+    started = timezone.now()
+    dirty = list(JobVector.objects.filter(dirty=True).values_list('pk', flat=True))
+    active_dirty = set()
+    for offset in range(0, len(dirty), CHUNK_SIZE):
+        active_dirty.update(Job.objects.filter(pk__in=dirty[offset:offset + CHUNK_SIZE], is_active=True)
+                            .values_list('pk', flat=True))
+    _store_vectors(sorted(active_dirty), dims)
+
+    # Surowa macierz zwalnia sie zaraz po tfidf - w pamieci sa najwyzej dwie kopie
+    ids, vectors = _load_matrix(dims)
+    vectors = tfidf(vectors)
+    position = {job_id: row for row, job_id in enumerate(ids.tolist())}
+    if full:
+        affected = np.arange(len(ids))
+    else:
+        affected = _affected_rows(ids, vectors, position, dirty, active_dirty, k)
+    _store_lists(ids, vectors, affected, k, removed=[job_id for job_id in dirty if job_id not in active_dirty],
+                 replace_all=full, processed=dirty, started=started)
+    return len(affected)
+
+
+def _store_vectors(job_ids, dims):
+    for offset in range(0, len(job_ids), CHUNK_SIZE):
+        chunk = job_ids[offset:offset + CHUNK_SIZE]
+        matrix = term_vectors(chunk, dims)
+        JobVector.objects.bulk_update(
+            [JobVector(job_id=job_id, vector=row.tobytes(), dirty=False) for job_id, row in zip(chunk, matrix)],
+            ['vector'],
+        )
+
+
+def _load_matrix(dims):
+    width = dims * 4
+    active = JobVector.objects.filter(job__is_active=True)
+    # Wiersze wpisywane od razu do jednej tablicy - bez listy blobow i ich sklejonej kopii
+    matrix = np.empty((active.count(), dims), dtype=np.float32)
+    ids, stale = [], []
+    for job_id, vector in active.order_by('pk').values_list('pk', 'vector').iterator(chunk_size=2000):
+        if len(vector) != width:
+            # Wektor z innym JOBS_SIMILAR_DIMENSIONS - przeliczy go nastepne odswiezenie
+            stale.append(job_id)
+            continue
+        if len(ids) == len(matrix):
+            # Oferta aktywowana w trakcie odczytu - zlapie ja nastepne odswiezenie
+            break
+        matrix[len(ids)] = np.frombuffer(vector, dtype=np.float32)
+        ids.append(job_id)
+    if stale:
+        mark_dirty(stale)
+    return np.array(ids, dtype=np.int64), matrix[:len(ids)]
+
+
+def _affected_rows(ids, vectors, position, dirty, active_dirty, k):
+    """Rows whose lists can change: changed jobs, lists holding them, lists they now beat."""
+    affected = {position[job_id] for job_id in active_dirty if job_id in position}
+    for offset in range(0, len(dirty), CHUNK_SIZE):
+        holders = SimilarJob.objects.filter(similar_id__in=dirty[offset:offset + CHUNK_SIZE])
+        affected.update(position[job_id] for job_id in holders.values_list('job_id', flat=True).distinct()
+                        if job_id in position)
+
+    changed_rows = np.array(sorted(position[job_id] for job_id in active_dirty if job_id in position), dtype=np.int64)
+    if len(changed_rows):
+        best = np.zeros(len(vectors), dtype=np.float32)
+        block = max(1, BLOCK_FLOATS // len(vectors))
+        for start in range(0, len(changed_rows), block):
+            np.maximum(best, (vectors[changed_rows[start:start + block]] @ vectors.T).max(axis=0), out=best)
+        # Prog wejscia na liste: najslabszy z k sasiadow; krotsza lista przyjmie kazdy dodatni wynik.
+        # Progi czytane tylko dla ofert, do ktorych zmienione w ogole sa podobne
+        candidates = np.nonzero(best > 0)[0]
+        threshold = np.zeros(len(vectors), dtype=np.float32)
+        candidate_ids = ids[candidates].tolist()
+        for offset in range(0, len(candidate_ids), CHUNK_SIZE):
+            lists = (SimilarJob.objects.filter(job_id__in=candidate_ids[offset:offset + CHUNK_SIZE])
+                     .order_by().values('job_id').annotate(weakest=Min('score'), size=Count('pk')))
+            for row in lists:
+                if row['size'] >= min(k, len(vectors) - 1):
+                    threshold[position[row['job_id']]] = row['weakest']
+        affected.update(candidates[best[candidates] > threshold[candidates]].tolist())
+    return np.array(sorted(affected), dtype=np.int64)
+
+
+def _store_lists(ids, vectors, rows, k, removed, replace_all, processed, started):
+    lists = []
+    for batch, indices, scores in neighbours(vectors, rows, k):
+        for row, row_indices, row_scores in zip(batch, indices, scores):
+            rank = 0
+            for index, score in zip(row_indices, row_scores):
+                if score <= 0:
+                    break
+                lists.append(SimilarJob(job_id=int(ids[row]), similar_id=int(ids[index]), rank=rank,
+                                        score=float(score)))
+                rank += 1
+    with transaction.atomic():
+        if replace_all:
+            SimilarJob.objects.all().delete()
+        else:
+            stale = [int(ids[row]) for row in rows] + list(removed)
+            for offset in range(0, len(stale), CHUNK_SIZE):
+                SimilarJob.objects.filter(job_id__in=stale[offset:offset + CHUNK_SIZE]).delete()
+        SimilarJob.objects.bulk_create(lists, batch_size=2000)
+        # Flagi schodza razem z listami - przerwane odswiezenie zostawia oferty do przeliczenia;
+        # oferta zapisana w trakcie liczenia zostaje oznaczona do nastepnego
+        for offset in range(0, len(processed), CHUNK_SIZE):
+            JobVector.objects.filter(pk__in=processed[offset:offset + CHUNK_SIZE]).exclude(
+                job__updated_at__gt=started,
+            ).update(dirty=False)
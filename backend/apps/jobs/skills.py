@@ -0,0 +1,69 @@
+from django.db import transaction
+from django.db.models import Prefetch
+
+from .models import JobSkill, Skill
+from .search import fold
+
+MAX_SKILL_LENGTH = 100
+
+
+def skill_key(name):
+    """Case/diacritic-insensitive identity of a skill ("  Node.JS " -> "node.js")."""
+    return ' '.join(fold(name).split())[:MAX_SKILL_LENGTH]
+
+
+def split_requirements(requirements):
+    """Skill names from the comma-joined requirements, first spelling wins."""
+    names = {}
+    for part in (requirements or '').split(','):
+        name = ' '.join(part.split())[:MAX_SKILL_LENGTH]
+        key = skill_key(name)
+        if key and key not in names:
+            names[key] = name
+    return names
+
+
+def get_or_create_skills(names):
+    """Maps skill key -> Skill, creating the missing ones in one insert."""
+    skills = {skill.key: skill for skill in Skill.objects.filter(key__in=list(names))}
+    missing = [Skill(key=key, name=name) for key, name in names.items() if key not in skills]
+    if missing:
+        # ignore_conflicts - rownolegly zapis mogl juz dodac ten sam skill
+        Skill.objects.bulk_create(missing, ignore_conflicts=True)
+        skills.update((skill.key, skill) for skill in Skill.objects.filter(key__in=[s.key for s in missing]))
+    return skills
+
+
+def sync_skills(jobs):
+    """Replaces the skill links of ``jobs`` with the skills in their requirements."""
+    jobs = [job for job in jobs if job.pk is not None]
+    if not jobs:
+        return
+    wanted = {job.pk: split_requirements(job.requirements) for job in jobs}
+    names = {}
+    for job_names in wanted.values():
+        for key, name in job_names.items():
+            names.setdefault(key, name)
+
+    with transaction.atomic():
+        skills = get_or_create_skills(names)
+        JobSkill.objects.filter(job_id__in=list(wanted)).delete()
+        JobSkill.objects.bulk_create([
+            JobSkill(job_id=job_id, skill=skills[key], position=position)
+            for job_id, job_names in wanted.items()
+            for position, key in enumerate(job_names)
+        ], batch_size=2000)
+
+
+def skill_links(job):
+    """JobSkill rows of ``job`` in requirements order, from the prefetch cache if present."""
+    if 'job_skills' in getattr(job, '_prefetched_objects_cache', {}):
+        return job.job_skills.all()
+    return job.job_skills.select_related('skill').order_by('position')
+
+
+def with_skills(queryset, lookup='job_skills'):
+    """Prefetches ordered skill links (with their Skill) in one extra query."""
+    return queryset.prefetch_related(Prefetch(
+        lookup, queryset=JobSkill.objects.select_related('skill').order_by('position')
+    ))
@@ -0,0 +1,186 @@
+"""Deterministic synthetic data for load tests and benchmarks.
+
+Distributions are skewed the way real traffic is: a few cities hold most
+postings, salaries grow with seniority, and saves/applications follow a
+Zipf-like popularity curve over jobs.
+"""
+import random
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .cache import invalidate_jobs
+from .counters import repair_counters
+from .geo import set_coordinates
+from .models import Job, JobApplication, SavedJob
+from .search import index_jobs
+from .similar import mark_dirty
+from .skills import sync_skills
+
+User = get_user_model()
+
+LEVELS = [('Junior', 0.25, 7000), ('Mid', 0.4, 12000), ('Senior', 0.25, 18000), ('Lead', 0.1, 24000)]
+ROLES = ['Frontend Developer', 'Backend Developer', 'Full Stack Developer', 'Data Engineer',
+         'DevOps Engineer', 'QA Automation Engineer', 'Product Manager', 'UI/UX Designer',
+         'Mobile Developer', 'Machine Learning Engineer']
+SKILLS = ['Python', 'Django', 'React', 'TypeScript', 'JavaScript', 'Node.js', 'AWS', 'Docker',
+          'Kubernetes', 'PostgreSQL', 'Kafka', 'Figma', 'Java', 'C#', 'Go', 'Terraform',
+          'Selenium', 'Redux', 'GraphQL', 'Spark']
+COMPANIES = ['TechCorp Solutions', 'StartupXYZ', 'WebDev Inc', 'CloudPro', 'DataScience Ltd',
+             'MobileFirst', 'TestPro', 'DesignStudio', 'ProductCorp', 'BigData Solutions',
+             'SecureIT', 'AI Innovations', 'CryptoTech', 'GameStudio', 'Żabka Tech']
+# Warszawa i Krakow skupiaja wiekszosc ofert
+CITIES = [('Warsaw', 35), ('Krakow', 20), ('Wroclaw', 12), ('Gdansk', 9), ('Poznan', 8),
+          ('Łódź', 6), ('Katowice', 5), ('Lublin', 3), ('Szczecin', 2)]
+JOB_TYPES = [('full_time', 80), ('contract', 12), ('part_time', 5), ('internship', 3)]
+FILLER = ('we are looking for an engineer to join our team and build scalable products '
+          'with modern tools in an agile environment you will work closely with '
+          'designers and product owners on features used by millions').split()
+STATUSES = [('pending', 70), ('reviewed', 20), ('rejected', 8), ('accepted', 2)]
+HISTORY_DAYS = 90
+
+
+def _weighted(rng, options):
+    values, weights = zip(*options)
+    return rng.choices(values, weights=weights)[0]
+
+
+def _zipf_cum_weights(count, exponent=1.1):
+    # Skumulowane wagi - rng.choices robi wtedy bisect zamiast sumowania calej listy
+    return list(accumulate(1 / (rank ** exponent) for rank in range(1, count + 1)))
+
+
+def generate_users(count, seed=42, batch_size=2000):
+    rng = random.Random(seed)
+    password = make_password('loadgen')
+    users = []
+    for i in range(count):
+        email = f'user{i}.s{seed}@loadgen.fluffyjobs.test'
+        users.append(User(
+            email=email,
+            username=email,
+            password=password,
+            first_name=f'User{i}',
+            user_type='employer' if rng.random() < 0.1 else 'jobseeker',
+            is_premium=rng.random() < 0.05,
+        ))
+    return User.objects.bulk_create(users, batch_size=batch_size)
+
+
+def generate_jobs(count, owners, seed=42, batch_size=2000):
+    """Creates ``count`` jobs posted by ``owners``, indexed for search and skills."""
+    rng = random.Random(seed)
+    now = timezone.now()
+    created = []
+    batch, ages = [], []
+    for _ in range(count):
+        level, _, base_salary = rng.choices(LEVELS, weights=[level[1] for level in LEVELS])[0]
+        skills = rng.sample(SKILLS, rng.randint(3, 7))
+        salary_min = round(base_salary * rng.uniform(0.8, 1.2), -2)
+        batch.append(Job(
+            title=f'{level} {rng.choice(ROLES)}',
+            company=rng.choice(COMPANIES),
+            location=f'{_weighted(rng, CITIES)}, Poland',
+            description=' '.join(rng.choices(FILLER + skills, k=rng.randint(30, 80))),
+            requirements=', '.join(skills),
+            job_type=_weighted(rng, JOB_TYPES),
+            salary_min=salary_min,
+            salary_max=salary_min + round(rng.uniform(2000, 6000), -2),
+            is_premium=rng.random() < 0.1,
+            is_active=rng.random() < 0.95,
+            posted_by=rng.choice(owners),
+        ))
+        ages.append(rng.uniform(0, HISTORY_DAYS))
+        if len(batch) >= batch_size:
+            created.extend(_insert_jobs(batch, ages, now))
+            batch, ages = [], []
+    if batch:
+        created.extend(_insert_jobs(batch, ages, now))
+    invalidate_jobs()
+    return created
+
+
+def _insert_jobs(jobs, ages, now):
+    for job in jobs:
+        set_coordinates(job)
+    with transaction.atomic():
+        jobs = Job.objects.bulk_create(jobs)
+        # auto_now_add nadpisuje created_at - rozloz oferty w czasie osobnym UPDATE
+        created_at = Job._meta.get_field('created_at')
+        quote = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'UPDATE {quote(Job._meta.db_table)} SET {quote(created_at.column)} = %s '
+                f'WHERE {quote(Job._meta.pk.column)} = %s',
+                [
+                    (created_at.get_db_prep_save(now - timedelta(days=age), connection), job.pk)
+                    for job, age in zip(jobs, ages)
+                ],
+            )
+        index_jobs(jobs)
+        sync_skills(jobs)
+        mark_dirty(job.pk for job in jobs)
+    return jobs
+
+
+def generate_saved_jobs(count, users, jobs, seed=42, batch_size=2000):
+    return _generate_pairs(SavedJob, count, users, jobs, seed, batch_size, lambda rng, user, job: SavedJob(
+        user=user, job=job,
+    ))
+
+
+def generate_applications(count, users, jobs, seed=42, batch_size=2000):
+    return _generate_pairs(JobApplication, count, users, jobs, seed + 1, batch_size, lambda rng, user, job: (
+        JobApplication(
+            applicant=user, job=job, cover_letter='Synthetic application.',
+            resume='resumes/synthetic.pdf', status=_weighted(rng, STATUSES),
+        )
+    ))
+
+
+def _generate_pairs(model, count, users, jobs, seed, batch_size, build):
+    """Unique (user, job) pairs: active users and popular jobs dominate."""
+    if not users or not jobs:
+        return 0
+    count = min(count, len(users) * len(jobs))
+    rng = random.Random(seed)
+    users = rng.sample(list(users), len(users))
+    jobs = rng.sample(list(jobs), len(jobs))
+    user_weights = _zipf_cum_weights(len(users), exponent=0.8)
+    job_weights = _zipf_cum_weights(len(jobs))
+    seen = set()
+    batch = []
+    created = 0
+    attempts = 0
+    while created + len(batch) < count and attempts < count * 20:
+        attempts += 1
+        user = rng.choices(users, cum_weights=user_weights)[0]
+        job = rng.choices(jobs, cum_weights=job_weights)[0]
+        if (user.pk, job.pk) in seen:
+            continue
+        seen.add((user.pk, job.pk))
+        batch.append(build(rng, user, job))
+        if len(batch) >= batch_size:
+            model.objects.bulk_create(batch)
+            created += len(batch)
+            batch = []
+    if batch:
+        model.objects.bulk_create(batch)
+        created += len(batch)
+    return created
+
+
+def generate_dataset(users, jobs, saved, applications, seed=42):
+    """Generates a full dataset; returns the created users and jobs."""
+    created_users = generate_users(users, seed=seed)
+    owners = [user for user in created_users if user.user_type == 'employer'] or created_users
+    created_jobs = generate_jobs(jobs, owners, seed=seed)
+    generate_saved_jobs(saved, created_users, created_jobs, seed=seed)
+    generate_applications(applications, created_users, created_jobs, seed=seed)
+    # bulk_create omija liczniki - przelicz je raz na koniec
+    repair_counters()
+    return created_users, created_jobs
@@ -0,0 +1,9 @@
+from apps.tasks.queue import task
+
+from .similar import refresh_similar
+
+
+@task()
+def refresh_similar_jobs():
+    """Recomputes the similar-jobs lists affected by jobs changed since the last run."""
+    return {'lists': refresh_similar()}
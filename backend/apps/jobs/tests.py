@@ -1,8 +1,37 @@
-from django.test import TestCase
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+import numpy as np
+from django.core.management import call_command
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APIClient
 from rest_framework import status
 from django.contrib.auth.models import User
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from .models import Job, JobApplication, JobSearchTerm, JobVector, SavedJob, SimilarJob, Skill
+from .counters import ViewCounter, view_counter
+from .search import tokenize
+from . import similar
+from .similar import refresh_similar
+from .insights import SalarySnapshot, reset_snapshot
+from .geo import encode_geohash, get_gazetteer, haversine_km
+from .cache import get_cache, partition_versions
+from .importing import Checkpoint
+from fluffy_jobs import renderers
+from .synthetic import generate_dataset, generate_jobs
 
 class JobsAPITest(TestCase):
     def setUp(self):
@@ -18,3 +47,1085 @@ class JobsAPITest(TestCase):
             # Jeśli endpoint nie istnieje, sprawdź główny API
             response = self.client.get('/api/')
             self.assertIn(response.status_code, [200, 404])
+
+
+class JobSearchTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.owner = get_user_model().objects.create_user(
+            username='owner@example.com', email='owner@example.com', password='testpass123'
+        )
+        self.python_job = self._job(title='Python Developer', company='DataScience Ltd',
+                                    location='Łódź, Poland', requirements='Python, Django')
+        self.react_job = self._job(title='Senior React Developer', company='Żabka Tech',
+                                   location='Warsaw, Poland', requirements='React, TypeScript',
+                                   description='Python scripting is a plus.')
+
+    def _job(self, **kwargs):
+        defaults = {'description': 'Great job.', 'job_type': 'full_time', 'posted_by': self.owner}
+        defaults.update(kwargs)
+        return Job.objects.create(**defaults)
+
+    def _search(self, query):
+        response = self.client.get('/api/jobs/', {'q': query})
+        self.assertEqual(response.status_code, 200)
+        return [job['id'] for job in response.data['results']]
+
+    def test_tokenize_folds_polish_diacritics(self):
+        self.assertEqual(tokenize('Łódź, Żabka & Kraków'), ['lodz', 'zabka', 'krakow'])
+        self.assertEqual(tokenize('C#, Node.js and C++'), ['c#', 'node.js', 'c++'])
+
+    def test_search_matches_prefix_and_folded_terms(self):
+        self.assertEqual(self._search('zabk'), [self.react_job.id])
+        self.assertEqual(self._search('ŻABKA react'), [self.react_job.id])
+        self.assertEqual(self._search('develop'), [self.react_job.id, self.python_job.id])
+        self.assertEqual(self._search('lodz'), [self.python_job.id])
+
+    def test_search_ranks_title_above_description(self):
+        self.assertEqual(self._search('python'), [self.python_job.id, self.react_job.id])
+
+    def test_search_results_paginate_in_rank_order(self):
+        first = self.client.get('/api/jobs/', {'q': 'python', 'page_size': 1}).data
+        second = self.client.get(first['next']).data
+        self.assertEqual([first['results'][0]['id'], second['results'][0]['id']],
+                         [self.python_job.id, self.react_job.id])
+        self.assertIsNone(second['next'])
+
+    def test_index_follows_job_updates_and_deletes(self):
+        self.python_job.title = 'Golang Engineer'
+        self.python_job.save()
+        self.assertEqual(self._search('golang'), [self.python_job.id])
+        self.assertEqual(self._search('python'), [self.python_job.id, self.react_job.id])
+
+        self.react_job.delete()
+        self.assertFalse(JobSearchTerm.objects.filter(job_id=self.react_job.id).exists())
+        self.assertEqual(self._search('typescript'), [])
+
+
+class JobListQueryCountTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username='seeker@example.com', email='seeker@example.com', password='testpass123'
+        )
+        self.client.force_authenticate(self.user)
+
+    def _create_jobs(self, count, save_every=2):
+        for i in range(count):
+            job = Job.objects.create(
+                title=f'Job {i}', company='TechCorp', description='Great job.',
+                requirements='Python', job_type='full_time', location='Warsaw, Poland',
+                posted_by=self.user,
+            )
+            if i % save_every == 0:
+                SavedJob.objects.create(user=self.user, job=job)
+
+    def _assert_constant_queries(self, url):
+        self._create_jobs(2)
+        with CaptureQueriesContext(connection) as small:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        self._create_jobs(30)
+        with CaptureQueriesContext(connection) as large:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertEqual(len(small), len(large))
+
+    def test_job_list_queries_do_not_grow_with_rows(self):
+        self._assert_constant_queries('/api/jobs/')
+
+    def test_saved_job_list_queries_do_not_grow_with_rows(self):
+        self._assert_constant_queries('/api/jobs/saved/')
+
+    def test_is_saved_reflects_saved_jobs(self):
+        self._create_jobs(4)
+        # strona + umiejetnosci + zapisane id + 3 zapytania licznikow filtrow
+        with self.assertNumQueries(6):
+            response = self.client.get('/api/jobs/')
+        saved = {job['title']: job['is_saved'] for job in response.data['results']}
+        self.assertEqual(saved, {'Job 0': True, 'Job 1': False, 'Job 2': True, 'Job 3': False})
+
+
+class KeysetPaginationTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username='seeker@example.com', email='seeker@example.com', password='testpass123'
+        )
+        self.jobs = [
+            Job.objects.create(
+                title=f'Job {i}', company='TechCorp', description='Great job.',
+                requirements='Python', job_type='full_time', location='Warsaw, Poland',
+                posted_by=self.user,
+            )
+            for i in range(7)
+        ]
+        # Wspolny created_at wymusza rozstrzyganie po id
+        Job.objects.filter(pk__in=[job.pk for job in self.jobs[2:5]]).update(created_at=self.jobs[2].created_at)
+
+    def _walk(self, url):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids.extend(job['id'] for job in response.data['results'])
+            url = response.data['next']
+        return ids
+
+    def test_pages_cover_every_job_once_in_order(self):
+        expected = list(Job.objects.order_by('-created_at', '-pk').values_list('pk', flat=True))
+        self.assertEqual(self._walk('/api/jobs/?page_size=2'), expected)
+
+    def test_insert_between_pages_does_not_shift_results(self):
+        first = self.client.get('/api/jobs/?page_size=3').data
+        Job.objects.create(title='Fresh', company='TechCorp', description='New.', requirements='Go',
+                           job_type='full_time', location='Warsaw, Poland', posted_by=self.user)
+        rest = self._walk(first['next'])
+        seen = [job['id'] for job in first['results']] + rest
+        self.assertEqual(sorted(seen), sorted(job.pk for job in self.jobs))
+
+    def test_previous_link_returns_same_page(self):
+        first = self.client.get('/api/jobs/?page_size=3').data
+        second = self.client.get(first['next']).data
+        back = self.client.get(second['previous']).data
+        self.assertEqual(back['results'], first['results'])
+
+    def test_page_size_is_capped_and_bad_cursor_rejected(self):
+        with self.settings(JOBS_MAX_PAGE_SIZE=4):
+            response = self.client.get('/api/jobs/?page_size=1000')
+        self.assertEqual(len(response.data['results']), 4)
+        self.assertEqual(self.client.get('/api/jobs/?cursor=garbage').status_code, 404)
+
+    def test_saved_jobs_paginate_by_saved_at(self):
+        self.client.force_authenticate(self.user)
+        for job in self.jobs:
+            SavedJob.objects.create(user=self.user, job=job)
+        expected = list(SavedJob.objects.order_by('-saved_at', '-pk').values_list('job_id', flat=True))
+        url = '/api/jobs/saved/?page_size=3'
+        seen = []
+        while url:
+            data = self.client.get(url).data
+            seen.extend(saved['job']['id'] for saved in data['results'])
+            url = data['next']
+        self.assertEqual(seen, expected)
+
+
+class QueryPlanAuditTest(TestCase):
+    def test_list_endpoints_use_indexes(self):
+        out = StringIO()
+        call_command('audit_query_plans', '--fail-on-scan', stdout=out)
+        self.assertIn('No full table scans found', out.getvalue())
+
+
+class JobFilterFacetTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        owner = get_user_model().objects.create_user(
+            username='owner@example.com', email='owner@example.com', password='testpass123'
+        )
+        rows = [
+            ('Python Developer', 'full_time', 'Warsaw, Poland', 8000, 11000, False),
+            ('Data Engineer', 'full_time', 'Krakow, Poland', 15000, 19000, True),
+            ('QA Engineer', 'contract', 'Warsaw, Poland', 12000, 16000, False),
+            ('Intern', 'internship', 'Gdansk, Poland', 3000, 4000, False),
+        ]
+        self.jobs = {
+            title: Job.objects.create(
+                title=title, company='TechCorp', description='Great job.', requirements='Python',
+                job_type=job_type, location=location, salary_min=low, salary_max=high,
+                is_premium=premium, posted_by=owner,
+            )
+            for title, job_type, location, low, high, premium in rows
+        }
+
+    def _titles(self, params):
+        response = self.client.get('/api/jobs/', params)
+        self.assertEqual(response.status_code, 200)
+        return sorted(job['title'] for job in response.data['results'])
+
+    def test_structured_filters(self):
+        self.assertEqual(self._titles({'job_type': ['full_time', 'contract'], 'location': 'Warsaw, Poland'}),
+                         ['Python Developer', 'QA Engineer'])
+        self.assertEqual(self._titles({'salary_min': 10000, 'salary_max': 13000}),
+                         ['Python Developer', 'QA Engineer'])
+        self.assertEqual(self._titles({'is_premium': 'true'}), ['Data Engineer'])
+        self.assertEqual(self._titles({'posted_since': '2000-01-01'}), sorted(self.jobs))
+
+    def test_invalid_filters_are_rejected(self):
+        self.assertEqual(self.client.get('/api/jobs/', {'job_type': 'freelance'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/jobs/', {'salary_min': 5, 'salary_max': 1}).status_code, 400)
+
+    def test_facets_ignore_their_own_filter(self):
+        facets = self.client.get('/api/jobs/', {'job_type': 'full_time'}).data['facets']
+        self.assertEqual(facets['job_type'], {'full_time': 2, 'contract': 1, 'internship': 1})
+        self.assertEqual(facets['location'], [
+            {'value': 'Krakow, Poland', 'count': 1},
+            {'value': 'Warsaw, Poland', 'count': 1},
+        ])
+        self.assertEqual([bucket['count'] for bucket in facets['salary']], [0, 1, 0, 1, 0])
+
+    def test_facets_follow_search_query(self):
+        facets = self.client.get('/api/jobs/', {'q': 'engineer'}).data['facets']
+        self.assertEqual(facets['job_type'], {'full_time': 1, 'contract': 1})
+
+
+class JobSkillTest(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.client = APIClient()
+        owner = get_user_model().objects.create_user(
+            username='skills@example.com', email='skills@example.com', password='testpass123'
+        )
+        rows = [
+            ('Backend Developer', 'Python, Django, PostgreSQL'),
+            ('Frontend Developer', 'React,  typescript ,React'),
+            ('Full Stack Developer', 'python, React'),
+        ]
+        self.jobs = {
+            title: Job.objects.create(
+                title=title, company='TechCorp', description='Great job.', requirements=requirements,
+                job_type='full_time', location='Warsaw, Poland', posted_by=owner,
+            )
+            for title, requirements in rows
+        }
+
+    def _titles(self, params):
+        response = self.client.get('/api/jobs/', params)
+        self.assertEqual(response.status_code, 200)
+        return sorted(job['title'] for job in response.data['results'])
+
+    def test_requirements_are_normalized_into_skills(self):
+        self.assertEqual(Skill.objects.get(key='python').name, 'Python')
+        self.assertEqual(Skill.objects.count(), 5)
+        response = self.client.get(f'/api/jobs/{self.jobs["Frontend Developer"].pk}/')
+        self.assertEqual(response.data['requirements'], ['React', 'typescript'])
+
+    def test_skill_filters(self):
+        self.assertEqual(self._titles({'skill': 'PYTHON'}), ['Backend Developer', 'Full Stack Developer'])
+        self.assertEqual(self._titles({'skills_all': 'python,react'}), ['Full Stack Developer'])
+        self.assertEqual(self._titles({'skills_any': ['django', 'typescript']}),
+                         ['Backend Developer', 'Frontend Developer'])
+        self.assertEqual(self._titles({'skills_all': 'cobol'}), [])
+
+    def test_changing_requirements_resyncs_skills(self):
+        job = self.jobs['Backend Developer']
+        job.requirements = 'Go, Kubernetes'
+        job.save()
+        self.assertEqual(
+            list(job.job_skills.order_by('position').values_list('skill__name', flat=True)), ['Go', 'Kubernetes']
+        )
+        self.assertEqual(self._titles({'skill': 'django'}), [])
+
+
+class SavedStateTest(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username='saver@example.com', email='saver@example.com', password='testpass123'
+        )
+        self.client.force_authenticate(self.user)
+        self.jobs = [
+            Job.objects.create(
+                title=f'Job {i}', company='TechCorp', description='Great job.', requirements='Python',
+                job_type='full_time', location='Warsaw, Poland', posted_by=self.user,
+            )
+            for i in range(4)
+        ]
+        SavedJob.objects.create(user=self.user, job=self.jobs[1])
+        SavedJob.objects.create(user=self.user, job=self.jobs[3])
+
+    def test_bulk_state_returns_saved_subset_in_one_query(self):
+        ids = [job.pk for job in self.jobs] + [999999]
+        with self.assertNumQueries(1):
+            response = self.client.post('/api/jobs/saved/state/', {'job_ids': ids}, format='json')
+        self.assertEqual(response.data, {'saved': [self.jobs[1].pk, self.jobs[3].pk]})
+
+    def test_bulk_state_rejects_invalid_or_too_many_ids(self):
+        response = self.client.post('/api/jobs/saved/state/', {'job_ids': ['abc']}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        too_many = list(range(1, settings.JOBS_SAVED_STATE_MAX_IDS + 2))
+        response = self.client.post('/api/jobs/saved/state/', {'job_ids': too_many}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_saved_ids_revalidate_with_etag(self):
+        response = self.client.get('/api/jobs/saved/ids/')
+        self.assertEqual(response.data, {'ids': [self.jobs[1].pk, self.jobs[3].pk], 'count': 2})
+        self.assertIn('no-cache', response['Cache-Control'])
+        etag = response['ETag']
+
+        # Tylko agregat wersji - bez pobierania listy id
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/jobs/saved/ids/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.client.delete(f'/api/jobs/{self.jobs[1].pk}/unsave/')
+        response = self.client.get('/api/jobs/saved/ids/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['ids'], [self.jobs[3].pk])
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_saved_ids_etag_follows_database_not_local_cache(self):
+        etag = self.client.get('/api/jobs/saved/ids/')['ETag']
+        # Zapis na innym workerze: wiersz w bazie, lokalny cache nic o nim nie wie
+        SavedJob.objects.bulk_create([SavedJob(user=self.user, job=self.jobs[0])])
+        response = self.client.get('/api/jobs/saved/ids/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 3)
+
+    @override_settings(JSON_STREAM_CHUNK_SIZE=1)
+    def test_long_saved_ids_are_streamed(self):
+        response = self.client.get('/api/jobs/saved/ids/')
+        self.assertTrue(response.streaming)
+        self.assertTrue(response['ETag'])
+        self.assertEqual(json.loads(b''.join(response.streaming_content)),
+                         {'ids': [self.jobs[1].pk, self.jobs[3].pk], 'count': 2})
+
+
+class JobCounterTest(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        view_counter.flush()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username='counter@example.com', email='counter@example.com', password='testpass123'
+        )
+        self.client.force_authenticate(self.user)
+        self.jobs = [
+            Job.objects.create(
+                title=f'Job {i}', company='TechCorp', description='Great job.', requirements='Python',
+                job_type='full_time', location='Warsaw, Poland', posted_by=self.user,
+            )
+            for i in range(3)
+        ]
+
+    def _counts(self, job):
+        job.refresh_from_db()
+        return job.save_count, job.application_count, job.view_count
+
+    def test_save_and_unsave_adjust_counter_once(self):
+        job = self.jobs[0]
+        self.client.post('/api/jobs/save/', {'job_id': job.pk}, format='json')
+        self.client.post('/api/jobs/save/', {'job_id': job.pk}, format='json')
+        self.assertEqual(self._counts(job), (1, 0, 0))
+
+        self.assertEqual(self.client.delete(f'/api/jobs/{job.pk}/unsave/').status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.delete(f'/api/jobs/{job.pk}/unsave/').status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self._counts(job), (0, 0, 0))
+
+    def test_applications_are_counted(self):
+        application = JobApplication.objects.create(job=self.jobs[1], applicant=self.user, resume='resumes/cv.pdf')
+        self.assertEqual(self._counts(self.jobs[1]), (0, 1, 0))
+        application.delete()
+        self.assertEqual(self._counts(self.jobs[1]), (0, 0, 0))
+
+    def test_views_are_buffered_and_flushed_in_batches(self):
+        counter = ViewCounter(flush_interval=3600, max_pending=5)
+        with self.assertNumQueries(0):
+            for job_id in [self.jobs[0].pk] * 3 + [self.jobs[1].pk]:
+                counter.hit(job_id)
+        # Piate trafienie oproznia bufor: dwie rozne liczby trafien = dwa UPDATE
+        with self.assertNumQueries(2):
+            counter.hit(self.jobs[2].pk)
+        self.assertEqual([self._counts(job)[2] for job in self.jobs], [3, 1, 1])
+
+        self.client.get(f'/api/jobs/{self.jobs[0].pk}/')
+        self.client.get(f'/api/jobs/{self.jobs[0].pk}/')
+        self.assertEqual(view_counter.flush(), 2)
+        self.assertEqual(self._counts(self.jobs[0])[2], 5)
+
+    def test_popular_sort_and_counter_repair(self):
+        SavedJob.objects.bulk_create([SavedJob(user=self.user, job=self.jobs[2])])
+        Job.objects.filter(pk=self.jobs[0].pk).update(save_count=7)
+
+        out = StringIO()
+        call_command('repair_job_counters', stdout=out)
+        self.assertIn('Repaired counters of 2 jobs', out.getvalue())
+        self.assertEqual([self._counts(job)[0] for job in self.jobs], [0, 0, 1])
+
+        response = self.client.get('/api/jobs/', {'sort': 'popular'})
+        self.assertEqual(response.data['results'][0]['id'], self.jobs[2].pk)
+        self.assertEqual(response.data['results'][0]['save_count'], 1)
+
+    def test_saving_refreshes_popular_pages_but_keeps_shared_list_cache(self):
+        job, anonymous = self.jobs[1], APIClient()
+        self.assertEqual(self.client.get('/api/jobs/', {'sort': 'popular'}).data['results'][0]['save_count'], 0)
+        anonymous.get('/api/jobs/')
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.client.post('/api/jobs/save/', {'job_id': job.pk}, format='json')
+        self.assertTrue(callbacks)
+
+        first = self.client.get('/api/jobs/', {'sort': 'popular'}).data['results'][0]
+        self.assertEqual((first['id'], first['save_count']), (job.pk, 1))
+        self.assertEqual(self.client.get(f'/api/jobs/{job.pk}/').data['save_count'], 1)
+        with self.assertNumQueries(0):
+            anonymous.get('/api/jobs/')
+
+
+class SimilarJobTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username='similar@example.com', email='similar@example.com', password='testpass123'
+        )
+        specs = [
+            ('Python Backend Developer', 'Django REST APIs in Python', 'Python, Django, PostgreSQL'),
+            ('Senior Python Developer', 'Python services with Django', 'Python, Django, Celery'),
+            ('Django Engineer', 'Backend work in Python and Django', 'Python, Django'),
+            ('React Frontend Developer', 'React single page apps in TypeScript', 'React, TypeScript, CSS'),
+            ('Frontend Engineer', 'TypeScript and React components', 'React, TypeScript'),
+            ('Accountant', 'Monthly bookkeeping and tax reports', 'Excel, accounting'),
+        ]
+        self.jobs = [
+            Job.objects.create(
+                title=title, company='TechCorp', description=description, requirements=requirements,
+                job_type='full_time', location='Warsaw, Poland', posted_by=self.user,
+            )
+            for title, description, requirements in specs
+        ]
+        refresh_similar(full=True)
+
+    def _similar(self, job):
+        return list(SimilarJob.objects.filter(job=job).order_by('rank').values_list('similar_id', flat=True))
+
+    def test_neighbours_share_vocabulary(self):
+        python, senior, django, react, frontend, accountant = self.jobs
+        self.assertEqual(set(self._similar(python)[:2]), {senior.pk, django.pk})
+        self.assertEqual(self._similar(react)[0], frontend.pk)
+        # Wspolna firma i miasto daja slabe podobienstwo, ale nie do ofert z ta sama technologia
+        scores = list(SimilarJob.objects.filter(job=python).order_by('rank').values_list('score', flat=True))
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertLess(SimilarJob.objects.get(job=accountant, similar=python).score, scores[1] / 2)
+        self.assertFalse(JobVector.objects.filter(dirty=True).exists())
+
+    def test_incremental_refresh_follows_edits_and_deactivation(self):
+        python, senior, django, react, frontend, accountant = self.jobs
+        accountant.title, accountant.description = 'React Developer', 'React and TypeScript frontend'
+        accountant.requirements = 'React, TypeScript'
+        accountant.save()
+        self.assertTrue(JobVector.objects.get(pk=accountant.pk).dirty)
+        refresh_similar()
+        self.assertIn(accountant.pk, self._similar(react)[:2])
+        self.assertIn(react.pk, self._similar(accountant)[:2])
+
+        senior.is_active = False
+        senior.save()
+        refresh_similar()
+        self.assertNotIn(senior.pk, self._similar(python))
+        self.assertEqual(self._similar(senior), [])
+
+        django.delete()
+        self.assertTrue(JobVector.objects.get(pk=python.pk).dirty)
+        refresh_similar()
+        self.assertNotIn(django.pk, self._similar(python))
+        self.assertEqual(len(self._similar(python)), 3)
+
+    def test_dirty_flags_outlive_a_failed_or_overtaken_refresh(self):
+        python, senior = self.jobs[:2]
+        python.save()
+        with mock.patch('apps.jobs.similar.SimilarJob.objects.bulk_create', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                refresh_similar()
+        self.assertTrue(JobVector.objects.get(pk=python.pk).dirty)
+
+        store_vectors = similar._store_vectors
+
+        def save_during_refresh(job_ids, dims):
+            store_vectors(job_ids, dims)
+            senior.save()
+
+        with mock.patch('apps.jobs.similar._store_vectors', side_effect=save_during_refresh):
+            refresh_similar()
+        self.assertEqual(set(JobVector.objects.filter(dirty=True).values_list('pk', flat=True)), {senior.pk})
+
+    def test_refresh_over_the_memory_limit_is_refused(self):
+        self.jobs[0].save()
+        with self.settings(JOBS_SIMILAR_MAX_MATRIX_MB=0), self.assertLogs('apps.jobs.similar', 'ERROR'):
+            self.assertEqual(refresh_similar(), 0)
+        self.assertTrue(JobVector.objects.get(pk=self.jobs[0].pk).dirty)
+
+    def test_endpoint_reads_in_one_query(self):
+        python = self.jobs[0]
+        url = reverse('job-similar', args=[python.pk])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(queries), 1)
+        results = response.json()['results']
+        self.assertEqual([row['id'] for row in results], self._similar(python))
+        self.assertEqual(set(results[0]), {
+            'id', 'title', 'company', 'location', 'job_type', 'salary_min', 'salary_max', 'is_premium', 'score',
+        })
+        self.assertEqual(self.client.get(reverse('job-similar', args=[999999])).json(), {'results': []})
+
+class JobFeedTest(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username='feed@example.com', email='feed@example.com', password='testpass123'
+        )
+        self.client.force_authenticate(self.user)
+
+        def create(title, requirements, location, salary):
+            return Job.objects.create(
+                title=title, company='TechCorp', description='Great job.', requirements=requirements,
+                job_type='full_time', location=location, salary_min=salary, salary_max=salary + 2000,
+                posted_by=self.user,
+            )
+
+        self.python = [create(f'Python Developer {i}', 'Python, Django', 'Warsaw, Poland', 15000) for i in range(4)]
+        self.react = [create(f'React Developer {i}', 'React, TypeScript', 'Krakow, Poland', 9000) for i in range(4)]
+        self.react[0].save_count = 50
+        self.react[0].save()
+
+    def _feed(self):
+        response = self.client.get(reverse('job-feed'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()
+
+    def test_feed_without_saves_falls_back_to_popular(self):
+        data = self._feed()
+        self.assertFalse(data['personalized'])
+        self.assertEqual(data['results'][0]['id'], self.react[0].pk)
+
+    def test_feed_ranks_jobs_like_saved_ones_and_skips_them(self):
+        for job in self.python[:2]:
+            self.client.post('/api/jobs/save/', {'job_id': job.pk}, format='json')
+        data = self._feed()
+        self.assertTrue(data['personalized'])
+        ids = [job['id'] for job in data['results']]
+        self.assertEqual(set(ids[:2]), {job.pk for job in self.python[2:]})
+        self.assertFalse({job.pk for job in self.python[:2]} & set(ids))
+        self.assertEqual(data['results'][0]['requirements'], ['Python', 'Django'])
+
+    def test_ranking_is_cached_until_saved_set_changes(self):
+        self.client.post('/api/jobs/save/', {'job_id': self.python[0].pk}, format='json')
+        self._feed()
+        with CaptureQueriesContext(connection) as queries:
+            data = self._feed()
+        # Wersja zapisanych, strona ofert z umiejetnosciami i zapisane oferty dla is_saved - bez liczenia rankingu
+        self.assertLessEqual(len(queries), 4)
+        self.assertIn(self.python[1].pk, [job['id'] for job in data['results']])
+
+        self.client.post('/api/jobs/save/', {'job_id': self.python[1].pk}, format='json')
+        self.assertNotIn(self.python[1].pk, [job['id'] for job in self._feed()['results']])
+        self.client.delete(f'/api/jobs/{self.python[1].pk}/unsave/')
+        self.assertIn(self.python[1].pk, [job['id'] for job in self._feed()['results']])
+
+    def test_feed_paginates_with_offset_and_limit(self):
+        ids = [job['id'] for job in self._feed()['results']]
+        response = self.client.get(reverse('job-feed'), {'offset': 2, 'limit': 3})
+        self.assertEqual([job['id'] for job in response.json()['results']], ids[2:5])
+        self.assertEqual(self.client.get(reverse('job-feed'), {'limit': 0}).status_code,
+                         status.HTTP_400_BAD_REQUEST)
+
+class SalaryInsightsTest(TestCase):
+    def setUp(self):
+        reset_snapshot()
+        self.addCleanup(reset_snapshot)
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username='insights@example.com', email='insights@example.com', password='testpass123'
+        )
+
+        def create(salary_min, salary_max, job_type='full_time', location='Warsaw, Poland',
+                   requirements='Python, Django', **extra):
+            return Job.objects.create(
+                title='Developer', company='TechCorp', description='Great job.', requirements=requirements,
+                job_type=job_type, location=location, salary_min=salary_min, salary_max=salary_max,
+                posted_by=self.user, **extra
+            )
+
+        self.jobs = [
+            create(10000, 12000),
+            create(14000, 16000),
+            create(20000, None, location='Krakow, Poland'),
+            create(5000, 7000, job_type='part_time', location='Krakow, Poland', requirements='React'),
+            create(None, None),
+            create(30000, 40000, is_active=False),
+        ]
+
+    def _insights(self, **params):
+        response = self.client.get(reverse('salary-insights'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()
+
+    def test_percentiles_and_histogram_match_numpy(self):
+        data = self._insights(bins=4)
+        midpoints = np.array([11000, 15000, 20000, 6000])
+        self.assertEqual(data['count'], 4)
+        self.assertEqual(data['mean'], midpoints.mean())
+        for name, q in [('p10', 10), ('p50', 50), ('p90', 90)]:
+            self.assertAlmostEqual(data['percentiles'][name], np.percentile(midpoints, q), places=2)
+        counts, edges = np.histogram(midpoints, bins=4)
+        self.assertEqual(data['histogram']['counts'], counts.tolist())
+        self.assertEqual(data['histogram']['edges'], edges.tolist())
+
+    def test_slices_by_job_type_location_and_skill(self):
+        data = self._insights()
+        self.assertEqual(data['by_job_type'][0], {
+            'job_type': 'full_time', 'count': 3, 'p25': 13000.0, 'median': 15000.0, 'p75': 17500.0,
+        })
+        self.assertEqual({row['location']: row['count'] for row in data['by_location']},
+                         {'Warsaw, Poland': 2, 'Krakow, Poland': 2})
+        self.assertEqual({row['skill']: row['median'] for row in data['by_skill']},
+                         {'Python': 15000.0, 'Django': 15000.0, 'React': 6000.0})
+
+        data = self._insights(job_type='full_time', location='Krakow, Poland')
+        self.assertEqual((data['count'], data['percentiles']['p50']), (1, 20000.0))
+        data = self._insights(skill=' PYTHON ')
+        self.assertEqual((data['count'], data['percentiles']['p50']), (3, 15000.0))
+        self.assertEqual(self._insights(skill='cobol')['count'], 0)
+        self.assertEqual(self.client.get(reverse('salary-insights'), {'bins': 0}).status_code,
+                         status.HTTP_400_BAD_REQUEST)
+
+    def test_snapshot_is_reused_between_requests(self):
+        self._insights()
+        with CaptureQueriesContext(connection) as queries:
+            self._insights(job_type='part_time')
+        # Tylko nazwy umiejetnosci do grup - same statystyki nie czytaja bazy
+        self.assertEqual(len(queries), 1)
+
+    @override_settings(JOBS_INSIGHTS_REFRESH_INTERVAL=0)
+    def test_incremental_refresh_follows_changes(self):
+        self.assertEqual(self._insights()['count'], 4)
+        edited, deactivated, _, _, unpaid, inactive = self.jobs
+        edited.salary_min, edited.salary_max = 30000, 34000
+        edited.save()
+        deactivated.is_active = False
+        deactivated.save()
+        unpaid.salary_max = 9000
+        unpaid.save()
+        inactive.is_active = True
+        inactive.save()
+        data = self._insights()
+        self.assertEqual(data['count'], 5)
+        self.assertEqual(data['histogram']['edges'][-1], 35000.0)
+
+        self.jobs[3].delete()
+        self.assertEqual(self._insights(job_type='part_time')['count'], 0)
+
+    def test_refresh_matches_full_build(self):
+        snapshot = SalarySnapshot.build()
+        self.jobs[0].salary_max = 50000
+        self.jobs[0].save()
+        Job.objects.filter(pk=self.jobs[2].pk).update(is_active=False, updated_at=timezone.now())
+        refreshed, rebuilt = snapshot.refreshed(), SalarySnapshot.build()
+        self.assertEqual(refreshed.ids.tolist(), rebuilt.ids.tolist())
+        self.assertEqual(refreshed.salaries.tolist(), rebuilt.salaries.tolist())
+        self.assertEqual(sorted(zip(refreshed.ids[refreshed.pair_rows].tolist(), refreshed.pair_skills.tolist())),
+                         sorted(zip(rebuilt.ids[rebuilt.pair_rows].tolist(), rebuilt.pair_skills.tolist())))
+
+class GeoSearchTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.owner = get_user_model().objects.create_user(
+            username='geo@example.com', email='geo@example.com', password='testpass123'
+        )
+        rows = [
+            ('Warsaw Backend', 'full_time', 'Warszawa (hybrid)'),
+            ('Warsaw QA', 'contract', 'Warsaw, Poland'),
+            ('Radom Backend', 'full_time', 'Radom, Poland'),
+            ('Krakow Backend', 'full_time', 'Kraków / Remote'),
+            ('Remote Backend', 'full_time', 'Remote'),
+        ]
+        self.jobs = {
+            title: Job.objects.create(
+                title=title, company='TechCorp', description='Great job.', requirements='Python',
+                job_type=job_type, location=location, posted_by=self.owner,
+            )
+            for title, job_type, location in rows
+        }
+
+    def _titles(self, params):
+        response = self.client.get('/api/jobs/', params)
+        self.assertEqual(response.status_code, 200)
+        return sorted(job['title'] for job in response.data['results'])
+
+    def test_geohash_matches_reference_encoding(self):
+        self.assertEqual(encode_geohash(57.64911, 10.40744, 11), 'u4pruydqqvj')
+
+    def test_locations_are_geocoded_on_save(self):
+        warsaw = self.jobs['Warsaw Backend']
+        self.assertEqual((warsaw.latitude, warsaw.longitude), (52.2297, 21.0122))
+        self.assertEqual(warsaw.geohash, self.jobs['Warsaw QA'].geohash)
+        self.assertEqual(self.jobs['Remote Backend'].geohash, '')
+        self.assertIsNone(self.jobs['Remote Backend'].latitude)
+
+        warsaw.location = 'Gdansk, Poland'
+        warsaw.save()
+        warsaw.refresh_from_db()
+        self.assertEqual(warsaw.geohash, get_gazetteer().lookup('Gdańsk').geohash)
+
+    def test_within_matches_haversine_over_all_places(self):
+        gazetteer = get_gazetteer()
+        distances = haversine_km(52.2297, 21.0122, gazetteer.latitudes, gazetteer.longitudes)
+        for radius in (0, 90, 300, 1500):
+            expected = {place.name for place, distance in zip(gazetteer.places, distances) if distance <= radius}
+            self.assertEqual({place.name for place in gazetteer.within(52.2297, 21.0122, radius)}, expected)
+
+    def test_radius_filter(self):
+        self.assertEqual(self._titles({'near': 'warsaw'}), ['Warsaw Backend', 'Warsaw QA'])
+        self.assertEqual(self._titles({'near': 'Warszawa', 'radius_km': 100}),
+                         ['Radom Backend', 'Warsaw Backend', 'Warsaw QA'])
+        self.assertEqual(self._titles({'near': 'Warsaw', 'radius_km': 300}),
+                         ['Krakow Backend', 'Radom Backend', 'Warsaw Backend', 'Warsaw QA'])
+
+    def test_radius_filter_combines_with_other_filters(self):
+        self.assertEqual(self._titles({'near': 'Warsaw', 'radius_km': 100, 'job_type': 'full_time'}),
+                         ['Radom Backend', 'Warsaw Backend'])
+        self.assertEqual(self._titles({'near': 'Warsaw', 'radius_km': 100, 'q': 'qa'}), ['Warsaw QA'])
+
+    def test_invalid_radius_filters_are_rejected(self):
+        self.assertEqual(self.client.get('/api/jobs/', {'near': 'Atlantis'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/jobs/', {'radius_km': 50}).status_code, 400)
+        self.assertEqual(self.client.get('/api/jobs/', {'near': 'Warsaw', 'radius_km': 100000}).status_code, 400)
+        self.assertEqual(self.client.get('/api/jobs/', {'near': 'Warsaw', 'radius_km': -1}).status_code, 400)
+
+    def test_locations_endpoint_counts_active_jobs(self):
+        Job.objects.create(
+            title='Closed', company='TechCorp', description='Great job.', requirements='Python',
+            job_type='full_time', location='Radom', posted_by=self.owner, is_active=False,
+        )
+        response = self.client.get(reverse('job-locations'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([(place['name'], place['count']) for place in response.data],
+                         [('Warsaw', 2), ('Krakow', 1), ('Radom', 1)])
+
+    def test_backfill_command_geocodes_missing_coordinates(self):
+        Job.objects.update(latitude=None, longitude=None, geohash='')
+        out = StringIO()
+        call_command('geocode_jobs', stdout=out)
+        self.assertIn('Geocoded 4 jobs', out.getvalue())
+        self.assertEqual(Job.objects.exclude(geohash='').count(), 4)
+        self.assertEqual(self._titles({'near': 'Krakow'}), ['Krakow Backend'])
+
+
+class JobApplicationTest(TestCase):
+    RESUME = b'%PDF-1.4 synthetic resume ' + b'x' * 2000
+
+    def setUp(self):
+        get_cache().clear()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root, RESUME_SENDFILE_HEADER='')
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.media_root = media_root
+        User = get_user_model()
+        self.employer = User.objects.create_user(username='hr@example.com', email='hr@example.com', password='x')
+        self.applicant = User.objects.create_user(username='cv@example.com', email='cv@example.com', password='x')
+        self.job = Job.objects.create(
+            title='Python Developer', company='TechCorp', description='Great job.', requirements='Python',
+            job_type='full_time', location='Warsaw, Poland', posted_by=self.employer,
+        )
+        self.client = APIClient()
+
+    def _apply(self, user, job=None, content=RESUME, name='cv.pdf'):
+        self.client.force_authenticate(user)
+        return self.client.post(f'/api/jobs/{(job or self.job).pk}/apply/', {
+            'cover_letter': 'Hello', 'resume': SimpleUploadedFile(name, content, 'application/pdf'),
+        }, format='multipart')
+
+    def _stored_files(self):
+        return [name for _, _, names in os.walk(self.media_root) for name in names]
+
+    def test_application_stores_resume_once_per_content(self):
+        other_job = Job.objects.create(
+            title='Django Developer', company='TechCorp', description='Great job.', requirements='Django',
+            job_type='full_time', location='Warsaw, Poland', posted_by=self.employer,
+        )
+        first = self._apply(self.applicant)
+        second = self._apply(self.applicant, job=other_job, name='resume-copy.pdf')
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.status_code, status.HTTP_201_CREATED)
+        self.assertEqual((first.data['resume_filename'], first.data['resume_size']), ('cv.pdf', len(self.RESUME)))
+        applications = JobApplication.objects.order_by('pk')
+        self.assertEqual(len({application.resume.name for application in applications}), 1)
+        self.assertEqual(len(self._stored_files()), 1)
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.application_count, 1)
+
+    def test_duplicate_oversized_and_unsupported_uploads_are_rejected(self):
+        self.assertEqual(self._apply(self.applicant).status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self._apply(self.applicant).status_code, status.HTTP_400_BAD_REQUEST)
+
+        other = get_user_model().objects.create_user(username='o@example.com', email='o@example.com', password='x')
+        with self.settings(RESUME_MAX_UPLOAD_SIZE=1024):
+            self.assertEqual(self._apply(other).status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        self.assertEqual(self._apply(other, name='cv.exe').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(JobApplication.objects.filter(applicant=other).count(), 0)
+        self.assertEqual(len(self._stored_files()), 1)
+
+    def test_employer_downloads_resume_with_ranges(self):
+        application_id = self._apply(self.applicant).data['id']
+        url = f'/api/jobs/applications/{application_id}/resume/'
+        self.client.force_authenticate(self.employer)
+
+        full = self.client.get(url, HTTP_ACCEPT='application/pdf')
+        self.assertEqual(full.status_code, status.HTTP_200_OK)
+        self.assertEqual(b''.join(full.streaming_content), self.RESUME)
+        self.assertEqual(full['Accept-Ranges'], 'bytes')
+
+        head = self.client.get(url, HTTP_RANGE='bytes=0-3')
+        self.assertEqual(head.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(b''.join(head.streaming_content), b'%PDF')
+        self.assertEqual(head['Content-Range'], f'bytes 0-3/{len(self.RESUME)}')
+        tail = self.client.get(url, HTTP_RANGE='bytes=-5')
+        self.assertEqual(b''.join(tail.streaming_content), self.RESUME[-5:])
+        self.assertEqual(self.client.get(url, HTTP_RANGE='bytes=999999-').status_code,
+                         status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=full['ETag']).status_code,
+                         status.HTTP_304_NOT_MODIFIED)
+
+        with self.settings(RESUME_SENDFILE_HEADER='X-Accel-Redirect'):
+            offloaded = self.client.get(url)
+        self.assertTrue(offloaded['X-Accel-Redirect'].startswith('/protected/resumes/'))
+
+        self.client.force_authenticate(get_user_model().objects.create_user(
+            username='stranger@example.com', email='stranger@example.com', password='x'))
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_offloaded_resume_filename_is_encoded(self):
+        application_id = self._apply(self.applicant).data['id']
+        JobApplication.objects.filter(pk=application_id).update(resume_filename='Życiorys "v2"\r\nX: y.pdf')
+        self.client.force_authenticate(self.employer)
+
+        with self.settings(RESUME_SENDFILE_HEADER='X-Accel-Redirect'):
+            response = self.client.get(f'/api/jobs/applications/{application_id}/resume/')
+
+        disposition = response['Content-Disposition']
+        self.assertTrue(disposition.startswith("inline; filename*=utf-8''"))
+        self.assertNotIn('"', disposition)
+        self.assertNotIn('\n', disposition)
+
+
+class JobResponseCacheTest(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username='seeker@example.com', email='seeker@example.com', password='testpass123'
+        )
+        self.job = Job.objects.create(
+            title='Python Developer', company='TechCorp', description='Great job.', requirements='Python',
+            job_type='full_time', location='Warsaw, Poland', posted_by=self.user,
+        )
+        self.intern = Job.objects.create(
+            title='Intern', company='TechCorp', description='Learn.', requirements='Git',
+            job_type='internship', location='Warsaw, Poland', posted_by=self.user,
+        )
+
+    def test_repeated_anonymous_requests_skip_database(self):
+        self.client.get('/api/jobs/')
+        self.client.get(f'/api/jobs/{self.job.pk}/')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/api/jobs/').status_code, 200)
+            self.assertEqual(self.client.get(f'/api/jobs/{self.job.pk}/').status_code, 200)
+
+    def test_saved_flags_are_overlaid_per_user(self):
+        self.client.get('/api/jobs/')
+        SavedJob.objects.create(user=self.user, job=self.job)
+        self.client.force_authenticate(self.user)
+        with self.assertNumQueries(1):
+            results = self.client.get('/api/jobs/').data['results']
+        self.assertEqual({job['id']: job['is_saved'] for job in results},
+                         {self.job.pk: True, self.intern.pk: False})
+        self.client.force_authenticate(None)
+        self.assertFalse(any(job['is_saved'] for job in self.client.get('/api/jobs/').data['results']))
+
+    def test_job_changes_invalidate_only_affected_entries(self):
+        self.client.get(f'/api/jobs/{self.job.pk}/')
+        self.client.get(f'/api/jobs/{self.intern.pk}/')
+        full_time_version = partition_versions(['full_time'])
+
+        self.intern.title = 'Summer Intern'
+        self.intern.save()
+
+        self.assertEqual(partition_versions(['full_time']), full_time_version)
+        with self.assertNumQueries(0):
+            self.client.get(f'/api/jobs/{self.job.pk}/')
+        self.assertEqual(self.client.get(f'/api/jobs/{self.intern.pk}/').data['title'], 'Summer Intern')
+        titles = [job['title'] for job in self.client.get('/api/jobs/').data['results']]
+        self.assertIn('Summer Intern', titles)
+
+    def test_conditional_requests_return_304(self):
+        response = self.client.get(f'/api/jobs/{self.job.pk}/')
+        etag = response['ETag']
+        self.assertEqual(self.client.get(f'/api/jobs/{self.job.pk}/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self.client.get(
+            f'/api/jobs/{self.job.pk}/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        ).status_code, 304)
+
+        self.client.force_authenticate(self.user)
+        user_etag = self.client.get('/api/jobs/')['ETag']
+        SavedJob.objects.create(user=self.user, job=self.job)
+        self.assertEqual(self.client.get('/api/jobs/', HTTP_IF_NONE_MATCH=user_etag).status_code, 200)
+
+
+class JSONRenderingTest(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.client = APIClient()
+        owner = get_user_model().objects.create_user(
+            username='render@example.com', email='render@example.com', password='testpass123'
+        )
+        for i in range(5):
+            Job.objects.create(
+                title=f'Dev\u2028{i} ż', company='TechCorp', description='Great job.', requirements='Python, Django',
+                job_type='full_time', location='Warsaw, Poland', salary_min=10000, salary_max=None,
+                posted_by=owner,
+            )
+
+    def test_matches_stock_renderer_on_list_payload(self):
+        response = self.client.get('/api/jobs/')
+        self.assertEqual(response.content, JSONRenderer().render(response.data))
+        self.assertIn(b'\\u2028', response.content)
+
+    def test_encodes_decimal_datetime_and_lazy_strings_like_drf(self):
+        data = {
+            'salary': Decimal('12000.50'),
+            'at': datetime(2024, 5, 1, 12, 30, 15, 250000, tzinfo=dt_timezone.utc),
+            'label': gettext_lazy('Full Time'),
+            'values': np.arange(3),
+            1: 'non-string key',
+        }
+        self.assertEqual(renderers.FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_falls_back_to_stdlib(self):
+        data = {'salary': Decimal('1.5'), 'big': 2 ** 70}
+        self.assertEqual(renderers.FastJSONRenderer().render(data), JSONRenderer().render(data))
+        with mock.patch.object(renderers, 'orjson', None):
+            self.assertFalse(renderers.FastJSONRenderer().uses_orjson())
+            self.assertEqual(renderers.FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_indent_is_rendered_by_stock_renderer(self):
+        response = self.client.get('/api/jobs/', HTTP_ACCEPT='application/json; indent=2')
+        self.assertTrue(response.content.startswith(b'{\n  "'))
+
+    def test_chunks_join_into_rendered_body(self):
+        data = self.client.get('/api/jobs/').data
+        renderer = renderers.FastJSONRenderer()
+        chunks = list(renderer.render_chunks(data, stream_key='results', size=2))
+        self.assertGreater(len(chunks), 3)
+        self.assertEqual(b''.join(chunks), renderer.render(data))
+        self.assertEqual(b''.join(renderer.render_chunks(iter(range(5)), size=2)), b'[0,1,2,3,4]')
+        self.assertEqual(b''.join(renderer.render_chunks([], size=2)), b'[]')
+
+
+class JobImportTest(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+
+    def _write(self, name, content):
+        path = os.path.join(self.tmpdir, name)
+        with open(path, 'w', encoding='utf-8') as handle:
+            handle.write(content)
+        return path
+
+    def _import(self, path, *args):
+        out = StringIO()
+        call_command('import_jobs', path, '--chunk-size', '2', *args, stdout=out)
+        return out.getvalue()
+
+    def test_jsonl_import_upserts_on_natural_key(self):
+        rows = [
+            {'title': 'Python Developer', 'company': 'TechCorp', 'location': 'Łódź, Poland',
+             'type': 'Full-time', 'salary': '15,000 - 20,000 PLN', 'requirements': ['Python', 'Django']},
+            {'title': 'QA Engineer', 'company': 'TestPro', 'location': 'Warsaw, Poland',
+             'job_type': 'contract', 'salary_min': '9000', 'salary_max': '12000'},
+            {'title': 'Broken', 'company': 'X', 'location': 'Y', 'type': 'Freelance'},
+            {'title': 'Python Developer', 'company': 'TechCorp', 'location': 'Łódź, Poland',
+             'type': 'Part-time', 'salary': '7,000 - 9,000 PLN'},
+        ]
+        path = self._write('feed.jsonl', '\n'.join(json.dumps(row) for row in rows) + '\nnot json\n')
+        output = self._import(path)
+
+        self.assertIn('2 skipped', output)
+        self.assertIn('rows/sec', output)
+        self.assertEqual(Job.objects.count(), 2)
+        python_job = Job.objects.get(title='Python Developer')
+        self.assertEqual((python_job.job_type, python_job.salary_min), ('part_time', Decimal('7000')))
+        self.assertEqual(python_job.requirements, '')
+        self.assertTrue(JobSearchTerm.objects.filter(job=python_job, term='lodz').exists())
+
+        self._import(path)
+        self.assertEqual(Job.objects.count(), 2)
+
+    def test_unparseable_salary_is_left_empty(self):
+        path = self._write('feed.jsonl', json.dumps(
+            {'title': 'Go Developer', 'company': 'TechCorp', 'location': 'Warsaw', 'type': 'Full-time',
+             'salary': 'Competitive'}) + '\n')
+        self._import(path)
+        job = Job.objects.get(title='Go Developer')
+        self.assertEqual((job.salary_min, job.salary_max), (None, None))
+
+    def test_upsert_keeps_manual_deactivation_unless_feed_sets_it(self):
+        record = {'title': 'Go Developer', 'company': 'TechCorp', 'location': 'Warsaw', 'type': 'Full-time'}
+        path = self._write('feed.jsonl', json.dumps(record) + '\n')
+        self._import(path)
+        Job.objects.update(is_active=False)
+
+        self._import(path)
+        self.assertFalse(Job.objects.get().is_active)
+
+        path = self._write('active.jsonl', json.dumps({**record, 'is_active': True}) + '\n')
+        self._import(path)
+        self.assertTrue(Job.objects.get().is_active)
+
+    def test_upsert_keeps_paid_promotion_unless_feed_sets_it(self):
+        record = {'title': 'Go Developer', 'company': 'TechCorp', 'location': 'Warsaw', 'type': 'Full-time'}
+        path = self._write('feed.jsonl', json.dumps(record) + '\n')
+        self._import(path)
+        Job.objects.update(is_premium=True, is_active=False)
+
+        self._import(path)
+        self.assertEqual(Job.objects.values_list('is_premium', 'is_active').get(), (True, False))
+
+        path = self._write('plain.jsonl', json.dumps({**record, 'is_premium': False}) + '\n')
+        self._import(path)
+        self.assertEqual(Job.objects.values_list('is_premium', 'is_active').get(), (False, False))
+
+    def test_csv_import_resumes_from_checkpoint(self):
+        lines = ['title,company,location,type,salary']
+        lines += [f'Job {i},TechCorp,Warsaw,Full-time,"1,000 - 2,000 PLN"' for i in range(5)]
+        path = self._write('feed.csv', '\n'.join(lines) + '\n')
+        checkpoint = Checkpoint(path + '.checkpoint', path)
+        checkpoint.save(rows=4, offset=None)
+
+        output = self._import(path, '--resume')
+
+        self.assertIn('Resuming after row 4', output)
+        self.assertEqual(list(Job.objects.values_list('title', flat=True)), ['Job 4'])
+        self.assertFalse(os.path.exists(checkpoint.path))
+
+    def test_load_all_mock_jobs_uses_bulk_import(self):
+        call_command('load_all_mock_jobs', stdout=StringIO())
+        call_command('load_all_mock_jobs', stdout=StringIO())
+        self.assertEqual(Job.objects.count(), 15)
+
+
+class SyntheticDataTest(TestCase):
+    def test_generator_is_deterministic(self):
+        owner = get_user_model().objects.create_user(
+            username='owner@test.com', email='owner@test.com', password='x'
+        )
+        fields = ('title', 'company', 'location', 'job_type', 'salary_min', 'is_active')
+        first = [tuple(getattr(job, name) for name in fields) for job in generate_jobs(30, [owner], seed=7)]
+        second = [tuple(getattr(job, name) for name in fields) for job in generate_jobs(30, [owner], seed=7)]
+        self.assertEqual(first, second)
+        self.assertEqual(JobSearchTerm.objects.filter(term='poland').count(), 60)
+
+    def test_dataset_pairs_are_unique(self):
+        users, jobs = generate_dataset(users=10, jobs=40, saved=50, applications=20, seed=3)
+        self.assertEqual((len(users), len(jobs)), (10, 40))
+        self.assertEqual(SavedJob.objects.count(), 50)
+        self.assertEqual(SavedJob.objects.values('user', 'job').distinct().count(), 50)
+
+    def test_generate_load_data_command(self):
+        out = StringIO()
+        call_command('generate_load_data', users=5, jobs=20, saved=10, applications=5, seed=1, stdout=out)
+        self.assertIn('Generated 5 users and 20 jobs', out.getvalue())
+        self.assertEqual(Job.objects.count(), 20)
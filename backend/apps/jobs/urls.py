@@ -4,8 +4,16 @@ from . import views
 urlpatterns = [
     path('', views.JobListCreateView.as_view(), name='job-list-create'),
     path('<int:pk>/', views.JobDetailView.as_view(), name='job-detail'),
+    path('<int:pk>/similar/', views.similar_jobs, name='job-similar'),
     path('<int:job_id>/apply/', views.apply_for_job, name='apply-job'),
+    path('applications/<int:application_id>/resume/', views.ApplicationResumeView.as_view(),
+         name='application-resume'),
+    path('feed/', views.job_feed, name='job-feed'),
+    path('locations/', views.job_locations, name='job-locations'),
+    path('insights/salaries/', views.salary_insights, name='salary-insights'),
     path('saved/', views.SavedJobListView.as_view(), name='saved-jobs-list'),
+    path('saved/ids/', views.saved_job_ids, name='saved-job-ids'),
+    path('saved/state/', views.saved_job_states, name='saved-job-states'),
     path('save/', views.save_job, name='save-job'),
     path('<int:job_id>/unsave/', views.unsave_job, name='unsave-job'),
     path('<int:job_id>/check-saved/', views.check_saved_job, name='check-saved-job'),
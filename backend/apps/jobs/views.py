@@ -1,15 +1,73 @@
+from django.db import IntegrityError, transaction
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import quote_etag
 from rest_framework import generics, permissions, status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, parser_classes, permission_classes
 from rest_framework.response import Response
-from .models import Job, JobApplication, SavedJob
-from .serializers import JobSerializer, SavedJobSerializer, SaveJobSerializer
-import logging
-
-logger = logging.getLogger(__name__)
+from rest_framework.views import APIView
+from fluffy_jobs.renderers import StreamingJSONResponse, chunk_size as stream_chunk_size
+from .models import Job, JobApplication, SavedJob, SimilarJob
+from .serializers import (
+    JobSerializer, SavedJobSerializer, SaveJobSerializer, JobFilterSerializer, SavedStateSerializer,
+    JobApplicationSerializer, SimilarJobSerializer, FeedQuerySerializer, SalaryInsightsQuerySerializer,
+)
+from .search import search_jobs
+from .filters import filter_jobs, job_facets
+from .skills import with_skills
+from .cache import (
+    JOB_TYPES, cached_response, detail_cache_key, get_cache, list_cache_key, list_partitions,
+    make_entry, partition_versions, saved_ids_version, versions_last_modified,
+)
+from .pagination import KeysetPagination, SavedJobPagination
+from .counters import adjust, view_counter
+from .feed import ranked_feed
+from .geo import place_counts
+from .insights import salary_insights as compute_salary_insights
+from .resumes import IgnoreAcceptNegotiation, ResumeUploadParser, resume_response
 
 class JobListCreateView(generics.ListCreateAPIView):
     queryset = Job.objects.filter(is_active=True)
     serializer_class = JobSerializer
+    pagination_class = KeysetPagination
+
+    def get_filters(self):
+        if not hasattr(self, '_filters'):
+            serializer = JobFilterSerializer(data=self.request.query_params)
+            serializer.is_valid(raise_exception=True)
+            self._filters = serializer.validated_data
+        return self._filters
+
+    def get_base_queryset(self):
+        queryset = super().get_queryset()
+        query = self.request.query_params.get('q', '').strip()
+        if query:
+            queryset = search_jobs(queryset, query)
+        return queryset
+
+    def get_queryset(self):
+        queryset = with_skills(filter_jobs(self.get_base_queryset(), self.get_filters()))
+        if self.get_filters().get('sort') == 'popular':
+            # Odczyt po indeksie job_active_popular_idx
+            queryset = queryset.order_by('-save_count', '-pk')
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        versions = partition_versions(list_partitions(request))
+        cache_key = list_cache_key(request, versions)
+        entry = get_cache().get(cache_key)
+        if entry is None:
+            response = self.list_uncached(request, *args, **kwargs)
+            entry = make_entry(response.data, versions_last_modified(versions))
+            get_cache().set(cache_key, entry)
+        return cached_response(request, entry, Response)
+
+    def list_uncached(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        # Liczniki filtrow tylko na pierwszej stronie - panel filtrow renderuje sie raz
+        if not request.query_params.get(self.paginator.cursor_query_param):
+            response.data['facets'] = job_facets(self.get_base_queryset(), self.get_filters())
+        return response
 
     def get_permissions(self):
         if self.request.method == 'POST':
@@ -17,42 +75,137 @@ class JobListCreateView(generics.ListCreateAPIView):
         return [permissions.AllowAny()]
 
 class JobDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Job.objects.all()
+    queryset = with_skills(Job.objects.all())
     serializer_class = JobSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
+    def retrieve(self, request, *args, **kwargs):
+        cache_key = detail_cache_key(self.kwargs[self.lookup_field])
+        entry = get_cache().get(cache_key)
+        if entry is None:
+            instance = self.get_object()
+            data = self.get_serializer(instance).data
+            entry = make_entry(data, int(instance.updated_at.timestamp()))
+            get_cache().set(cache_key, entry)
+        view_counter.hit(int(self.kwargs[self.lookup_field]))
+        return cached_response(request, entry, Response)
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def similar_jobs(request, pk):
+    """Precomputed neighbours of a job (apps.jobs.similar), best first, in one indexed read."""
+    # Nieistniejaca oferta to po prostu pusta lista - bez dodatkowego zapytania o Job
+    neighbours = (
+        SimilarJob.objects.filter(job_id=pk, similar__is_active=True)
+        .select_related('similar')
+        .only('score', 'similar__title', 'similar__company', 'similar__location', 'similar__job_type',
+              'similar__salary_min', 'similar__salary_max', 'similar__is_premium')
+        .order_by('rank')
+    )
+    return Response({'results': SimilarJobSerializer(neighbours, many=True).data})
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def job_feed(request):
+    """Jobs ranked for the user by their saves (apps.jobs.feed); the ranking is cached, the page is read fresh."""
+    query = FeedQuerySerializer(data=request.query_params)
+    query.is_valid(raise_exception=True)
+    offset, limit = query.validated_data['offset'], query.validated_data['limit']
+    ids, personalized = ranked_feed(request.user)
+    page = ids[offset:offset + limit]
+    jobs = with_skills(Job.objects.filter(is_active=True)).in_bulk(page)
+    # Oferta wylaczona po policzeniu rankingu po prostu wypada ze strony
+    results = [jobs[job_id] for job_id in page if job_id in jobs]
+    return Response({
+        'count': len(ids),
+        'personalized': personalized,
+        'results': JobSerializer(results, many=True, context={'request': request}).data,
+    })
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def salary_insights(request):
+    """Salary percentiles, histogram and per job type/location/skill quartiles of active jobs (apps.jobs.insights)."""
+    query = SalaryInsightsQuerySerializer(data=request.query_params)
+    query.is_valid(raise_exception=True)
+    return Response(compute_salary_insights(**query.validated_data))
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def job_locations(request):
+    """Gazetteer places with active jobs, for the location dropdown and ?near=."""
+    versions = partition_versions(JOB_TYPES)
+    key = 'jobs:locations:' + ':'.join(str(versions[job_type]) for job_type in JOB_TYPES)
+    cache = get_cache()
+    places = cache.get(key)
+    if places is None:
+        places = place_counts(Job.objects.filter(is_active=True))
+        cache.set(key, places)
+    return Response(places)
+
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
+@parser_classes([ResumeUploadParser])
 def apply_for_job(request, job_id):
-    return Response({'message': 'Application functionality coming soon'})
+    """Multipart application (cover_letter, resume); the resume is streamed to disk, never buffered."""
+    job = get_object_or_404(Job.objects.only('pk'), pk=job_id, is_active=True)
+    already_applied = Response({'message': 'You have already applied for this job'},
+                               status=status.HTTP_400_BAD_REQUEST)
+    # Sprawdzenie przed odczytem body - duplikat nie zapisuje pliku na dysk
+    if JobApplication.objects.filter(job=job, applicant=request.user).exists():
+        return already_applied
+    serializer = JobApplicationSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    try:
+        with transaction.atomic():
+            serializer.save(job=job, applicant=request.user)
+    except IntegrityError:
+        return already_applied
+    return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+class ApplicationResumeView(APIView):
+    """Resume of an application, for the applicant and the employer who posted the job."""
+    permission_classes = [permissions.IsAuthenticated]
+    content_negotiation_class = IgnoreAcceptNegotiation
+
+    def get(self, request, application_id):
+        application = get_object_or_404(
+            JobApplication.objects.select_related('job').only(
+                'resume', 'resume_sha256', 'resume_filename', 'applicant_id', 'job__posted_by_id',
+            ),
+            pk=application_id,
+        )
+        # 404 zamiast 403 - nie zdradzamy, ze zgloszenie istnieje
+        if request.user.pk not in (application.applicant_id, application.job.posted_by_id):
+            return Response({'message': 'Application not found'}, status=status.HTTP_404_NOT_FOUND)
+        return resume_response(request._request, application)
 
 class SavedJobListView(generics.ListAPIView):
     serializer_class = SavedJobSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = SavedJobPagination
     
     def get_queryset(self):
-        logger.info(f'SavedJobListView called by user: {self.request.user}')
-        logger.info(f'User authenticated: {self.request.user.is_authenticated}')
-        logger.info(f'Authorization header: {self.request.META.get("HTTP_AUTHORIZATION", "Not found")}')
-        
-        if not self.request.user.is_authenticated:
-            logger.error('User not authenticated in SavedJobListView')
-            
-        return SavedJob.objects.filter(user=self.request.user).order_by('-saved_at')
+        return with_skills(
+            SavedJob.objects.filter(user=self.request.user).select_related('job').order_by('-saved_at'),
+            'job__job_skills',
+        )
 
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
 def save_job(request):
-    logger.info(f'Save job called by user: {request.user}')
     serializer = SaveJobSerializer(data=request.data)
     if serializer.is_valid():
         job_id = serializer.validated_data['job_id']
         job = Job.objects.get(id=job_id)
 
-        saved_job, created = SavedJob.objects.get_or_create(
-            user=request.user,
-            job=job
-        )
+        with transaction.atomic():
+            saved_job, created = SavedJob.objects.get_or_create(
+                user=request.user,
+                job=job
+            )
+            if created:
+                adjust(job.pk, save_count=1)
 
         if created:
             return Response({'message': 'Job saved successfully'}, status=status.HTTP_201_CREATED)
@@ -64,15 +217,44 @@ def save_job(request):
 @api_view(['DELETE'])
 @permission_classes([permissions.IsAuthenticated])
 def unsave_job(request, job_id):
-    try:
-        saved_job = SavedJob.objects.get(user=request.user, job_id=job_id)
-        saved_job.delete()
+    with transaction.atomic():
+        # Licznik z wyniku DELETE - dwa rownolegle zadania usuniecia zmniejsza go tylko raz
+        deleted, _ = SavedJob.objects.filter(user=request.user, job_id=job_id).delete()
+        if deleted:
+            adjust(job_id, save_count=-1)
+    if deleted:
         return Response({'message': 'Job removed from saved jobs'}, status=status.HTTP_200_OK)
-    except SavedJob.DoesNotExist:
-        return Response({'message': 'Job not found in saved jobs'}, status=status.HTTP_404_NOT_FOUND)
+    return Response({'message': 'Job not found in saved jobs'}, status=status.HTTP_404_NOT_FOUND)
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def check_saved_job(request, job_id):
     is_saved = SavedJob.objects.filter(user=request.user, job_id=job_id).exists()
     return Response({'is_saved': is_saved}, status=status.HTTP_200_OK)
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def saved_job_states(request):
+    """Which of the given job ids the user has saved - one query for a whole results page."""
+    serializer = SavedStateSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    job_ids = set(serializer.validated_data['job_ids'])
+    saved = SavedJob.objects.filter(user=request.user, job_id__in=job_ids).order_by().values_list('job_id', flat=True)
+    return Response({'saved': sorted(saved)})
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def saved_job_ids(request):
+    """All saved job ids of the user, revalidated with If-None-Match."""
+    # Wersja przed zapytaniem - zapis w miedzyczasie da nowsza wersje, wiec klient nie utknie ze starym ETagiem
+    etag = quote_etag(f'{request.user.pk}-{saved_ids_version(request.user.pk)}')
+    response = get_conditional_response(request._request, etag=etag)
+    if response is None:
+        ids = list(SavedJob.objects.filter(user=request.user).order_by('job_id').values_list('job_id', flat=True))
+        data = {'ids': ids, 'count': len(ids)}
+        # Dluga lista paczkami - caly JSON nie powstaje w pamieci jako jeden napis
+        response = StreamingJSONResponse(data, stream_key='ids') if len(ids) > stream_chunk_size() else Response(data)
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ['Authorization'])
+    return response
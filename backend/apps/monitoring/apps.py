@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+class MonitoringConfig(AppConfig):
+    name = 'apps.monitoring'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from .metrics import instrument_connection, instrument_serializers
+        instrument_serializers()
+        connection_created.connect(instrument_connection, dispatch_uid='monitoring.instrument_connection')
@@ -0,0 +1,208 @@
+"""In-process request metrics rendered in the Prometheus text format.
+
+Every worker process keeps its own histograms; Prometheus scrapes each
+worker (or sums them) the same way it does for any multi-process exporter.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SERIALIZER_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+_current = ContextVar('request_stats', default=None)
+
+
+class RequestStats:
+    """Per-request counters filled by the DB execute wrapper and serializer hook."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self._serializer_depth = 0
+
+    def db_wrapper(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += time.perf_counter() - started
+
+
+def current_stats():
+    return _current.get()
+
+
+def activate(stats):
+    return _current.set(stats)
+
+
+def deactivate(token):
+    _current.reset(token)
+
+
+class Counter:
+    type = 'counter'
+
+    def __init__(self, name, documentation, labelnames):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for labels, value in sorted(values.items()):
+            yield self.name, self._labels(labels), value
+
+    def _labels(self, values, **extra):
+        pairs = list(zip(self.labelnames, values)) + list(extra.items())
+        return ','.join(f'{name}="{_escape(value)}"' for name, value in pairs)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram(Counter):
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames, buckets):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, labels, value):
+        # Kubelek "le": pierwsza granica >= wartosc, ostatni slot to +Inf
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(labels) or ([0] * (len(self.buckets) + 1), 0)
+            counts[index] += 1
+            self._values[labels] = (counts, total + value)
+
+    def samples(self):
+        with self._lock:
+            values = {labels: (list(counts), total) for labels, (counts, total) in self._values.items()}
+        for labels, (counts, total) in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                yield f'{self.name}_bucket', self._labels(labels, le=_format(bound)), cumulative
+            yield f'{self.name}_sum', self._labels(labels), total
+            yield f'{self.name}_count', self._labels(labels), cumulative
+
+
+class Registry:
+    def __init__(self):
+        labels = ('method', 'route')
+        self.requests = Counter(
+            'http_requests_total', 'Requests by route and status code.', labels + ('status',))
+        self.duration = Histogram(
+            'http_request_duration_seconds', 'Wall time spent in the Django stack.', labels, DURATION_BUCKETS)
+        self.response_size = Histogram(
+            'http_response_size_bytes', 'Size of the response body.', labels, SIZE_BUCKETS)
+        self.db_queries = Histogram(
+            'db_queries_per_request', 'Database queries per sampled request.', labels, QUERY_BUCKETS)
+        self.db_duration = Histogram(
+            'db_query_duration_seconds', 'Time spent in the database per sampled request.', labels,
+            DURATION_BUCKETS)
+        self.serializer_duration = Histogram(
+            'serializer_duration_seconds', 'Time spent in DRF serializers per sampled request.', labels,
+            SERIALIZER_BUCKETS)
+        self.metrics = [
+            self.requests, self.duration, self.response_size,
+            self.db_queries, self.db_duration, self.serializer_duration,
+        ]
+
+    def record(self, method, route, status, duration, size=None, stats=None):
+        labels = (method, route)
+        self.requests.inc(labels + (str(status),))
+        self.duration.observe(labels, duration)
+        if size is not None:
+            self.response_size.observe(labels, size)
+        if stats is not None:
+            self.db_queries.observe(labels, stats.queries)
+            self.db_duration.observe(labels, stats.db_time)
+            self.serializer_duration.observe(labels, stats.serializer_time)
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.type}')
+            for name, labels, value in metric.samples():
+                lines.append(f'{name}{{{labels}}} {_format(value)}')
+        return '\n'.join(lines) + '\n'
+
+    def clear(self):
+        for metric in self.metrics:
+            metric.clear()
+
+
+registry = Registry()
+
+
+def db_wrapper(execute, sql, params, many, context):
+    """Execute wrapper installed on every connection; only counts for sampled requests.
+
+    The stats live in a ContextVar, so queries issued from ``sync_to_async``
+    threads of an async view are attributed to the right request too.
+    """
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    return stats.db_wrapper(execute, sql, params, many, context)
+
+
+def instrument_connection(sender, connection, **kwargs):
+    # connection_created odpala sie przy kazdym ponownym polaczeniu - bez duplikatow.
+    # Na poczatek listy, bo execute_wrapper() zdejmuje ostatni element.
+    if db_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, db_wrapper)
+
+
+def instrument_serializers():
+    """Times ``BaseSerializer.data`` for the request being sampled.
+
+    Every DRF view ends up calling ``serializer.data`` exactly once per
+    top-level serializer, so wrapping it measures to_representation of the
+    whole tree without touching the serializers themselves.
+    """
+    from rest_framework.serializers import BaseSerializer
+
+    original = BaseSerializer.data.fget
+    if getattr(original, 'instrumented', False):
+        return
+
+    def data(self):
+        stats = _current.get()
+        if stats is None or stats._serializer_depth:
+            return original(self)
+        stats._serializer_depth += 1
+        started = time.perf_counter()
+        try:
+            return original(self)
+        finally:
+            stats._serializer_depth -= 1
+            stats.serializer_time += time.perf_counter() - started
+
+    data.instrumented = True
+    BaseSerializer.data = property(data)
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _format(value):
+    return value if isinstance(value, str) else repr(value)
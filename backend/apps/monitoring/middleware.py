@@ -0,0 +1,92 @@
+import logging
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .metrics import RequestStats, activate, deactivate, registry
+
+slow_logger = logging.getLogger('fluffy_jobs.slow_requests')
+
+# Sciezki, ktorych nie liczymy (sam scraping Prometheusa)
+EXCLUDED_ROUTES = {'metrics'}
+
+
+class InstrumentationMiddleware:
+    """Records wall time, response size and, for a sample of requests, DB and serializer time.
+
+    Durations and sizes are cheap and recorded for every request. Query
+    counts/time need an execute wrapper on every connection and serializer
+    time needs the ``BaseSerializer.data`` hook to do work, so those are only
+    collected for a ``METRICS_SAMPLE_RATE`` fraction of requests. Requests
+    slower than ``METRICS_SLOW_REQUEST_MS`` are logged without bodies or headers.
+
+    The middleware is sync and async capable, so under ASGI async views are
+    not pushed into a thread just to pass through it.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'METRICS_ENABLED', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'METRICS_SAMPLE_RATE', 1.0)
+        self.slow_threshold = getattr(settings, 'METRICS_SLOW_REQUEST_MS', 500) / 1000
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        stats = RequestStats() if random.random() < self.sample_rate else None
+        token = activate(stats)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            deactivate(token)
+        return self._record(request, response, time.perf_counter() - started, stats)
+
+    async def __acall__(self, request):
+        stats = RequestStats() if random.random() < self.sample_rate else None
+        token = activate(stats)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            deactivate(token)
+        return self._record(request, response, time.perf_counter() - started, stats)
+
+    def _record(self, request, response, duration, stats):
+        match = request.resolver_match
+        route = match.route if match else 'unmatched'
+        if route in EXCLUDED_ROUTES:
+            return response
+
+        registry.record(request.method, route, response.status_code, duration,
+                        size=_response_size(response), stats=stats)
+        if duration >= self.slow_threshold:
+            self._log_slow(request, route, response, duration, stats)
+        return response
+
+    def _log_slow(self, request, route, response, duration, stats):
+        details = ''
+        if stats is not None:
+            details = (f' queries={stats.queries} db={stats.db_time * 1000:.1f}ms '
+                       f'serializer={stats.serializer_time * 1000:.1f}ms')
+        slow_logger.warning(
+            f'Slow request {request.method} {request.path} (route {route}) '
+            f'status={response.status_code} took {duration * 1000:.1f}ms{details}'
+        )
+
+
+def _response_size(response):
+    if response.streaming:
+        length = response.get('Content-Length')
+        return int(length) if length else None
+    return len(response.content)
@@ -0,0 +1,65 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.jobs.models import Job
+from .metrics import Histogram, registry
+
+
+class HistogramTest(TestCase):
+    def test_buckets_are_cumulative(self):
+        histogram = Histogram('latency_seconds', 'Latency.', ('route',), (0.1, 1))
+        for value in (0.05, 0.1, 0.5, 3):
+            histogram.observe(('a"b',), value)
+
+        samples = {(name, labels): value for name, labels, value in histogram.samples()}
+        self.assertEqual(samples[('latency_seconds_bucket', 'route="a\\"b",le="0.1"')], 2)
+        self.assertEqual(samples[('latency_seconds_bucket', 'route="a\\"b",le="1"')], 3)
+        self.assertEqual(samples[('latency_seconds_bucket', 'route="a\\"b",le="+Inf"')], 4)
+        self.assertEqual(samples[('latency_seconds_count', 'route="a\\"b"')], 4)
+
+
+class InstrumentationMiddlewareTest(TestCase):
+    def setUp(self):
+        registry.clear()
+        self.client = APIClient(SERVER_NAME='localhost')
+        user = get_user_model().objects.create_user(
+            username='metrics@test.com', email='metrics@test.com', password='x'
+        )
+        Job.objects.create(
+            title='Python Developer', company='TechCorp', description='Django.', requirements='Python',
+            job_type='full_time', location='Warsaw', posted_by=user,
+        )
+
+    def test_records_request_metrics_per_route(self):
+        self.client.get('/api/jobs/')
+        output = self.client.get('/metrics').content.decode()
+
+        labels = 'method="GET",route="api/jobs/"'
+        self.assertIn(f'http_requests_total{{{labels},status="200"}} 1', output)
+        self.assertIn(f'http_request_duration_seconds_count{{{labels}}} 1', output)
+        self.assertIn(f'http_response_size_bytes_count{{{labels}}} 1', output)
+        self.assertIn(f'serializer_duration_seconds_count{{{labels}}} 1', output)
+        self.assertIn(f'db_queries_per_request_count{{{labels}}} 1', output)
+        self.assertNotIn('route="metrics"', output)
+
+    @override_settings(METRICS_SAMPLE_RATE=0)
+    def test_unsampled_requests_skip_db_and_serializer_metrics(self):
+        self.client.get('/api/jobs/')
+        output = registry.render()
+        self.assertIn('http_request_duration_seconds_count{method="GET",route="api/jobs/"} 1', output)
+        self.assertNotIn('db_queries_per_request_count', output)
+
+    @override_settings(METRICS_SLOW_REQUEST_MS=0)
+    def test_slow_requests_are_logged_without_headers(self):
+        with self.assertLogs('fluffy_jobs.slow_requests', level='WARNING') as logs:
+            self.client.get('/api/jobs/?q=python', HTTP_AUTHORIZATION='Bearer secret-token')
+        self.assertIn('GET /api/jobs/ (route api/jobs/) status=401', logs.output[0])
+        self.assertNotIn('secret-token', logs.output[0])
+
+    @override_settings(METRICS_TOKEN='scrape-me')
+    def test_metrics_endpoint_requires_token_when_configured(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape-me')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
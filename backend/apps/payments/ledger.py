@@ -0,0 +1,49 @@
+"""Writes to the payments ledger shared by the Stripe views and webhook processing."""
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from .models import Payment, PaymentTransition
+
+User = get_user_model()
+
+# Sesja Checkout przed zaplaceniem nie ma jeszcze statusu PaymentIntent
+SESSION_OPEN = 'open'
+
+
+def stripe_time(timestamp):
+    return datetime.fromtimestamp(timestamp or time.time(), tz=dt_timezone.utc)
+
+
+def user_ids_by_email(emails):
+    emails = {email for email in emails if email}
+    if not emails:
+        return {}
+    return dict(User.objects.filter(email__in=emails).values_list('email', 'pk'))
+
+
+def record_created(obj, email='', is_session=False):
+    """Stores a PaymentIntent (or Checkout Session) just created through the API.
+
+    If a webhook for the object got here first, its state is kept as is.
+    """
+    key = {'checkout_session_id': obj['id']} if is_session else {'payment_intent_id': obj['id']}
+    status = SESSION_OPEN if is_session else obj.get('status') or ''
+    occurred_at = stripe_time(obj.get('created'))
+    with transaction.atomic():
+        payment, created = Payment.objects.get_or_create(**key, defaults={
+            'payment_intent_id': obj.get('payment_intent') if is_session else obj['id'],
+            'status': status,
+            'amount': obj.get('amount_total') if is_session else obj.get('amount'),
+            'currency': obj.get('currency') or '',
+            'email': email or '',
+            'user_id': user_ids_by_email([email]).get(email),
+            'metadata': obj.get('metadata') or {},
+            'last_event_at': occurred_at,
+        })
+        if created:
+            PaymentTransition.objects.create(
+                payment=payment, to_status=status, source=PaymentTransition.API, occurred_at=occurred_at)
+    return payment
@@ -0,0 +1,46 @@
+import csv
+import os
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.payments.reconciliation import Reconciler, iter_export
+
+
+class Command(BaseCommand):
+    help = 'Compare a Stripe payments export (CSV or JSONL) with the local payments ledger'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Path to a .csv dashboard export or .jsonl of API objects')
+        parser.add_argument('--format', choices=['jsonl', 'csv'])
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--missing-in-export', action='store_true',
+                            help='Also report ledger payments from the export period that the export lacks')
+        parser.add_argument('--output', help='Write discrepancies to this CSV file')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f'File not found: {path}')
+        try:
+            records = iter_export(path, options['format'])
+            reconciler = Reconciler(options['chunk_size'], options['missing_in_export'])
+            counts = Counter()
+            if options['output']:
+                with open(options['output'], 'w', newline='', encoding='utf-8') as output:
+                    writer = csv.DictWriter(output, fieldnames=['issue', 'payment_intent_id', 'local', 'stripe'])
+                    writer.writeheader()
+                    for issue in reconciler.discrepancies(records):
+                        counts[issue['issue']] += 1
+                        writer.writerow(issue)
+            else:
+                for issue in reconciler.discrepancies(records):
+                    counts[issue['issue']] += 1
+                    self.stdout.write(f"  {issue['issue']}: {issue['payment_intent_id']} "
+                                      f"(local={issue['local']!r}, stripe={issue['stripe']!r})")
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        summary = ', '.join(f'{count} {issue}' for issue, count in sorted(counts.items())) or 'no discrepancies'
+        style = self.style.WARNING if counts else self.style.SUCCESS
+        self.stdout.write(style(f'Checked {reconciler.rows} export rows ({reconciler.matched} matched): {summary}'))
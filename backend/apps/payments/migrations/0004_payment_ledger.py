@@ -0,0 +1,79 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:09
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payments", "0003_stripe_events"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PaymentTransition",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("from_status", models.CharField(blank=True, max_length=40)),
+                ("to_status", models.CharField(max_length=40)),
+                (
+                    "source",
+                    models.CharField(
+                        choices=[("api", "API"), ("webhook", "Webhook")], max_length=10
+                    ),
+                ),
+                ("event_id", models.CharField(blank=True, max_length=255)),
+                ("occurred_at", models.DateTimeField()),
+            ],
+            options={
+                "ordering": ["occurred_at", "id"],
+            },
+        ),
+        migrations.AddField(
+            model_name="payment",
+            name="checkout_session_id",
+            field=models.CharField(blank=True, max_length=255, null=True, unique=True),
+        ),
+        migrations.AlterField(
+            model_name="payment",
+            name="amount",
+            field=models.PositiveIntegerField(
+                blank=True, help_text="Amount in the smallest currency unit", null=True
+            ),
+        ),
+        migrations.AlterField(
+            model_name="payment",
+            name="payment_intent_id",
+            field=models.CharField(blank=True, max_length=255, null=True, unique=True),
+        ),
+        migrations.AddIndex(
+            model_name="payment",
+            index=models.Index(
+                fields=["user", "-created_at", "-id"], name="payment_user_history_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="payment",
+            index=models.Index(fields=["created_at", "id"], name="payment_created_idx"),
+        ),
+        migrations.AddField(
+            model_name="paymenttransition",
+            name="payment",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="transitions",
+                to="payments.payment",
+            ),
+        ),
+    ]
@@ -3,8 +3,90 @@ from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
-# Tutaj możesz dodać modele płatności
-# class Payment(models.Model):
-#     user = models.ForeignKey(User, on_delete=models.CASCADE)
-#     amount = models.DecimalField(max_digits=10, decimal_places=2)
-#     created_at = models.DateTimeField(auto_now_add=True)
+
+class StripeEvent(models.Model):
+    """Raw Stripe webhook event, stored as received and never modified.
+
+    ``processed_at`` is the only column written after insert; event_id is
+    unique, so Stripe's retries of an already stored event are dropped.
+    """
+    event_id = models.CharField(max_length=255, unique=True)
+    type = models.CharField(max_length=100)
+    payload = models.JSONField()
+    created = models.DateTimeField(help_text='Event creation time reported by Stripe')
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Kolejka nieprzetworzonych zdarzen w kolejnosci z Stripe
+            models.Index(
+                fields=['created', 'id'],
+                condition=models.Q(processed_at__isnull=True),
+                name='stripeevent_unprocessed_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.type} {self.event_id}"
+
+
+class Payment(models.Model):
+    """Ledger entry for one PaymentIntent or Checkout Session.
+
+    Rows are created when the API creates the intent/session and kept
+    current by webhook events; every status change is appended to
+    ``transitions``. A Checkout Session gets its payment_intent_id once
+    Stripe reports it.
+    """
+    SUCCEEDED = 'succeeded'
+    CANCELED = 'canceled'
+    # Stany, z ktorych zdarzenie z ta sama sekunda nie moze nas cofnac
+    FINAL_STATUSES = (SUCCEEDED, CANCELED)
+
+    payment_intent_id = models.CharField(max_length=255, unique=True, null=True, blank=True)
+    checkout_session_id = models.CharField(max_length=255, unique=True, null=True, blank=True)
+    status = models.CharField(max_length=40)
+    amount = models.PositiveIntegerField(null=True, blank=True, help_text='Amount in the smallest currency unit')
+    currency = models.CharField(max_length=3, blank=True)
+    user = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL, related_name='payments')
+    email = models.EmailField(blank=True)
+    metadata = models.JSONField(default=dict, blank=True)
+    last_event_id = models.CharField(max_length=255, blank=True)
+    last_event_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Historia platnosci uzytkownika (stronicowanie po kluczu)
+            models.Index(fields=['user', '-created_at', '-id'], name='payment_user_history_idx'),
+            # Rekonsyliacja i raporty skanuja zakresy dat
+            models.Index(fields=['created_at', 'id'], name='payment_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.payment_intent_id or self.checkout_session_id} ({self.status})"
+
+
+class PaymentTransition(models.Model):
+    """Append-only history of Payment status changes."""
+    API = 'api'
+    WEBHOOK = 'webhook'
+    SOURCES = [
+        (API, 'API'),
+        (WEBHOOK, 'Webhook'),
+    ]
+
+    payment = models.ForeignKey(Payment, on_delete=models.CASCADE, related_name='transitions')
+    from_status = models.CharField(max_length=40, blank=True)
+    to_status = models.CharField(max_length=40)
+    source = models.CharField(max_length=10, choices=SOURCES)
+    event_id = models.CharField(max_length=255, blank=True)
+    occurred_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['occurred_at', 'id']
+
+    def __str__(self):
+        return f"{self.payment_id}: {self.from_status or '-'} -> {self.to_status}"
@@ -0,0 +1,170 @@
+"""Streaming comparison of the payments ledger with a Stripe export.
+
+The export is read row by row and compared in chunks, one ledger query per
+chunk, so memory stays flat however large the export is. Two formats are
+accepted: the dashboard CSV export of payments (amounts in major units)
+and JSONL of PaymentIntent/Charge objects as returned by the API.
+"""
+import csv
+import json
+import os
+from datetime import datetime, timezone as dt_timezone
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+from .models import Payment
+
+# Stripe liczy zwrot jako zaplacona platnosc - zwrotow nie trzymamy w ksiedze
+PAID_STATUSES = {'succeeded', 'paid', 'refunded', 'partially_refunded'}
+
+MISSING_LOCALLY = 'missing_locally'
+MISSING_IN_EXPORT = 'missing_in_export'
+STATUS_MISMATCH = 'status_mismatch'
+AMOUNT_MISMATCH = 'amount_mismatch'
+CURRENCY_MISMATCH = 'currency_mismatch'
+UNMATCHED_ROW = 'unmatched_row'
+
+# Waluty, w ktorych Stripe nie mnozy kwot przez 100 (https://docs.stripe.com/currencies)
+ZERO_DECIMAL_CURRENCIES = {
+    'bif', 'clp', 'djf', 'gnf', 'jpy', 'kmf', 'krw', 'mga', 'pyg', 'rwf', 'ugx', 'vnd', 'vuv', 'xaf', 'xof', 'xpf',
+}
+THREE_DECIMAL_CURRENCIES = {'bhd', 'jod', 'kwd', 'omr', 'tnd'}
+
+
+def iter_export(path, fmt=None):
+    """Yields normalized export records: payment_intent_id, status, amount (minor units), currency, created."""
+    fmt = fmt or ('jsonl' if os.path.splitext(path)[1].lower() in ('.jsonl', '.ndjson', '.json') else 'csv')
+    if fmt == 'jsonl':
+        with open(path, 'rb') as export:
+            for line in export:
+                if line.strip():
+                    yield from_api_object(json.loads(line))
+    else:
+        with open(path, newline='', encoding='utf-8-sig') as export:
+            for row in csv.DictReader(export):
+                yield from_dashboard_row(row)
+
+
+def from_api_object(obj):
+    is_intent = obj.get('object') == 'payment_intent'
+    currency = (obj.get('currency') or '').lower()
+    return {
+        'payment_intent_id': obj.get('id') if is_intent else obj.get('payment_intent'),
+        'status': (obj.get('status') or '').lower(),
+        'amount': _minor_units(obj.get('amount'), currency, major=False),
+        'currency': currency,
+        'created': datetime.fromtimestamp(obj['created'], tz=dt_timezone.utc) if obj.get('created') else None,
+    }
+
+
+def from_dashboard_row(row):
+    row = {(key or '').strip().lower(): (value or '').strip() for key, value in row.items()}
+    intent_id = row.get('paymentintent id') or row.get('payment_intent_id') or row.get('payment_intent')
+    if not intent_id and row.get('id', '').startswith('pi_'):
+        intent_id = row['id']
+    return {
+        'payment_intent_id': intent_id or None,
+        'status': row.get('status', '').lower().replace(' ', '_'),
+        'amount': _minor_units(row.get('amount', ''), row.get('currency', '').lower(), major=True),
+        'currency': row.get('currency', '').lower(),
+        'created': _parse_created(row.get('created (utc)') or row.get('created') or ''),
+    }
+
+
+def _minor_units(value, currency, major):
+    """Amount in the currency's smallest unit; ``major`` for the dashboard CSV ("9.99", "1,000"), else API units."""
+    if value is None or value == '':
+        return None
+    try:
+        amount = Decimal(str(value).replace(',', ''))
+    except InvalidOperation:
+        return None
+    if major:
+        exponent = 0 if currency in ZERO_DECIMAL_CURRENCIES else 3 if currency in THREE_DECIMAL_CURRENCIES else 2
+        amount = amount.scaleb(exponent)
+    return int(amount.to_integral_value(ROUND_HALF_UP))
+
+
+def _parse_created(value):
+    for fmt in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%dT%H:%M:%SZ'):
+        try:
+            return datetime.strptime(value, fmt).replace(tzinfo=dt_timezone.utc)
+        except ValueError:
+            continue
+    return None
+
+
+class Reconciler:
+    """Compares export records with the ledger; ``discrepancies`` yields one dict per problem.
+
+    ``check_missing_in_export`` also reports ledger payments created within
+    the export's time range that the export does not contain; that needs the
+    set of exported ids in memory.
+    """
+
+    def __init__(self, chunk_size=1000, check_missing_in_export=False):
+        self.chunk_size = chunk_size
+        self.check_missing_in_export = check_missing_in_export
+        self.rows = 0
+        self.matched = 0
+        self._seen = set()
+        self._first_created = self._last_created = None
+
+    def discrepancies(self, records):
+        chunk = []
+        for record in records:
+            self.rows += 1
+            self._track(record)
+            chunk.append(record)
+            if len(chunk) >= self.chunk_size:
+                yield from self._compare(chunk)
+                chunk = []
+        if chunk:
+            yield from self._compare(chunk)
+        if self.check_missing_in_export:
+            yield from self._missing_in_export()
+
+    def _track(self, record):
+        if self.check_missing_in_export and record['payment_intent_id']:
+            self._seen.add(record['payment_intent_id'])
+        created = record['created']
+        if created is not None:
+            self._first_created = min(self._first_created or created, created)
+            self._last_created = max(self._last_created or created, created)
+
+    def _compare(self, records):
+        ids = {record['payment_intent_id'] for record in records} - {None}
+        local = {
+            intent_id: (status, amount, currency)
+            for intent_id, status, amount, currency in Payment.objects.filter(
+                payment_intent_id__in=ids).values_list('payment_intent_id', 'status', 'amount', 'currency')
+        }
+        for record in records:
+            intent_id = record['payment_intent_id']
+            if intent_id is None:
+                yield _issue(UNMATCHED_ROW, None, '', record['status'])
+                continue
+            if intent_id not in local:
+                yield _issue(MISSING_LOCALLY, intent_id, '', record['status'])
+                continue
+            self.matched += 1
+            status, amount, currency = local[intent_id]
+            if (status == Payment.SUCCEEDED) != (record['status'] in PAID_STATUSES):
+                yield _issue(STATUS_MISMATCH, intent_id, status, record['status'])
+            if amount is not None and record['amount'] is not None and amount != record['amount']:
+                yield _issue(AMOUNT_MISMATCH, intent_id, amount, record['amount'])
+            if currency and record['currency'] and currency != record['currency']:
+                yield _issue(CURRENCY_MISMATCH, intent_id, currency, record['currency'])
+
+    def _missing_in_export(self):
+        if self._first_created is None:
+            return
+        local = Payment.objects.filter(
+            created_at__range=(self._first_created, self._last_created), payment_intent_id__isnull=False,
+        ).values_list('payment_intent_id', 'status')
+        for intent_id, status in local.iterator(chunk_size=self.chunk_size):
+            if intent_id not in self._seen:
+                yield _issue(MISSING_IN_EXPORT, intent_id, status, '')
+
+
+def _issue(kind, payment_intent_id, local, stripe):
+    return {'issue': kind, 'payment_intent_id': payment_intent_id, 'local': local, 'stripe': stripe}
@@ -0,0 +1,19 @@
+from rest_framework import serializers
+from .models import Payment, PaymentTransition
+
+
+class PaymentTransitionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PaymentTransition
+        fields = ['from_status', 'to_status', 'source', 'occurred_at']
+
+
+class PaymentSerializer(serializers.ModelSerializer):
+    transitions = PaymentTransitionSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Payment
+        fields = [
+            'id', 'payment_intent_id', 'checkout_session_id', 'status', 'amount', 'currency',
+            'created_at', 'updated_at', 'transitions',
+        ]
@@ -0,0 +1,60 @@
+"""Minimal async client for the Stripe REST API over the shared outbound pool.
+
+stripe-python 6.x only offers blocking calls, which would hold an ASGI
+worker thread for the whole round trip. Parameters are encoded with
+stripe's own form encoder, so payloads match what ``stripe.X.create`` sends.
+"""
+from urllib.parse import quote, urlencode
+
+import stripe
+from django.conf import settings
+from stripe.api_requestor import _api_encode
+
+from apps.integrations.http import request
+
+
+class StripeAPIError(Exception):
+    def __init__(self, status, message, error_type=None):
+        super().__init__(message)
+        self.status = status
+        self.error_type = error_type
+
+
+def _encode(params):
+    # Stripe oczekuje "true"/"false", a nie pythonowego "True"
+    return urlencode([
+        (key, str(value).lower() if isinstance(value, bool) else value)
+        for key, value in _api_encode(params)
+    ])
+
+
+def _headers():
+    return {
+        'Authorization': f'Bearer {settings.STRIPE_SECRET_KEY}',
+        'Stripe-Version': stripe.api_version,
+    }
+
+
+async def create(resource, params):
+    """POST /v1/<resource>; returns the decoded object or raises StripeAPIError."""
+    response = await request('stripe', 'POST', f'/v1/{resource}', content=_encode(params), headers={
+        **_headers(), 'Content-Type': 'application/x-www-form-urlencoded',
+    })
+    return _decode(response)
+
+
+async def retrieve(resource, object_id):
+    """GET /v1/<resource>/<id>; retried on transient errors like every idempotent call."""
+    response = await request('stripe', 'GET', f'/v1/{resource}/{quote(object_id, safe="")}', headers=_headers())
+    return _decode(response)
+
+
+def _decode(response):
+    try:
+        payload = response.json()
+    except ValueError:
+        payload = {}
+    if response.status_code >= 400:
+        error = payload.get('error') or {}
+        raise StripeAPIError(response.status_code, error.get('message') or response.reason_phrase, error.get('type'))
+    return payload
@@ -0,0 +1,117 @@
+"""Post-payment work, run by ``run_worker`` instead of the request thread."""
+import logging
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from apps.jobs.models import Job
+from apps.tasks.models import Task
+from apps.tasks.queue import Retry, enqueue, task
+
+from . import stripe_api
+from .models import Payment
+from .stripe_api import StripeAPIError
+from .webhooks import process_batch
+
+User = get_user_model()
+logger = logging.getLogger(__name__)
+
+# Stripe jeszcze przetwarza platnosc - sprawdz ponownie za chwile
+PENDING_INTENT_STATUSES = {'processing', 'requires_capture'}
+# Plan intentu oplacajacego promocje oferty; jej id jest w metadata.job_id
+JOB_PROMOTION_PLAN = 'job_promotion'
+
+
+def confirm_key(payment_intent_id):
+    return f'confirm-payment:{payment_intent_id}'
+
+
+@task(max_attempts=5, retry_backoff=10, atomic=False)
+def confirm_payment_intent(payment_intent_id, user_id=None, job_id=None):
+    """Checks the PaymentIntent and queues the upgrades it paid for.
+
+    The local Payment state kept by webhooks is used when it is final;
+    Stripe is only asked while no webhook for the intent has arrived yet,
+    outside any transaction. A job is promoted only by a job promotion
+    intent whose metadata names that job. An intent that has not succeeded yet releases
+    the task's idempotency key, so a later confirm checks it again.
+    """
+    state = Payment.objects.filter(payment_intent_id=payment_intent_id).first()
+    if state is not None and state.status in Payment.FINAL_STATUSES:
+        intent = {'status': state.status, 'metadata': state.metadata}
+    else:
+        try:
+            intent = async_to_sync(stripe_api.retrieve)('payment_intents', payment_intent_id)
+        except StripeAPIError as e:
+            if e.status >= 500 or e.status == 429:
+                raise
+            # Nieznany albo cudzy PaymentIntent - ponawianie nic nie zmieni
+            logger.error(f"Cannot confirm {payment_intent_id}: {e}")
+            return {'status': 'invalid', 'upgraded': False}
+
+    intent_status = intent.get('status')
+    if intent_status in PENDING_INTENT_STATUSES:
+        raise Retry(f'PaymentIntent {payment_intent_id} is {intent_status}', countdown=30)
+    if intent_status != 'succeeded':
+        # Zakonczone zadanie bez ulepszenia nie moze blokowac kolejnych potwierdzen tego intentu
+        Task.objects.filter(idempotency_key=confirm_key(payment_intent_id)).update(idempotency_key=None)
+        return {'status': intent_status, 'upgraded': False}
+
+    # Platnik z metadanych intentu ma pierwszenstwo - ktos mogl podac cudzy payment_intent_id
+    metadata = intent.get('metadata') or {}
+    email = metadata.get('user_email')
+    if job_id is not None and not _pays_for_job(metadata, job_id):
+        # Subskrypcja Pro albo promocja innej oferty - job_id z zadania niczego nie odblokowuje
+        return {'status': intent_status, 'upgraded': False}
+    with transaction.atomic():
+        if email:
+            user_id = User.objects.filter(email=email).values_list('pk', flat=True).first()
+        if user_id is not None:
+            enqueue(activate_premium, kwargs={'user_id': user_id},
+                    idempotency_key=f'activate-premium:{payment_intent_id}')
+        if job_id is not None:
+            enqueue(promote_job, kwargs={'job_id': job_id},
+                    idempotency_key=f'promote-job:{payment_intent_id}')
+    return {'status': intent_status, 'user_id': user_id, 'job_id': job_id}
+
+
+def _pays_for_job(metadata, job_id):
+    return metadata.get('plan') == JOB_PROMOTION_PLAN and str(metadata.get('job_id')) == str(job_id)
+
+
+@task()
+def activate_premium(user_id):
+    user = User.objects.filter(pk=user_id).first()
+    if user is None or user.is_premium:
+        return {'upgraded': False}
+    user.is_premium = True
+    # save(), a nie update() - sygnal czysci cache uzytkownikow (apps.users.cache)
+    user.save(update_fields=['is_premium'])
+    logger.info(f'User {user_id} upgraded to premium')
+    return {'upgraded': True}
+
+
+@task()
+def promote_job(job_id):
+    job = Job.objects.filter(pk=job_id).first()
+    if job is None or job.is_premium:
+        return {'promoted': False}
+    job.is_premium = True
+    # Sygnaly Job odswiezaja cache list i szczegolow oferty
+    job.save(update_fields=['is_premium', 'updated_at'])
+    logger.info(f'Job {job_id} promoted to premium')
+    return {'promoted': True}
+
+
+@task(max_attempts=5, retry_backoff=5)
+def process_stripe_events():
+    """Applies stored webhook events to Payment until none are left."""
+    processed = 0
+    batch_size = getattr(settings, 'STRIPE_EVENTS_BATCH_SIZE', 500)
+    while True:
+        count = process_batch(batch_size)
+        processed += count
+        if count < batch_size:
+            return {'processed': processed}
@@ -0,0 +1,410 @@
+import asyncio
+import copy
+import json
+import os
+import tempfile
+import time
+
+import stripe
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.integrations import http
+from apps.integrations.http import close_clients, reset_breakers
+from apps.integrations.testing import FakeUpstream
+from apps.jobs.models import Job
+from apps.tasks.models import Task
+from apps.tasks.worker import Worker
+
+from .models import Payment, PaymentTransition, StripeEvent
+from . import webhooks
+from .reconciliation import Reconciler, iter_export
+
+User = get_user_model()
+
+
+def outbound(url, **overrides):
+    return {'stripe': {'base_url': url, 'timeout': 2, 'pool_timeout': 1, 'max_connections': 5, **overrides}}
+
+
+class AsyncCheckoutTest(TestCase):
+    def setUp(self):
+        reset_breakers()
+
+    async def _post(self, name, data):
+        return await self.async_client.post(reverse(name), data, content_type='application/json')
+
+    async def test_checkout_session_is_created_through_stripe_api(self):
+        def create_session(recorded):
+            return 200, {'id': 'cs_test_1', 'object': 'checkout.session', 'amount_total': 1999, 'currency': 'usd',
+                         'url': 'https://checkout.stripe.test/cs_test_1'}
+
+        with FakeUpstream({('POST', '/v1/checkout/sessions'): create_session}) as stripe_server:
+            with override_settings(STRIPE_SECRET_KEY='sk_test_123', OUTBOUND_HTTP=outbound(stripe_server.url)):
+                response = await self._post('create_checkout_session', {'amount': 1999, 'user_email': 'a@b.pl'})
+                await close_clients()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'url': 'https://checkout.stripe.test/cs_test_1', 'session_id': 'cs_test_1'})
+        sent = stripe_server.requests[0]
+        self.assertEqual(sent['headers']['Authorization'], 'Bearer sk_test_123')
+        self.assertEqual(sent['form']['line_items[0][price_data][unit_amount]'], '1999')
+        self.assertEqual(sent['form']['customer_email'], 'a@b.pl')
+        self.assertEqual(sent['form']['metadata[plan]'], 'fluffyjobs_pro')
+        payment = await Payment.objects.aget(checkout_session_id='cs_test_1')
+        self.assertEqual((payment.status, payment.email, payment.amount), ('open', 'a@b.pl', 1999))
+
+    async def test_payment_intent_encodes_booleans_like_stripe(self):
+        def create_intent(recorded):
+            return 200, {'id': 'pi_1', 'client_secret': 'pi_1_secret', 'amount': 999, 'currency': 'usd'}
+
+        with FakeUpstream({('POST', '/v1/payment_intents'): create_intent}) as stripe_server:
+            with override_settings(STRIPE_SECRET_KEY='sk_test_123', OUTBOUND_HTTP=outbound(stripe_server.url)):
+                response = await self._post('create_payment_intent', {})
+                await close_clients()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(stripe_server.requests[0]['form']['automatic_payment_methods[enabled]'], 'true')
+
+    async def test_stripe_errors_are_mapped(self):
+        def rejected(recorded):
+            if recorded['headers']['Authorization'] == 'Bearer sk_bad':
+                return 401, {'error': {'type': 'invalid_request_error', 'message': 'Invalid API Key'}}
+            return 400, {'error': {'type': 'invalid_request_error', 'message': 'Amount too small'}}
+
+        with FakeUpstream({('POST', '/v1/checkout/sessions'): rejected}) as stripe_server:
+            with override_settings(STRIPE_SECRET_KEY='sk_bad', OUTBOUND_HTTP=outbound(stripe_server.url)):
+                unauthorized = await self._post('create_checkout_session', {})
+            with override_settings(STRIPE_SECRET_KEY='sk_test_123', OUTBOUND_HTTP=outbound(stripe_server.url)):
+                invalid = await self._post('create_checkout_session', {'amount': 1})
+            await close_clients()
+
+        self.assertEqual(unauthorized.status_code, 401)
+        self.assertIn('Invalid API Key', unauthorized.json()['error'])
+        self.assertEqual(invalid.status_code, 400)
+        self.assertIn('Amount too small', invalid.json()['error'])
+
+    async def test_concurrency_limit_fails_fast_with_503(self):
+        def slow(recorded):
+            time.sleep(0.5)
+            return 200, {'id': 'cs_slow', 'url': 'https://checkout.stripe.test/cs_slow'}
+
+        config = outbound('', max_connections=1, pool_timeout=0.1)
+        with FakeUpstream({('POST', '/v1/checkout/sessions'): slow}) as stripe_server:
+            config['stripe']['base_url'] = stripe_server.url
+            with override_settings(STRIPE_SECRET_KEY='sk_test_123', OUTBOUND_HTTP=config):
+                responses = await asyncio.gather(
+                    self._post('create_checkout_session', {}),
+                    self._post('create_checkout_session', {}),
+                )
+                await close_clients()
+
+        self.assertEqual(sorted(response.status_code for response in responses), [200, 503])
+        self.assertEqual(len(stripe_server.requests), 1)
+
+    async def test_clients_of_a_short_lived_loop_are_closed_after_the_call(self):
+        def create_session(recorded):
+            return 200, {'id': 'cs_test_2', 'url': 'https://checkout.stripe.test/cs_test_2'}
+
+        with FakeUpstream({('POST', '/v1/checkout/sessions'): create_session}) as stripe_server:
+            with override_settings(STRIPE_SECRET_KEY='sk_test_123', OUTBOUND_HTTP=outbound(stripe_server.url)):
+                response = await self._post('create_checkout_session', {})
+
+        self.assertEqual(response.status_code, 200)
+        # Bez keep_clients_alive (WSGI) petla nie trzyma klienta ani jego gniazd
+        self.assertNotIn(asyncio.get_running_loop(), http._clients)
+
+    async def test_unreachable_stripe_returns_503(self):
+        # Port 9 (discard) na localhost - polaczenie odrzucone od razu
+        with override_settings(STRIPE_SECRET_KEY='sk_test_123', OUTBOUND_HTTP=outbound('http://127.0.0.1:9')):
+            response = await self._post('create_checkout_session', {})
+            await close_clients()
+
+        self.assertEqual(response.status_code, 503)
+
+
+@override_settings(TASKS_PERIODIC={})
+class ConfirmPaymentTest(TestCase):
+    def setUp(self):
+        reset_breakers()
+        self.user = User.objects.create_user(username='payer', email='payer@example.com', password='pass12345')
+        self.job = Job.objects.create(
+            title='Python Developer', company='ACME', location='Warsaw', description='Backend',
+            requirements='Python, Django', job_type='full_time', posted_by=self.user,
+        )
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+
+    def _confirm(self, **data):
+        return self.api.post(reverse('confirm_payment'), {'payment_intent_id': 'pi_123', **data}, format='json')
+
+    def _run_worker(self, intent_status, metadata=None):
+        def retrieve(recorded):
+            return 200, {'id': 'pi_123', 'status': intent_status, 'metadata': metadata or {}}
+
+        with FakeUpstream({('GET', '/v1/payment_intents/pi_123'): retrieve}) as stripe_server:
+            with override_settings(STRIPE_SECRET_KEY='sk_test_123', OUTBOUND_HTTP=outbound(stripe_server.url)):
+                Worker().run(burst=True)
+        return stripe_server
+
+    def test_confirmation_is_queued_once_and_upgrades_in_worker(self):
+        first = self._confirm(job_id=self.job.pk)
+        second = self._confirm(job_id=self.job.pk)
+
+        self.assertEqual(first.status_code, 202)
+        self.assertEqual(second.status_code, 202)
+        self.assertEqual(Task.objects.count(), 1)
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_premium)
+
+        stripe_server = self._run_worker('succeeded', {
+            'user_email': 'payer@example.com', 'plan': 'job_promotion', 'job_id': str(self.job.pk),
+        })
+
+        self.assertEqual(len(stripe_server.requests), 1)
+        self.user.refresh_from_db()
+        self.job.refresh_from_db()
+        self.assertTrue(self.user.is_premium)
+        self.assertTrue(self.job.is_premium)
+        self.assertFalse(Task.objects.exclude(status=Task.SUCCEEDED).exists())
+
+    def test_pro_intent_does_not_promote_a_job(self):
+        self._confirm(job_id=self.job.pk)
+
+        self._run_worker('succeeded', {'user_email': 'payer@example.com', 'plan': 'fluffyjobs_pro'})
+
+        self.job.refresh_from_db()
+        self.assertFalse(self.job.is_premium)
+        self.assertFalse(Task.objects.get().result['upgraded'])
+
+    def test_promotion_intent_for_another_job_does_not_promote(self):
+        self._confirm(job_id=self.job.pk)
+
+        self._run_worker('succeeded', {
+            'user_email': 'payer@example.com', 'plan': 'job_promotion', 'job_id': str(self.job.pk + 1),
+        })
+
+        self.job.refresh_from_db()
+        self.assertFalse(self.job.is_premium)
+        self.assertEqual(Task.objects.count(), 1)
+
+    def test_intent_paid_by_someone_else_does_not_upgrade_caller(self):
+        self._confirm()
+
+        self._run_worker('succeeded', {'user_email': 'other@example.com'})
+
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_premium)
+
+    def test_unpaid_intent_does_not_upgrade(self):
+        self._confirm()
+
+        self._run_worker('requires_payment_method')
+
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_premium)
+        self.assertEqual(Task.objects.get().result['status'], 'requires_payment_method')
+
+    def test_confirm_after_unpaid_check_queues_a_new_check(self):
+        self._confirm()
+        self._run_worker('requires_payment_method')
+
+        self.assertEqual(self._confirm().status_code, 202)
+
+        self.assertEqual(Task.objects.filter(status=Task.PENDING).count(), 1)
+        self._run_worker('succeeded', {'user_email': 'payer@example.com'})
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.is_premium)
+
+    def test_rejects_invalid_ids_and_foreign_jobs(self):
+        other = User.objects.create_user(username='other', email='other@example.com', password='pass12345')
+        foreign_job = Job.objects.create(
+            title='Go Developer', company='ACME', location='Krakow', description='Backend',
+            requirements='Go', job_type='full_time', posted_by=other,
+        )
+
+        self.assertEqual(self.api.post(reverse('confirm_payment'), {}, format='json').status_code, 400)
+        self.assertEqual(self._confirm(payment_intent_id='../charges').status_code, 400)
+        self.assertEqual(self._confirm(job_id=foreign_job.pk).status_code, 400)
+        self.assertFalse(Task.objects.exists())
+
+
+WEBHOOK_SECRET = 'whsec_test'
+with open(os.path.join(os.path.dirname(__file__), 'testdata', 'stripe_events.json')) as handle:
+    RECORDED_EVENTS = json.load(handle)
+
+
+@override_settings(STRIPE_WEBHOOK_SECRET=WEBHOOK_SECRET, TASKS_PERIODIC={})
+class StripeWebhookTest(TestCase):
+    def setUp(self):
+        self.payer = User.objects.create_user(username='payer', email='payer@example.com', password='pass12345')
+
+    def _deliver(self, event, secret=WEBHOOK_SECRET):
+        payload = json.dumps(event)
+        timestamp = int(time.time())
+        signature = stripe.WebhookSignature._compute_signature(f'{timestamp}.{payload}', secret)
+        return self.client.post(reverse('stripe_webhook'), payload, content_type='application/json',
+                                HTTP_STRIPE_SIGNATURE=f't={timestamp},v1={signature}')
+
+    def _replay(self, events):
+        for event in events:
+            self.assertEqual(self._deliver(event).status_code, 200)
+        # Okno paczki jeszcze trwa - przesun zaplanowane zadania na teraz
+        Task.objects.update(run_at=timezone.now())
+        Worker().run(burst=True)
+
+    def test_replayed_events_update_local_payment_state(self):
+        self._replay(RECORDED_EVENTS)
+
+        self.assertEqual(StripeEvent.objects.count(), len(RECORDED_EVENTS))
+        self.assertFalse(StripeEvent.objects.filter(processed_at__isnull=True).exists())
+        states = dict(Payment.objects.values_list('payment_intent_id', 'status'))
+        self.assertEqual(states, {
+            'pi_3PqA1aKx0paid': 'succeeded',
+            'pi_3PqB3cKx0checkout': 'succeeded',
+            'pi_3PqC4dKx0declined': 'requires_payment_method',
+        })
+        paid = Payment.objects.get(payment_intent_id='pi_3PqA1aKx0paid')
+        self.assertEqual((paid.user, paid.amount, paid.currency), (self.payer, 999, 'usd'))
+        self.payer.refresh_from_db()
+        self.assertTrue(self.payer.is_premium)
+
+    def test_batches_are_deduplicated_and_out_of_order_events_ignored(self):
+        created, succeeded = RECORDED_EVENTS[0], RECORDED_EVENTS[1]
+
+        self._replay([succeeded, succeeded, created])
+
+        self.assertEqual(StripeEvent.objects.count(), 2)
+        self.assertEqual(Payment.objects.get().status, 'succeeded')
+        self.assertLessEqual(Task.objects.filter(name='payments.process_stripe_events').count(), 2)
+        self.assertEqual(Task.objects.filter(name='payments.activate_premium').count(), 1)
+
+    def test_invalid_signature_is_rejected(self):
+        response = self._deliver(RECORDED_EVENTS[0], secret='whsec_wrong')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(StripeEvent.objects.exists())
+
+    def test_status_and_confirmation_read_local_state(self):
+        self._replay(RECORDED_EVENTS[:2])
+        api = APIClient()
+
+        with self.assertNumQueries(1):
+            status_response = api.get(reverse('payment_status', args=['pi_3PqA1aKx0paid']))
+        self.assertEqual(status_response.json()['status'], 'succeeded')
+        self.assertEqual(api.get(reverse('payment_status', args=['pi_unknown'])).status_code, 404)
+
+        confirm = api.post(reverse('confirm_payment'), {'payment_intent_id': 'pi_3PqA1aKx0paid'}, format='json')
+        self.assertEqual(confirm.json()['status'], 'succeeded')
+        # Stripe nieosiagalny - zadanie musi oprzec sie na lokalnym stanie
+        reset_breakers()
+        with override_settings(STRIPE_SECRET_KEY='sk_test_123', OUTBOUND_HTTP=outbound('http://127.0.0.1:9')):
+            Worker().run(burst=True)
+        self.assertEqual(Task.objects.get(name='payments.confirm_payment_intent').status, Task.SUCCEEDED)
+
+
+@override_settings(STRIPE_WEBHOOK_SECRET=WEBHOOK_SECRET, TASKS_PERIODIC={})
+class PaymentLedgerTest(StripeWebhookTest):
+    def _intent_event(self, event_id, intent_id, status, created):
+        event = copy.deepcopy(RECORDED_EVENTS[1])
+        event.update(id=event_id, type=f'payment_intent.{status}', created=created)
+        event['data']['object'].update(id=intent_id, status=status)
+        return event
+
+    def test_webhooks_record_status_transitions(self):
+        self._replay(RECORDED_EVENTS)
+
+        transitions = PaymentTransition.objects.filter(payment__payment_intent_id='pi_3PqA1aKx0paid')
+        self.assertEqual(list(transitions.values_list('from_status', 'to_status', 'event_id')), [
+            ('', 'requires_payment_method', 'evt_3PqA1aKx0created'),
+            ('requires_payment_method', 'succeeded', 'evt_3PqA1aKx0succeeded'),
+        ])
+
+    def test_intent_row_is_merged_into_checkout_session(self):
+        session_event = RECORDED_EVENTS[3]
+        self._replay([self._intent_event('evt_early', 'pi_3PqB3cKx0checkout', 'processing',
+                                         session_event['created'] - 5)])
+        self.assertEqual(self._deliver(session_event).status_code, 200)
+        webhooks.process_batch(batch_size=10)
+
+        payment = Payment.objects.get()
+        self.assertEqual((payment.payment_intent_id, payment.checkout_session_id, payment.status),
+                         ('pi_3PqB3cKx0checkout', 'cs_test_a1PqB3cKx0', 'succeeded'))
+        self.assertEqual(list(payment.transitions.values_list('to_status', flat=True)), ['processing', 'succeeded'])
+
+    def test_history_is_paginated_and_limited_to_own_payments(self):
+        other = User.objects.create_user(username='other', email='other@example.com', password='pass12345')
+        now = timezone.now()
+        for number in range(3):
+            Payment.objects.create(payment_intent_id=f'pi_own_{number}', status='succeeded', user=self.payer,
+                                   last_event_at=now)
+        Payment.objects.create(payment_intent_id='pi_other', status='succeeded', user=other, last_event_at=now)
+        api = APIClient()
+        self.assertEqual(api.get(reverse('payment_history')).status_code, 401)
+
+        api.force_authenticate(self.payer)
+        first = api.get(reverse('payment_history'), {'page_size': 2}).json()
+        second = api.get(first['next']).json()
+
+        ids = [row['payment_intent_id'] for row in first['results'] + second['results']]
+        self.assertEqual(ids, ['pi_own_2', 'pi_own_1', 'pi_own_0'])
+        self.assertIsNone(second['next'])
+
+
+class ReconciliationTest(TestCase):
+    def setUp(self):
+        created = timezone.now().replace(microsecond=0)
+        for intent_id, status, amount in [('pi_ok', 'succeeded', 999), ('pi_unpaid', 'processing', 999),
+                                          ('pi_amount', 'succeeded', 1999), ('pi_not_exported', 'succeeded', 999)]:
+            Payment.objects.create(payment_intent_id=intent_id, status=status, amount=amount, currency='usd',
+                                   last_event_at=created)
+        Payment.objects.update(created_at=created)
+        now = created.strftime('%Y-%m-%d %H:%M:%S')
+        handle, self.path = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(handle, 'w', encoding='utf-8') as export:
+            export.write('id,PaymentIntent ID,Created (UTC),Amount,Currency,Status\n')
+            export.write(f'ch_1,pi_ok,{now},9.99,usd,Paid\n')
+            export.write(f'ch_2,pi_unpaid,{now},9.99,usd,Paid\n')
+            export.write(f'ch_3,pi_amount,{now},9.99,usd,Refunded\n')
+            export.write(f'ch_4,pi_unknown,{now},5.00,usd,Failed\n')
+        self.addCleanup(os.remove, self.path)
+
+    def test_export_is_compared_in_chunks(self):
+        reconciler = Reconciler(chunk_size=2, check_missing_in_export=True)
+
+        with self.assertNumQueries(3):
+            issues = list(reconciler.discrepancies(iter_export(self.path)))
+
+        self.assertEqual(sorted((issue['issue'], issue['payment_intent_id']) for issue in issues), [
+            ('amount_mismatch', 'pi_amount'),
+            ('missing_in_export', 'pi_not_exported'),
+            ('missing_locally', 'pi_unknown'),
+            ('status_mismatch', 'pi_unpaid'),
+        ])
+        self.assertEqual((reconciler.rows, reconciler.matched), (4, 3))
+
+    def test_dashboard_amounts_are_major_units_even_without_decimal_point(self):
+        Payment.objects.filter(payment_intent_id='pi_ok').update(amount=100000)
+        Payment.objects.filter(payment_intent_id='pi_amount').update(amount=500, currency='jpy')
+        with open(self.path, 'w', encoding='utf-8') as export:
+            export.write('PaymentIntent ID,Amount,Currency,Status\n')
+            export.write('pi_ok,"1,000",usd,Paid\n')
+            export.write('pi_amount,500,jpy,Paid\n')
+
+        issues = list(Reconciler().discrepancies(iter_export(self.path)))
+
+        self.assertEqual(issues, [])
+
+    def test_command_writes_discrepancies_csv(self):
+        output = f'{self.path}.out'
+        self.addCleanup(os.remove, output)
+
+        call_command('reconcile_payments', self.path, output=output, stdout=open(os.devnull, 'w'))
+
+        with open(output, encoding='utf-8') as report:
+            self.assertEqual(len(report.readlines()), 4)
@@ -6,5 +6,8 @@ urlpatterns = [
     path('create-checkout-session/', views.create_checkout_session, name='create_checkout_session'),
     path('create-payment-intent/', views.create_payment_intent, name='create_payment_intent'),
     path('confirm-payment/', views.confirm_payment, name='confirm_payment'),
+    path('status/<str:payment_intent_id>/', views.payment_status, name='payment_status'),
+    path('history/', views.PaymentHistoryView.as_view(), name='payment_history'),
+    path('webhook/', views.stripe_webhook, name='stripe_webhook'),
     path('test-cards/', views.get_test_cards, name='get_test_cards'),
 ]
@@ -1,8 +1,23 @@
 ﻿from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
-from rest_framework import status
+from rest_framework import generics, status
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from django.db import transaction
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from apps.integrations.http import UpstreamUnavailable, json_body
+from apps.jobs.models import Job
+from apps.jobs.pagination import KeysetPagination
+from apps.tasks.queue import enqueue
+from . import ledger, stripe_api, webhooks
+from .models import Payment
+from .serializers import PaymentSerializer
+from .tasks import confirm_key, confirm_payment_intent
+from .stripe_api import StripeAPIError
+import re
 import stripe
 import logging
 import time
@@ -12,6 +27,8 @@ logger = logging.getLogger(__name__)
 # POPRAWNIE: Używaj klucza z settings (który ładuje z .env)
 stripe.api_key = settings.STRIPE_SECRET_KEY
 
+PAYMENT_INTENT_ID = re.compile(r'pi_[A-Za-z0-9_]{1,200}')
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def stripe_config(request):
@@ -22,25 +39,25 @@ def stripe_config(request):
         'test_mode': settings.STRIPE_TEST_MODE,
     }, status=status.HTTP_200_OK)
 
-@api_view(['POST'])
-@permission_classes([AllowAny])
-def create_checkout_session(request):
+@csrf_exempt
+@require_POST
+async def create_checkout_session(request):
     """Create REAL Stripe Checkout Session"""
-    try:
-        if not stripe.api_key:
-            return Response({
-                'error': 'Stripe not configured properly. Check your STRIPE_SECRET_KEY.'
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    if not settings.STRIPE_SECRET_KEY:
+        return JsonResponse({
+            'error': 'Stripe not configured properly. Check your STRIPE_SECRET_KEY.'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-        data = request.data
-        amount = data.get('amount', 999)
-        user_email = data.get('user_email', 'test@example.com')
-        
-        logger.info(f"Creating checkout session for {user_email}, amount: {amount}")
-        
-        session = stripe.checkout.Session.create(
-            payment_method_types=['card'],
-            line_items=[{
+    data = json_body(request)
+    amount = data.get('amount', 999)
+    user_email = data.get('user_email', 'test@example.com')
+
+    logger.info(f"Creating checkout session for {user_email}, amount: {amount}")
+
+    try:
+        session = await stripe_api.create('checkout/sessions', {
+            'payment_method_types': ['card'],
+            'line_items': [{
                 'price_data': {
                     'currency': 'usd',
                     'product_data': {
@@ -51,105 +68,167 @@ def create_checkout_session(request):
                 },
                 'quantity': 1,
             }],
-            mode='payment',
-            success_url='http://localhost:3000/upgrade/success?session_id={CHECKOUT_SESSION_ID}',
-            cancel_url='http://localhost:3000/upgrade',
-            customer_email=user_email,
-            metadata={
+            'mode': 'payment',
+            'success_url': 'http://localhost:3000/upgrade/success?session_id={CHECKOUT_SESSION_ID}',
+            'cancel_url': 'http://localhost:3000/upgrade',
+            'customer_email': user_email,
+            'metadata': {
                 'user_email': user_email,
                 'plan': 'fluffyjobs_pro',
                 'app': 'FluffyJobs',
             },
-        )
-        
-        logger.info(f"Checkout session created: {session.id}")
-        
-        return Response({
-            'url': session.url,
-            'session_id': session.id,
-        }, status=status.HTTP_200_OK)
-        
-    except stripe.error.AuthenticationError as e:
-        logger.error(f"Stripe authentication error: {e}")
-        return Response({
-            'error': f'Stripe authentication failed: {str(e)}'
-        }, status=status.HTTP_401_UNAUTHORIZED)
-        
-    except stripe.error.StripeError as e:
+        })
+    except StripeAPIError as e:
         logger.error(f"Stripe error: {e}")
-        return Response({
+        if e.status == 401:
+            return JsonResponse({
+                'error': f'Stripe authentication failed: {str(e)}'
+            }, status=status.HTTP_401_UNAUTHORIZED)
+        return JsonResponse({
             'error': f'Stripe error: {str(e)}'
         }, status=status.HTTP_400_BAD_REQUEST)
-        
-    except Exception as e:
-        logger.error(f"Unexpected error: {e}")
-        return Response({
-            'error': f'Payment creation failed: {str(e)}'
-        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    except UpstreamUnavailable as e:
+        logger.error(f"Stripe unavailable: {e}")
+        return JsonResponse({
+            'error': 'Payment provider is temporarily unavailable, please try again.'
+        }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
 
-@api_view(['POST'])
-@permission_classes([AllowAny])
-def create_payment_intent(request):
+    logger.info(f"Checkout session created: {session['id']}")
+    await sync_to_async(ledger.record_created)(session, user_email, is_session=True)
+
+    return JsonResponse({
+        'url': session.get('url'),
+        'session_id': session['id'],
+    }, status=status.HTTP_200_OK)
+
+@csrf_exempt
+@require_POST
+async def create_payment_intent(request):
     """Create REAL Stripe Payment Intent"""
-    try:
-        if not stripe.api_key:
-            return Response({
-                'error': 'Stripe not configured properly.'
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    if not settings.STRIPE_SECRET_KEY:
+        return JsonResponse({
+            'error': 'Stripe not configured properly.'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-        data = request.data
-        amount = data.get('amount', 999)
-        user_email = data.get('user_email', 'test@example.com')
-        
-        intent = stripe.PaymentIntent.create(
-            amount=amount,
-            currency='usd',
-            description='FluffyJobs Pro Monthly',
-            automatic_payment_methods={'enabled': True},
-            metadata={
+    data = json_body(request)
+    amount = data.get('amount', 999)
+    user_email = data.get('user_email', 'test@example.com')
+
+    try:
+        intent = await stripe_api.create('payment_intents', {
+            'amount': amount,
+            'currency': 'usd',
+            'description': 'FluffyJobs Pro Monthly',
+            'automatic_payment_methods': {'enabled': True},
+            'metadata': {
                 'user_email': user_email,
                 'plan': 'fluffyjobs_pro',
             },
-        )
-        
-        return Response({
-            'payment_intent_id': intent.id,
-            'client_secret': intent.client_secret,
-            'status': intent.status,
-        }, status=status.HTTP_200_OK)
-        
-    except stripe.error.StripeError as e:
-        return Response({
+        })
+    except StripeAPIError as e:
+        return JsonResponse({
             'error': f'Stripe error: {str(e)}'
         }, status=status.HTTP_400_BAD_REQUEST)
-    except Exception as e:
-        return Response({
-            'error': f'Payment intent creation failed: {str(e)}'
-        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    except UpstreamUnavailable:
+        return JsonResponse({
+            'error': 'Payment provider is temporarily unavailable, please try again.'
+        }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    await sync_to_async(ledger.record_created)(intent, user_email)
+
+    return JsonResponse({
+        'payment_intent_id': intent['id'],
+        'client_secret': intent.get('client_secret'),
+        'status': intent.get('status'),
+    }, status=status.HTTP_200_OK)
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def confirm_payment(request):
-    """Confirm payment and upgrade user"""
-    try:
-        data = request.data
-        payment_intent_id = data.get('payment_intent_id')
-        
-        if not payment_intent_id:
+    """Queue payment confirmation; premium activation runs in the task worker"""
+    payment_intent_id = str(request.data.get('payment_intent_id') or '')
+    
+    if not payment_intent_id:
+        return Response({
+            'error': 'Payment intent ID required'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    if not PAYMENT_INTENT_ID.fullmatch(payment_intent_id):
+        return Response({
+            'error': 'Invalid payment intent ID'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    job_id = request.data.get('job_id')
+    if job_id is not None:
+        # Promowac mozna tylko wlasna oferte
+        try:
+            job_id = int(job_id)
+        except (TypeError, ValueError):
+            job_id = None
+        if job_id is None or not request.user.is_authenticated or not Job.objects.filter(
+                pk=job_id, posted_by=request.user).exists():
             return Response({
-                'error': 'Payment intent ID required'
+                'error': 'Job not found'
             }, status=status.HTTP_400_BAD_REQUEST)
-        
-        return Response({
-            'status': 'succeeded',
-            'message': 'Payment confirmed successfully',
-            'user_upgraded': True,
-        }, status=status.HTTP_200_OK)
-            
-    except Exception as e:
+
+    enqueue(confirm_payment_intent, kwargs={
+        'payment_intent_id': payment_intent_id,
+        'user_id': request.user.pk if request.user.is_authenticated else None,
+        'job_id': job_id,
+    }, idempotency_key=confirm_key(payment_intent_id))
+    # Stan z webhookow, bez pytania Stripe
+    payment = Payment.objects.filter(payment_intent_id=payment_intent_id).only('status').first()
+
+    return Response({
+        'status': payment.status if payment else 'processing',
+        'payment_intent_id': payment_intent_id,
+        'message': 'Payment is being confirmed, premium will be activated shortly',
+    }, status=status.HTTP_202_ACCEPTED)
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def payment_status(request, payment_intent_id):
+    """Payment state as last reported by Stripe webhooks"""
+    payment = Payment.objects.filter(payment_intent_id=payment_intent_id).first()
+    if payment is None:
         return Response({
-            'error': f'Payment confirmation failed: {str(e)}'
-        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            'payment_intent_id': payment_intent_id,
+            'status': 'unknown',
+        }, status=status.HTTP_404_NOT_FOUND)
+    return Response({
+        'payment_intent_id': payment.payment_intent_id,
+        'status': payment.status,
+        'amount': payment.amount,
+        'currency': payment.currency,
+        'updated_at': payment.updated_at,
+    }, status=status.HTTP_200_OK)
+
+class PaymentHistoryView(generics.ListAPIView):
+    """Payments of the current user, newest first"""
+    serializer_class = PaymentSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+
+    def get_queryset(self):
+        return Payment.objects.filter(user=self.request.user).prefetch_related('transitions').order_by('-created_at')
+
+@csrf_exempt
+@require_POST
+def stripe_webhook(request):
+    """Stripe webhook: verify the signature, store the event, process it in a batch"""
+    if not settings.STRIPE_WEBHOOK_SECRET:
+        return JsonResponse({'error': 'Stripe webhook secret not configured'},
+                            status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    try:
+        event = webhooks.verify_event(request.body, request.headers.get('Stripe-Signature'))
+    except ValueError as e:
+        logger.warning(f"Rejected Stripe webhook: {e}")
+        return JsonResponse({'error': 'Invalid signature'}, status=status.HTTP_400_BAD_REQUEST)
+
+    with transaction.atomic():
+        if webhooks.store_event(event):
+            webhooks.schedule_processing()
+    # 200 rowniez dla duplikatu - inaczej Stripe ponawialby dostarczenie
+    return JsonResponse({'received': True}, status=status.HTTP_200_OK)
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
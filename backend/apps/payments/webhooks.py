@@ -0,0 +1,243 @@
+"""Stripe webhook ingestion: verify, store the raw event, apply it in batches.
+
+The endpoint only verifies the signature and appends the event to
+``StripeEvent``; a task applies unprocessed events in batches to the local
+``Payment`` table, so payment status reads never go to Stripe. Applying an
+event twice is harmless (older events never overwrite newer state and
+follow-up tasks are idempotent), so overlapping batches need no locking.
+"""
+import json
+import logging
+import time
+from datetime import datetime, timezone as dt_timezone
+
+import stripe
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.tasks.queue import enqueue
+
+from .ledger import user_ids_by_email
+from .models import Payment, PaymentTransition, StripeEvent
+
+logger = logging.getLogger(__name__)
+
+
+def verify_event(payload, signature):
+    """Parses a webhook body; raises ValueError if the signature or body is invalid."""
+    try:
+        stripe.WebhookSignature.verify_header(
+            payload.decode('utf-8'), signature or '', settings.STRIPE_WEBHOOK_SECRET,
+            tolerance=getattr(settings, 'STRIPE_WEBHOOK_TOLERANCE', 300),
+        )
+        event = json.loads(payload)
+    except (stripe.error.SignatureVerificationError, UnicodeDecodeError, ValueError) as exc:
+        raise ValueError(str(exc))
+    if not isinstance(event, dict) or not event.get('id') or not event.get('type'):
+        raise ValueError('Not a Stripe event')
+    return event
+
+
+def store_event(event):
+    """Appends the event; returns False for a duplicate delivery."""
+    _, created = StripeEvent.objects.get_or_create(event_id=event['id'], defaults={
+        'type': event['type'],
+        'payload': event,
+        'created': datetime.fromtimestamp(event.get('created') or time.time(), tz=dt_timezone.utc),
+    })
+    return created
+
+
+def schedule_processing():
+    # Zdarzenia z jednego okna trafiaja do jednej paczki
+    window = getattr(settings, 'STRIPE_EVENTS_BATCH_WINDOW', 1)
+    slot = int(time.time() // window) + 1
+    enqueue('payments.process_stripe_events', run_at=datetime.fromtimestamp(slot * window, tz=dt_timezone.utc),
+            idempotency_key=f'process-stripe-events:{window}:{slot}')
+
+
+def process_batch(batch_size):
+    """Applies up to ``batch_size`` unprocessed events, oldest first; returns how many."""
+    with transaction.atomic():
+        pending = StripeEvent.objects.filter(processed_at__isnull=True).order_by('created', 'id')
+        if connection.features.has_select_for_update_skip_locked:
+            pending = pending.select_for_update(skip_locked=True)
+        events = list(pending[:batch_size])
+        if not events:
+            return 0
+
+        updates = [(event, update) for event in events if (update := payment_update(event.payload))]
+        ledger = _Ledger(updates)
+        users = user_ids_by_email(update['email'] for _, update in updates)
+        for event, update in updates:
+            state = ledger.get(update)
+            if state is None:
+                state = Payment(last_event_at=event.created)
+            elif not _is_newer(event, update, state):
+                continue
+            previous = state.status
+            _apply(state, event, update, users)
+            ledger.changed(state, previous, event)
+
+        ledger.save()
+        StripeEvent.objects.filter(pk__in=[event.pk for event in events]).update(processed_at=timezone.now())
+        for state in ledger.succeeded():
+            _after_success(state)
+    return len(events)
+
+
+class _Ledger:
+    """Payment rows touched by one batch, found by intent id or Checkout Session id.
+
+    Webhooks for the PaymentIntent behind a Checkout Session can create a
+    row before ``checkout.session.completed`` links the two ids; such rows
+    are merged into the session's row.
+    """
+
+    def __init__(self, updates):
+        intent_ids = {update['payment_intent_id'] for _, update in updates} - {None}
+        session_ids = {update['checkout_session_id'] for _, update in updates} - {None}
+        self.by_intent, self.by_session = {}, {}
+        self.touched, self.transitions, self.merged = {}, [], []
+        for payment in Payment.objects.filter(
+                Q(payment_intent_id__in=intent_ids) | Q(checkout_session_id__in=session_ids)):
+            self._index(payment)
+
+    def get(self, update):
+        session = self.by_session.get(update['checkout_session_id'])
+        intent = self.by_intent.get(update['payment_intent_id'])
+        if session is not None and intent is not None and session is not intent:
+            self._merge(intent, session)
+        return session or intent
+
+    def changed(self, payment, previous, event):
+        self._index(payment)
+        self.touched[id(payment)] = payment
+        if payment.status != previous:
+            self.transitions.append(PaymentTransition(
+                payment=payment, from_status=previous, to_status=payment.status,
+                source=PaymentTransition.WEBHOOK, event_id=event.event_id, occurred_at=event.created,
+            ))
+
+    def save(self):
+        now = timezone.now()
+        payments = list(self.touched.values())
+        for payment in payments:
+            payment.updated_at = now
+        # Scalane wiersze zwalniaja payment_intent_id przed zapisem - inaczej konflikt unikalnosci
+        merged_pks = [source_pk for source_pk, _ in self.merged]
+        Payment.objects.filter(pk__in=merged_pks).update(payment_intent_id=None)
+        Payment.objects.bulk_create([payment for payment in payments if payment.pk is None])
+        for source_pk, target in self.merged:
+            PaymentTransition.objects.filter(payment_id=source_pk).update(payment=target)
+        Payment.objects.filter(pk__in=merged_pks).delete()
+        Payment.objects.bulk_update(
+            [payment for payment in payments if payment.pk is not None],
+            ['payment_intent_id', 'checkout_session_id', 'status', 'amount', 'currency', 'user', 'email',
+             'metadata', 'last_event_id', 'last_event_at', 'updated_at'],
+        )
+        PaymentTransition.objects.bulk_create(self.transitions)
+
+    def succeeded(self):
+        # Kazda platnosc, ktora w tej paczce przeszla w succeeded i nadal nim jest
+        paid = {id(t.payment): t.payment for t in self.transitions if t.to_status == Payment.SUCCEEDED}
+        return [payment for payment in paid.values() if payment.status == Payment.SUCCEEDED]
+
+    def _index(self, payment):
+        if payment.payment_intent_id:
+            self.by_intent[payment.payment_intent_id] = payment
+        if payment.checkout_session_id:
+            self.by_session[payment.checkout_session_id] = payment
+
+    def _merge(self, source, target):
+        if source.last_event_at > target.last_event_at:
+            for field in ('status', 'amount', 'currency', 'email', 'user_id', 'last_event_id', 'last_event_at'):
+                setattr(target, field, getattr(source, field))
+        target.metadata = {**source.metadata, **target.metadata}
+        target.payment_intent_id = source.payment_intent_id
+        self.by_intent[target.payment_intent_id] = target
+        self.touched.pop(id(source), None)
+        self.touched[id(target)] = target
+        for transition in self.transitions:
+            if transition.payment is source:
+                transition.payment = target
+        if source.pk is not None:
+            self.merged.append((source.pk, target))
+
+
+SESSION_STATUSES = {
+    'checkout.session.async_payment_succeeded': Payment.SUCCEEDED,
+    'checkout.session.async_payment_failed': 'requires_payment_method',
+    'checkout.session.expired': Payment.CANCELED,
+}
+
+
+def payment_update(event):
+    """Ledger state carried by an event, or None for event types we do not track."""
+    obj = (event.get('data') or {}).get('object') or {}
+    metadata = obj.get('metadata') or {}
+    if obj.get('object') == 'payment_intent' and obj.get('id'):
+        return {
+            'payment_intent_id': obj['id'],
+            'checkout_session_id': None,
+            'status': obj.get('status') or '',
+            'amount': obj.get('amount'),
+            'currency': obj.get('currency') or '',
+            'email': metadata.get('user_email') or obj.get('receipt_email') or '',
+            'metadata': metadata,
+        }
+    if obj.get('object') == 'checkout.session' and obj.get('id'):
+        if event.get('type') == 'checkout.session.completed':
+            # Zaplacona sesja to udany PaymentIntent; platnosci odroczone koncza sie osobnym zdarzeniem
+            status = Payment.SUCCEEDED if obj.get('payment_status') in ('paid', 'no_payment_required') else 'processing'
+        elif event.get('type') in SESSION_STATUSES:
+            status = SESSION_STATUSES[event['type']]
+        else:
+            return None
+        return {
+            'payment_intent_id': obj.get('payment_intent'),
+            'checkout_session_id': obj['id'],
+            'status': status,
+            'amount': obj.get('amount_total'),
+            'currency': obj.get('currency') or '',
+            'email': (metadata.get('user_email') or (obj.get('customer_details') or {}).get('email')
+                      or obj.get('customer_email') or ''),
+            'metadata': metadata,
+        }
+    return None
+
+
+def _is_newer(event, update, state):
+    # Stripe nie gwarantuje kolejnosci dostarczania; created ma rozdzielczosc 1 s
+    if event.created != state.last_event_at:
+        return event.created > state.last_event_at
+    return not (state.status in Payment.FINAL_STATUSES and update['status'] not in Payment.FINAL_STATUSES)
+
+
+def _apply(state, event, update, users):
+    state.payment_intent_id = update['payment_intent_id'] or state.payment_intent_id
+    state.checkout_session_id = update['checkout_session_id'] or state.checkout_session_id
+    state.status = update['status']
+    if update['amount'] is not None:
+        state.amount = update['amount']
+    state.currency = update['currency'] or state.currency
+    if update['email']:
+        state.email = update['email']
+        state.user_id = users.get(update['email'], state.user_id)
+    state.metadata = {**state.metadata, **update['metadata']}
+    state.last_event_id = event.event_id
+    state.last_event_at = event.created
+
+
+def _after_success(state):
+    # Te same klucze co w confirm_payment_intent - upgrade wykona sie raz, niezaleznie od sciezki
+    if state.user_id is not None:
+        enqueue('payments.activate_premium', kwargs={'user_id': state.user_id},
+                idempotency_key=f'activate-premium:{state.payment_intent_id}')
+    job_id = state.metadata.get('job_id')
+    if job_id and str(job_id).isdigit():
+        enqueue('payments.promote_job', kwargs={'job_id': int(job_id)},
+                idempotency_key=f'promote-job:{state.payment_intent_id}')
+    logger.info(f'Payment {state.payment_intent_id} succeeded')
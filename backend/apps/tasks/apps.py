@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+class TasksConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.tasks'
+
+    def ready(self):
+        # Rejestruje funkcje @task z modulow <app>.tasks
+        from django.utils.module_loading import autodiscover_modules
+        autodiscover_modules('tasks')
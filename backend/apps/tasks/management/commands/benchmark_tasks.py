@@ -0,0 +1,107 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from apps.tasks.models import Task
+from apps.tasks.queue import enqueue
+from apps.tasks.tasks import noop
+
+from .run_worker import start_worker_processes
+
+BENCHMARK_KEY_PREFIX = 'benchmark:'
+
+
+class Command(BaseCommand):
+    help = 'Measure task queue throughput and end-to-end latency with real worker processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=1000)
+        parser.add_argument('--processes', type=int, default=2)
+        parser.add_argument('--batch-size', type=int, default=10)
+        parser.add_argument('--poll-interval', type=float, default=0.05)
+        parser.add_argument('--rate', type=float, default=0,
+                            help='Tasks enqueued per second (0 = as fast as possible)')
+        parser.add_argument('--task-ms', type=float, default=0, help='Simulated work per task')
+        parser.add_argument('--timeout', type=float, default=300)
+        parser.add_argument('--output', help='Write results as JSON to this file')
+
+    def handle(self, *args, **options):
+        if options['tasks'] < 1 or options['processes'] < 1:
+            raise CommandError('--tasks and --processes must be positive')
+        # Zostalosci po przerwanym przebiegu zafalszowalyby wyniki
+        Task.objects.filter(idempotency_key__startswith=BENCHMARK_KEY_PREFIX).delete()
+
+        workers = start_worker_processes(options['processes'], {
+            'batch_size': options['batch_size'],
+            'lease': 300,
+            'poll_interval': options['poll_interval'],
+            'names': [noop.name],
+        }, burst=False)
+        try:
+            enqueue_seconds = self._enqueue(options)
+            self._wait(options)
+        finally:
+            for process in workers:
+                process.terminate()
+            for process in workers:
+                process.join()
+
+        results = self._results(options, enqueue_seconds)
+        Task.objects.filter(idempotency_key__startswith=BENCHMARK_KEY_PREFIX).delete()
+        for name, value in results.items():
+            self.stdout.write(f'{name:>24}: {value}')
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                json.dump(results, handle, indent=2)
+            self.stdout.write(f'Results written to {options["output"]}')
+
+    def _enqueue(self, options):
+        interval = 1 / options['rate'] if options['rate'] else 0
+        started = time.perf_counter()
+        for i in range(options['tasks']):
+            if interval:
+                delay = started + i * interval - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            enqueue(noop, kwargs={'sleep_ms': options['task_ms']},
+                    idempotency_key=f'{BENCHMARK_KEY_PREFIX}{i}')
+        return time.perf_counter() - started
+
+    def _wait(self, options):
+        deadline = time.monotonic() + options['timeout']
+        pending = Task.objects.filter(idempotency_key__startswith=BENCHMARK_KEY_PREFIX).exclude(
+            status__in=[Task.SUCCEEDED, Task.FAILED])
+        while pending.exists():
+            if time.monotonic() > deadline:
+                raise CommandError(f'{pending.count()} tasks still unfinished after {options["timeout"]}s')
+            time.sleep(0.05)
+
+    def _results(self, options, enqueue_seconds):
+        rows = list(Task.objects.filter(idempotency_key__startswith=BENCHMARK_KEY_PREFIX).values_list(
+            'created_at', 'started_at', 'finished_at', 'status'))
+        latencies = sorted((finished - created).total_seconds() * 1000 for created, _, finished, _ in rows)
+        waits = sorted((started - created).total_seconds() * 1000 for created, started, _, _ in rows)
+        first_created = min(row[0] for row in rows)
+        last_finished = max(row[2] for row in rows)
+        return {
+            'database': connection.vendor,
+            'tasks': len(rows),
+            'failed': sum(1 for row in rows if row[3] == Task.FAILED),
+            'processes': options['processes'],
+            'batch_size': options['batch_size'],
+            'enqueue_per_s': round(len(rows) / enqueue_seconds, 1),
+            'throughput_per_s': round(len(rows) / (last_finished - first_created).total_seconds(), 1),
+            'latency_p50_ms': round(_percentile(latencies, 50), 1),
+            'latency_p95_ms': round(_percentile(latencies, 95), 1),
+            'latency_p99_ms': round(_percentile(latencies, 99), 1),
+            'queue_wait_p50_ms': round(_percentile(waits, 50), 1),
+            'queue_wait_p95_ms': round(_percentile(waits, 95), 1),
+        }
+
+
+def _percentile(sorted_values, percent):
+    # Metoda najblizszej rangi, jak w benchmark_api
+    index = max(0, min(len(sorted_values) - 1, -(-len(sorted_values) * percent // 100) - 1))
+    return sorted_values[int(index)]
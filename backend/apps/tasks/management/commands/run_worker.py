@@ -0,0 +1,72 @@
+import multiprocessing
+import signal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+def worker_options(options):
+    return {
+        'batch_size': options['batch_size'],
+        'lease': options['lease'],
+        'poll_interval': options['poll_interval'],
+        'names': options.get('names'),
+    }
+
+
+def run_worker_process(worker_kwargs, burst):
+    """Process entry point; Django models are imported only once the app registry is ready."""
+    import django
+    django.setup()
+    from apps.tasks.worker import Worker
+
+    worker = Worker(**worker_kwargs)
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    return worker.run(burst=burst)
+
+
+def start_worker_processes(count, worker_kwargs, burst):
+    # Polaczenia z bazy nie moga byc wspoldzielone przez procesy potomne
+    connections.close_all()
+    processes = [
+        multiprocessing.Process(target=run_worker_process, args=(worker_kwargs, burst), daemon=False)
+        for _ in range(count)
+    ]
+    for process in processes:
+        process.start()
+    return processes
+
+
+class Command(BaseCommand):
+    help = 'Run background task workers (apps.tasks)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1, help='Worker processes to start')
+        parser.add_argument('--batch-size', type=int, default=10, help='Tasks claimed per query')
+        parser.add_argument('--lease', type=int, default=300,
+                            help='Seconds before a claimed task is given to another worker')
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help='Seconds to sleep when no task is due')
+        parser.add_argument('--burst', action='store_true', help='Exit once the queue is empty')
+
+    def handle(self, *args, **options):
+        if options['processes'] < 1:
+            raise CommandError('--processes must be positive')
+        worker_kwargs = worker_options(options)
+
+        if options['processes'] == 1:
+            processed = run_worker_process(worker_kwargs, options['burst'])
+            self.stdout.write(self.style.SUCCESS(f'Worker stopped after {processed} tasks'))
+            return
+
+        processes = start_worker_processes(options['processes'], worker_kwargs, options['burst'])
+        self.stdout.write(f'Started {len(processes)} worker processes')
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            # Potomne procesy dostaly SIGINT razem z nami i koncza biezace zadania
+            for process in processes:
+                process.join()
+        self.stdout.write(self.style.SUCCESS('Workers stopped'))
@@ -0,0 +1,104 @@
+"""Database-backed task queue: tasks are rows of ``Task``, no external broker.
+
+Register work with ``@task`` in an app's ``tasks`` module and schedule it
+with ``enqueue``. Enqueueing inside ``transaction.atomic()`` commits the
+task together with the write that caused it, so a rolled back request
+never leaves a task behind. ``run_worker`` processes claim and run them.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Task
+
+_registry = {}
+
+
+class Retry(Exception):
+    """Raised by a task to be run again later; counts as a failed attempt."""
+
+    def __init__(self, message='', countdown=None):
+        super().__init__(message)
+        self.countdown = countdown
+
+
+class TaskFunction:
+    def __init__(self, func, name, max_attempts, retry_backoff, atomic=True):
+        self.func = func
+        self.name = name
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.atomic = atomic
+        self.__doc__ = func.__doc__
+
+    def __call__(self, **kwargs):
+        # Wywolanie bezposrednie wykonuje zadanie od razu (testy, shell)
+        return self.func(**kwargs)
+
+    def enqueue(self, **options):
+        return enqueue(self, **options)
+
+    def retry_delay(self, attempts):
+        return self.retry_backoff * 2 ** max(attempts - 1, 0)
+
+
+def task(name=None, max_attempts=3, retry_backoff=5, atomic=True):
+    """Registers a function as a task; its kwargs and return value must be JSON serializable.
+
+    The worker runs a task inside ``transaction.atomic()``. Tasks that call
+    external APIs pass ``atomic=False`` and open their own transactions
+    around the writes, so no transaction is held open during the call.
+    """
+    def decorator(func):
+        task_name = name or f'{func.__module__.split(".")[-2]}.{func.__name__}'
+        if task_name in _registry and _registry[task_name].func is not func:
+            raise ValueError(f'Task {task_name} is already registered')
+        _registry[task_name] = TaskFunction(func, task_name, max_attempts, retry_backoff, atomic)
+        return _registry[task_name]
+    return decorator
+
+
+def get_task(name):
+    return _registry.get(name)
+
+
+def enqueue(task, kwargs=None, run_at=None, countdown=None, idempotency_key=None):
+    """Schedules ``task`` (a registered task or its name) and returns the Task row.
+
+    With ``idempotency_key`` a second call returns the already existing task
+    instead of queueing the work twice, however many times it is retried.
+    """
+    spec = task if isinstance(task, TaskFunction) else _registry.get(task)
+    if spec is None:
+        raise ValueError(f'Unknown task {task!r}')
+    if run_at is None:
+        run_at = timezone.now()
+        if countdown:
+            run_at += timedelta(seconds=countdown)
+    fields = {
+        'name': spec.name,
+        'kwargs': kwargs or {},
+        'run_at': run_at,
+        'max_attempts': spec.max_attempts,
+    }
+    if idempotency_key:
+        return Task.objects.get_or_create(idempotency_key=idempotency_key, defaults=fields)[0]
+    return Task.objects.create(**fields)
+
+
+def schedule_periodic(now=None):
+    """Enqueues every ``TASKS_PERIODIC`` entry whose interval slot has started.
+
+    The slot number is part of the idempotency key, so any number of workers
+    can call this and each slot still runs exactly once.
+    """
+    now = now or timezone.now()
+    for key, entry in getattr(settings, 'TASKS_PERIODIC', {}).items():
+        interval = entry['interval']
+        slot = int(now.timestamp() // interval)
+        enqueue(
+            entry['task'], kwargs=entry.get('kwargs'),
+            run_at=datetime.fromtimestamp(slot * interval, tz=dt_timezone.utc),
+            idempotency_key=f'periodic:{key}:{slot}',
+        )
@@ -0,0 +1,22 @@
+import time
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .models import Task
+from .queue import task
+
+
+@task()
+def noop(sleep_ms=0):
+    """Does nothing; used by benchmark_tasks to measure queue overhead."""
+    if sleep_ms:
+        time.sleep(sleep_ms / 1000)
+
+
+@task()
+def prune_finished(days=7):
+    """Deletes succeeded tasks older than ``days``; failed ones are kept for inspection."""
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = Task.objects.filter(status=Task.SUCCEEDED, finished_at__lt=cutoff).delete()
+    return {'deleted': deleted}
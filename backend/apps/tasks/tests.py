@@ -0,0 +1,107 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .models import Task
+from .queue import Retry, enqueue, schedule_periodic, task
+from .worker import Worker
+
+calls = []
+
+
+@task(name='tests.record', max_attempts=2, retry_backoff=0)
+def record(value, fail_times=0):
+    calls.append(value)
+    if calls.count(value) <= fail_times:
+        raise RuntimeError(f'failure {calls.count(value)}')
+    return {'value': value}
+
+
+@task(name='tests.not_yet')
+def not_yet():
+    raise Retry('still processing', countdown=60)
+
+
+@override_settings(TASKS_PERIODIC={})
+class TaskQueueTest(TestCase):
+    def setUp(self):
+        calls.clear()
+        self.worker = Worker(batch_size=5)
+
+    def test_idempotency_key_returns_existing_task(self):
+        first = enqueue(record, kwargs={'value': 1}, idempotency_key='record-1')
+        second = enqueue('tests.record', kwargs={'value': 2}, idempotency_key='record-1')
+
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(Task.objects.count(), 1)
+
+    def test_worker_runs_due_tasks_and_stores_result(self):
+        enqueue(record, kwargs={'value': 'now'})
+        enqueue(record, kwargs={'value': 'later'}, countdown=60)
+
+        self.assertEqual(self.worker.run(burst=True), 1)
+        self.assertEqual(calls, ['now'])
+        done = Task.objects.get(status=Task.SUCCEEDED)
+        self.assertEqual(done.result, {'value': 'now'})
+        self.assertEqual(done.attempts, 1)
+        self.assertEqual(Task.objects.filter(status=Task.PENDING).count(), 1)
+
+    def test_failed_task_is_retried_then_marked_failed(self):
+        retried = enqueue(record, kwargs={'value': 'a', 'fail_times': 1})
+        failed = enqueue(record, kwargs={'value': 'b', 'fail_times': 5})
+
+        self.worker.run(burst=True)
+
+        retried.refresh_from_db()
+        failed.refresh_from_db()
+        self.assertEqual((retried.status, retried.attempts), (Task.SUCCEEDED, 2))
+        self.assertEqual((failed.status, failed.attempts), (Task.FAILED, 2))
+        self.assertIn('failure 2', failed.last_error)
+
+    def test_retry_exception_reschedules_with_countdown(self):
+        pending = enqueue('tests.not_yet')
+
+        self.worker.run_once()
+
+        pending.refresh_from_db()
+        self.assertEqual(pending.status, Task.PENDING)
+        self.assertGreater(pending.run_at, timezone.now() + timedelta(seconds=50))
+
+    def test_expired_lease_is_claimed_again(self):
+        abandoned = enqueue(record, kwargs={'value': 'x'})
+        Task.objects.filter(pk=abandoned.pk).update(
+            status=Task.RUNNING, locked_by='dead-worker', attempts=1,
+            locked_until=timezone.now() - timedelta(seconds=1),
+        )
+        enqueue(record, kwargs={'value': 'y'})
+        live = Task.objects.get(kwargs__value='y')
+        Task.objects.filter(pk=live.pk).update(
+            status=Task.RUNNING, locked_by='live-worker', locked_until=timezone.now() + timedelta(minutes=5),
+        )
+
+        claimed = self.worker.claim()
+
+        self.assertEqual([claimed_task.pk for claimed_task in claimed], [abandoned.pk])
+        self.assertEqual(claimed[0].attempts, 2)
+
+    def test_claims_do_not_overlap(self):
+        for value in range(8):
+            enqueue(record, kwargs={'value': value})
+
+        first = Worker(batch_size=5, worker_id='w1').claim()
+        second = Worker(batch_size=5, worker_id='w2').claim()
+
+        self.assertEqual(len(first), 5)
+        self.assertEqual(len(second), 3)
+        self.assertFalse({t.pk for t in first} & {t.pk for t in second})
+
+    @override_settings(TASKS_PERIODIC={'record': {'task': 'tests.record', 'interval': 3600,
+                                                 'kwargs': {'value': 'tick'}}})
+    def test_periodic_tasks_are_enqueued_once_per_interval(self):
+        now = timezone.now()
+        schedule_periodic(now)
+        schedule_periodic(now)
+        schedule_periodic(now + timedelta(hours=1))
+
+        self.assertEqual(Task.objects.filter(name='tests.record').count(), 2)
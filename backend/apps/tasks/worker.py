@@ -0,0 +1,125 @@
+import logging
+import os
+import socket
+import time
+import traceback
+import uuid
+from contextlib import nullcontext
+from datetime import timedelta
+
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Task
+from .queue import Retry, get_task, schedule_periodic
+
+logger = logging.getLogger(__name__)
+
+
+class Worker:
+    """Claims due tasks in batches and runs them one by one.
+
+    A claim leases the tasks for ``lease`` seconds; tasks of a worker that
+    died mid-run become claimable again once the lease expires. Every task
+    body runs in its own transaction, so a failed attempt leaves no partial
+    writes behind before it is retried.
+    """
+
+    def __init__(self, batch_size=10, lease=300, poll_interval=1.0, names=None, worker_id=None):
+        self.batch_size = batch_size
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self.names = names
+        self.worker_id = worker_id or f'{socket.gethostname()}:{os.getpid()}'
+        self.stopping = False
+        self.processed = 0
+
+    def stop(self, *args):
+        # Dokoncz biezace zadanie i wyjdz (SIGTERM/SIGINT)
+        self.stopping = True
+
+    def run(self, burst=False):
+        """Loops until ``stop()``; with ``burst`` returns once nothing is due."""
+        last_schedule = 0
+        while not self.stopping:
+            close_old_connections()
+            if time.monotonic() - last_schedule >= 1:
+                schedule_periodic()
+                last_schedule = time.monotonic()
+            if self.run_once():
+                continue
+            if burst:
+                break
+            time.sleep(self.poll_interval)
+        return self.processed
+
+    def run_once(self):
+        tasks = self.claim()
+        for task in tasks:
+            if self.stopping:
+                # Niewykonane zadania wracaja do kolejki od razu, nie po wygasnieciu dzierzawy
+                self._release(task)
+                continue
+            self.run_task(task)
+        return len(tasks)
+
+    def claim(self):
+        now = timezone.now()
+        token = f'{self.worker_id}:{uuid.uuid4().hex[:8]}'[-64:]
+        due = Task.objects.filter(
+            Q(status=Task.PENDING) | Q(status=Task.RUNNING, locked_until__lt=now), run_at__lte=now,
+        ).order_by('run_at', 'id')
+        if self.names:
+            due = due.filter(name__in=self.names)
+        claimed = {
+            'status': Task.RUNNING,
+            'locked_by': token,
+            'locked_until': now + timedelta(seconds=self.lease),
+            'attempts': F('attempts') + 1,
+            'started_at': now,
+        }
+        if connection.features.has_select_for_update_skip_locked:
+            with transaction.atomic():
+                ids = list(due.select_for_update(skip_locked=True).values_list('pk', flat=True)[:self.batch_size])
+                Task.objects.filter(pk__in=ids).update(**claimed)
+        else:
+            # SQLite: jeden UPDATE ... WHERE id IN (SELECT ... LIMIT n) - baza blokuje zapis
+            # na czas calej instrukcji, wiec dwa workery nie dostana tego samego zadania
+            Task.objects.filter(pk__in=due.values('pk')[:self.batch_size]).update(**claimed)
+        return list(Task.objects.filter(status=Task.RUNNING, locked_by=token).order_by('run_at', 'id'))
+
+    def run_task(self, task):
+        spec = get_task(task.name)
+        if spec is None:
+            self._finish(task, Task.FAILED, last_error=f'Unknown task {task.name}')
+            return
+        try:
+            with transaction.atomic() if spec.atomic else nullcontext():
+                result = spec.func(**task.kwargs)
+        except Exception as exc:
+            error = traceback.format_exc()
+            if task.attempts < task.max_attempts:
+                countdown = exc.countdown if isinstance(exc, Retry) and exc.countdown else None
+                delay = countdown if countdown is not None else spec.retry_delay(task.attempts)
+                logger.warning(f'Task {task} failed (attempt {task.attempts}), retrying in {delay}s: {exc}')
+                self._finish(task, Task.PENDING, last_error=error, finished=False,
+                             run_at=timezone.now() + timedelta(seconds=delay))
+            else:
+                logger.error(f'Task {task} failed permanently: {exc}')
+                self._finish(task, Task.FAILED, last_error=error)
+        else:
+            self._finish(task, Task.SUCCEEDED, result=result)
+        self.processed += 1
+
+    def _finish(self, task, status, finished=True, **fields):
+        # Warunek na locked_by: po wygasnieciu dzierzawy zadanie moglo trafic do innego workera
+        Task.objects.filter(pk=task.pk, locked_by=task.locked_by).update(
+            status=status, locked_by='', locked_until=None,
+            finished_at=timezone.now() if finished else None, **fields,
+        )
+
+    def _release(self, task):
+        Task.objects.filter(pk=task.pk, locked_by=task.locked_by).update(
+            status=Task.PENDING, locked_by='', locked_until=None, attempts=F('attempts') - 1,
+        )
@@ -0,0 +1,36 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .cache import get_cached_user
+from .models import User
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """JWT authentication that trusts the signed user claims instead of loading the row.
+
+    Tokens issued by ``tokens_for_user`` carry id, email, user_type and
+    is_premium, so most requests authenticate without touching the database.
+    Other fields are loaded lazily on first access. Tokens without the
+    claims fall back to the short-TTL user cache. A deactivated user keeps
+    access until their access token expires, and the ``is_premium`` and
+    ``user_type`` claims (used by ``IsEmployer`` and the profile view) stay
+    stale until the next token refresh, up to ``ACCESS_TOKEN_LIFETIME``.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        if all(name in validated_token for name in User.CLAIM_FIELDS):
+            return User.from_claims(user_id, validated_token)
+
+        user = get_cached_user(user_id)
+        if user is None:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+        if not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        return user
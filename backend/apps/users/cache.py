@@ -0,0 +1,32 @@
+from django.conf import settings
+
+from fluffy_jobs.ttlcache import TTLCache
+
+from .models import User
+
+
+# Wartosci pol wiersza uzytkownika po id
+user_cache = TTLCache(
+    ttl=getattr(settings, 'AUTH_USER_CACHE_TTL', 30),
+    max_entries=getattr(settings, 'AUTH_USER_CACHE_MAX_ENTRIES', 10000),
+)
+
+
+def get_user_values(user_id):
+    """Field values of the user row, from the cache or one query."""
+    values = user_cache.get(user_id)
+    if values is None:
+        attnames = [field.attname for field in User._meta.concrete_fields]
+        row = User.objects.filter(pk=user_id).values_list(*attnames).first()
+        if row is None:
+            return None
+        values = dict(zip(attnames, row))
+        user_cache.set(user_id, values)
+    return values
+
+
+def get_cached_user(user_id):
+    values = get_user_values(user_id)
+    if values is None:
+        return None
+    return User.from_db(None, list(values), list(values.values()))
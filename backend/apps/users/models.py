@@ -18,6 +18,35 @@ class User(AbstractUser):
     
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username']
+    # Pola podpisane w access tokenie (apps.users.tokens)
+    CLAIM_FIELDS = ('email', 'user_type', 'is_premium')
     
     def __str__(self):
         return self.email
+
+    @classmethod
+    def from_claims(cls, user_id, claims):
+        """User built from signed JWT claims without a database read.
+
+        Only the fields in ``CLAIM_FIELDS`` are populated; every other field is
+        deferred. The first access to a deferred field loads the whole row at
+        once (through the in-process user cache) instead of one query per field.
+        """
+        known = {'id': user_id}
+        known.update((name, claims[name]) for name in cls.CLAIM_FIELDS)
+        names = [field.attname for field in cls._meta.concrete_fields if field.attname in known]
+        user = cls.from_db(None, names, [known[name] for name in names])
+        user._from_claims = True
+        return user
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        deferred = self.get_deferred_fields()
+        if (not getattr(self, '_from_claims', False) or fields is None or from_queryset is not None
+                or not deferred.issuperset(fields)):
+            return super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        from .cache import get_user_values
+        values = get_user_values(self.pk)
+        if values is None:
+            raise User.DoesNotExist(f'User {self.pk} no longer exists')
+        for attname in deferred:
+            setattr(self, attname, values[attname])
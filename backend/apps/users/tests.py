@@ -1,6 +1,11 @@
 from django.test import TestCase
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from apps.jobs.models import Job
+from .cache import user_cache
 
 class UserModelTest(TestCase):
     def test_user_creation(self):
@@ -15,3 +20,59 @@ class UserModelTest(TestCase):
         self.assertTrue(user.check_password('testpass123'))
         self.assertTrue(user.is_active)
         self.assertFalse(user.is_staff)
+
+
+class ClaimsAuthenticationTest(TestCase):
+    def setUp(self):
+        user_cache.clear()
+        self.user = get_user_model().objects.create_user(
+            username='claims@test.com', email='claims@test.com', password='testpass123',
+            first_name='Anna', user_type='employer',
+        )
+        self.job = Job.objects.create(
+            title='Python Developer', company='TechCorp', description='Django.', requirements='Python',
+            job_type='full_time', location='Warsaw', posted_by=self.user,
+        )
+        self.client = APIClient(SERVER_NAME='localhost')
+
+    def _login(self):
+        response = self.client.post('/api/users/login/', {
+            'email': 'claims@test.com', 'password': 'testpass123'
+        }, format='json')
+        return response.data
+
+    def test_access_token_carries_user_claims(self):
+        access = AccessToken(self._login()['access'])
+        self.assertEqual(
+            (access['email'], access['user_type'], access['is_premium']),
+            ('claims@test.com', 'employer', False)
+        )
+
+    def test_hot_endpoint_skips_user_lookup(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self._login()["access"]}')
+        with self.assertNumQueries(1):
+            response = self.client.get(f'/api/jobs/{self.job.pk}/check-saved/')
+        self.assertEqual(response.data, {'is_saved': False})
+
+    def test_other_fields_load_once_on_first_access(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self._login()["access"]}')
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/users/profile/')
+        self.assertEqual(response.data['first_name'], 'Anna')
+
+    def test_tokens_without_claims_use_user_cache(self):
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        with self.assertNumQueries(2):
+            self.client.get(f'/api/jobs/{self.job.pk}/check-saved/')
+        with self.assertNumQueries(1):
+            self.client.get(f'/api/jobs/{self.job.pk}/check-saved/')
+
+    def test_refresh_picks_up_changed_claims(self):
+        refresh = self._login()['refresh']
+        self.user.is_premium = True
+        self.user.save()
+
+        response = self.client.post('/api/auth/refresh/', {'refresh': refresh}, format='json')
+
+        self.assertTrue(AccessToken(response.data['access'])['is_premium'])
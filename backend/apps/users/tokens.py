@@ -0,0 +1,44 @@
+from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+User = get_user_model()
+
+
+def add_user_claims(token, user):
+    for name in User.CLAIM_FIELDS:
+        token[name] = getattr(user, name)
+    return token
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """Refresh token whose access tokens carry the user's current claims.
+
+    Claims are stamped on every access token it issues, not on the refresh
+    token, so a token refresh picks up changes such as ``is_premium``.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token.user = user
+        return token
+
+    @property
+    def access_token(self):
+        access = super().access_token
+        user = getattr(self, 'user', None)
+        if user is None:
+            user = User.objects.filter(pk=self.payload.get(api_settings.USER_ID_CLAIM)).first()
+        if user is not None:
+            add_user_claims(access, user)
+        return access
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = ClaimsRefreshToken
+
+
+def tokens_for_user(user):
+    return ClaimsRefreshToken.for_user(user)
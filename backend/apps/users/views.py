@@ -3,6 +3,7 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
+from .tokens import tokens_for_user
 from django.contrib.auth import get_user_model
 from .serializers import UserRegistrationSerializer, UserLoginSerializer, UserSerializer
 import logging
@@ -14,8 +15,6 @@ logger = logging.getLogger(__name__)
 @permission_classes([AllowAny])
 def register_user(request):
     """Rejestracja nowego uzytkownika"""
-    logger.info(f'Registration request received: {request.data}')
-    
     try:
         serializer = UserRegistrationSerializer(data=request.data)
         
@@ -23,7 +22,7 @@ def register_user(request):
             user = serializer.save()
             
             # Wygeneruj JWT token
-            refresh = RefreshToken.for_user(user)
+            refresh = tokens_for_user(user)
             
             response_data = {
                 'access': str(refresh.access_token),
@@ -57,7 +56,7 @@ def login_user(request):
     serializer = UserLoginSerializer(data=request.data)
     if serializer.is_valid():
         user = serializer.validated_data['user']
-        refresh = RefreshToken.for_user(user)
+        refresh = tokens_for_user(user)
         
         return Response({
             'user': UserSerializer(user).data,
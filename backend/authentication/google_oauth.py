@@ -1,46 +1,166 @@
-﻿import requests
+﻿import hashlib
+import requests
+from requests.adapters import HTTPAdapter
 from typing import Optional, Dict, Any
+from urllib3.util.retry import Retry
 from django.conf import settings
+from apps.integrations.http import UpstreamUnavailable, get_breaker, request as upstream_request
+from fluffy_jobs.ttlcache import TTLCache
 import logging
 
 logger = logging.getLogger(__name__)
 
+
+def _build_session():
+    # Jedna sesja na proces: keep-alive zamiast nowego TCP+TLS przy kazdym logowaniu
+    config = settings.OUTBOUND_HTTP['google']
+    retry = Retry(
+        total=config.get('retries', 0),
+        backoff_factor=config.get('backoff', 0.2),
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({'GET'}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_maxsize=config['max_connections'], max_retries=retry)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
 class GoogleOAuthService:
+    """Google userinfo/tokeninfo lookups over pooled connections.
+
+    Successful lookups are cached per process under a hash of the access
+    token for ``GOOGLE_TOKEN_CACHE_TTL`` seconds, so repeated logins with
+    the same token skip Google entirely. A tokeninfo entry never outlives
+    the token's ``expires_in``. Userinfo responses carry no expiry and are
+    kept for the full TTL, so a token that expires sooner can still log in
+    from the cache until then. Rejected tokens are not cached.
+    """
+
     def __init__(self):
-        self.client_id = settings.GOOGLE_CLIENT_ID
-        self.client_secret = settings.GOOGLE_CLIENT_SECRET
-        
+        self._session = None
+        self.cache = TTLCache(
+            ttl=getattr(settings, 'GOOGLE_TOKEN_CACHE_TTL', 300),
+            max_entries=getattr(settings, 'GOOGLE_TOKEN_CACHE_MAX_ENTRIES', 10000),
+        )
+
+    @property
+    def client_id(self):
+        return settings.GOOGLE_CLIENT_ID
+
+    @property
+    def client_secret(self):
+        return settings.GOOGLE_CLIENT_SECRET
+
+    @property
+    def session(self):
+        if self._session is None:
+            self._session = _build_session()
+        return self._session
+
     def get_user_info(self, access_token: str) -> Optional[Dict[str, Any]]:
         """Pobiera informacje o użytkowniku z Google API"""
+        key = _cache_key('userinfo', access_token)
+        user_info = self.cache.get(key)
+        if user_info is not None:
+            return user_info
         try:
-            headers = {"Authorization": f"Bearer {access_token}"}
-            response = requests.get(
-                "https://www.googleapis.com/oauth2/v2/userinfo",
-                headers=headers,
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            logger.error(f"Google API error: {response.status_code}")
-            return None
+            response = self._get("/oauth2/v2/userinfo", headers={"Authorization": f"Bearer {access_token}"})
         except Exception as e:
             logger.error(f"Error getting user info: {e}")
             return None
-    
+        return self._store_user_info(key, response)
+
     def verify_token(self, token: str) -> Optional[Dict[str, Any]]:
         """Weryfikuje token Google"""
+        key = _cache_key('tokeninfo', token)
+        token_info = self.cache.get(key)
+        if token_info is not None:
+            return token_info
         try:
-            response = requests.get(
-                f"https://www.googleapis.com/oauth2/v1/tokeninfo?access_token={token}",
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                token_info = response.json()
-                if token_info.get("audience") == self.client_id:
-                    return token_info
-            return None
+            response = self._get("/oauth2/v1/tokeninfo", params={"access_token": token})
         except Exception as e:
             logger.error(f"Token verification error: {e}")
             return None
+        return self._store_token_info(key, response)
+
+    async def aget_user_info(self, access_token: str) -> Optional[Dict[str, Any]]:
+        """Async get_user_info over the pooled Google client.
+
+        Returns None for a rejected token; raises UpstreamUnavailable when
+        Google cannot be reached so callers can tell the two apart.
+        """
+        key = _cache_key('userinfo', access_token)
+        user_info = self.cache.get(key)
+        if user_info is not None:
+            return user_info
+        response = await upstream_request(
+            'google', 'GET', '/oauth2/v2/userinfo',
+            headers={"Authorization": f"Bearer {access_token}"},
+        )
+        if response.status_code >= 500:
+            raise UpstreamUnavailable('google', f'HTTP {response.status_code}')
+        return self._store_user_info(key, response)
+
+    async def averify_token(self, token: str) -> Optional[Dict[str, Any]]:
+        """Async verify_token over the pooled Google client."""
+        key = _cache_key('tokeninfo', token)
+        token_info = self.cache.get(key)
+        if token_info is not None:
+            return token_info
+        response = await upstream_request(
+            'google', 'GET', '/oauth2/v1/tokeninfo', params={"access_token": token},
+        )
+        if response.status_code >= 500:
+            raise UpstreamUnavailable('google', f'HTTP {response.status_code}')
+        return self._store_token_info(key, response)
+
+    def _get(self, path, **kwargs):
+        # Sync i async dziela jeden wylacznik obwodu dla Google
+        breaker = get_breaker('google')
+        if not breaker.allow():
+            raise UpstreamUnavailable('google', 'circuit open')
+        config = settings.OUTBOUND_HTTP['google']
+        try:
+            response = self.session.get(f"{config['base_url']}{path}", timeout=config['timeout'], **kwargs)
+        except requests.RequestException:
+            breaker.record_failure()
+            raise
+        if response.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return response
+
+    def _store_user_info(self, key, response):
+        if response.status_code != 200:
+            logger.error(f"Google API error: {response.status_code}")
+            return None
+        user_info = response.json()
+        self.cache.set(key, user_info)
+        return user_info
+
+    def _store_token_info(self, key, response):
+        if response.status_code != 200:
+            return None
+        token_info = response.json()
+        if token_info.get("audience") != self.client_id:
+            return None
+        ttl = self.cache.ttl
+        try:
+            ttl = min(ttl, int(token_info["expires_in"]))
+        except (KeyError, TypeError, ValueError):
+            pass
+        if ttl > 0:
+            self.cache.set(key, token_info, ttl=ttl)
+        return token_info
+
+
+def _cache_key(kind, token):
+    # Surowy token nigdy nie trafia do pamieci jako klucz
+    return f"{kind}:{hashlib.sha256(token.encode()).hexdigest()}"
+
+
+google_oauth_service = GoogleOAuthService()
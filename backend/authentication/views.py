@@ -4,7 +4,7 @@ from rest_framework.response import Response
 from rest_framework import status
 from django.contrib.auth import get_user_model
 from rest_framework_simplejwt.tokens import RefreshToken
-from .google_oauth import GoogleOAuthService
+from .google_oauth import google_oauth_service
 import logging
 
 User = get_user_model()
@@ -22,8 +22,7 @@ def google_auth(request):
         logger.error('No access token provided')
         return Response({'error': 'Access token is required'}, status=status.HTTP_400_BAD_REQUEST)
     
-    google_service = GoogleOAuthService()
-    user_info = google_service.get_user_info(access_token)
+    user_info = google_oauth_service.get_user_info(access_token)
     
     logger.info(f'Google user info received: {user_info}')
     
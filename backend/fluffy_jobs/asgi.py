@@ -1,5 +1,12 @@
-﻿import os
+﻿# Produkcyjnie: uvicorn/daphne fluffy_jobs.asgi:application - widoki Google i Stripe
+# sa async i pod ASGI nie blokuja workera na czas wywolania zewnetrznego API.
+import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fluffy_jobs.settings')
 application = get_asgi_application()
+
+from apps.integrations.http import keep_clients_alive  # noqa: E402 - po django.setup()
+
+# Jedna dlugo zyjaca petla na worker - pule polaczen do Google/Stripe zostaja otwarte
+keep_clients_alive()
@@ -0,0 +1,104 @@
+"""JSON renderer backed by orjson, with the stock DRF renderer as fallback.
+
+``FastJSONRenderer`` produces the same bytes as ``rest_framework``'s
+``JSONRenderer`` for compact output: ReturnDict/ReturnList, UUIDs, numpy
+values and datetimes (``Z`` for UTC) are encoded natively by orjson, while
+Decimal, lazy translation strings and the remaining types DRF knows about
+go through DRF's own encoder hook. When orjson is not installed, or the
+client asks for indented output (``Accept: application/json; indent=4``),
+rendering falls back to the stock renderer.
+
+``StreamingJSONResponse`` sends a large list in chunks of
+``JSON_STREAM_CHUNK_SIZE`` items, so the body is never held in memory as
+one string.
+"""
+from itertools import islice
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# U+2028 i U+2029 sa poprawnym JSON-em, ale nie JavaScriptem - DRF zawsze je escapuje
+_LINE_SEPARATORS = (('\u2028'.encode(), b'\\u2028'), ('\u2029'.encode(), b'\\u2029'))
+
+_encoder = JSONEncoder()
+
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_UTC_Z
+
+
+def chunk_size():
+    return getattr(settings, 'JSON_STREAM_CHUNK_SIZE', 500)
+
+
+def _default(obj):
+    # Decimal -> float jak w DRF (serializery i tak zamieniaja je na napisy), lazy str -> str
+    return _encoder.default(obj)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """Compact JSON through orjson when available, byte-compatible with ``JSONRenderer``."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if not self.uses_orjson() or self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        return self.dumps(data)
+
+    def uses_orjson(self):
+        # ensure_ascii i odstepy po przecinkach daje tylko json ze stdlib
+        return orjson is not None and self.compact and not self.ensure_ascii
+
+    def dumps(self, data):
+        if not self.uses_orjson():
+            return super().render(data)
+        try:
+            content = orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            # Np. liczby calkowite spoza 64 bitow - stdlib je obsluguje
+            return super().render(data)
+        if b'\xe2\x80' in content:
+            for raw, escaped in _LINE_SEPARATORS:
+                content = content.replace(raw, escaped)
+        return content
+
+    def render_chunks(self, data, stream_key=None, size=None):
+        """Yields the JSON of ``data`` in pieces; the list or iterator (``data`` or ``data[stream_key]``) ``size`` items at a time."""
+        size = size or chunk_size()
+        if stream_key is None:
+            yield from self._list_chunks(data, size)
+            return
+        yield b'{'
+        for index, (key, value) in enumerate(data.items()):
+            yield (b',' if index else b'') + self.dumps(str(key)) + b':'
+            if key == stream_key:
+                yield from self._list_chunks(value, size)
+            else:
+                yield self.dumps(value)
+        yield b'}'
+
+    def _list_chunks(self, items, size):
+        # Dowolny iterator (np. QuerySet.iterator()) - w pamieci jest tylko jedna paczka
+        items = iter(items)
+        yield b'['
+        separator = b''
+        while chunk := list(islice(items, size)):
+            # "[a,b]" -> "a,b"; kolejne paczki dopisuja przecinek przed soba
+            yield separator + self.dumps(chunk)[1:-1]
+            separator = b','
+        yield b']'
+
+
+class StreamingJSONResponse(StreamingHttpResponse):
+    """JSON body rendered lazily in chunks (see ``FastJSONRenderer.render_chunks``)."""
+
+    def __init__(self, data, stream_key=None, status=200, **kwargs):
+        kwargs.setdefault('content_type', FastJSONRenderer.media_type)
+        super().__init__(FastJSONRenderer().render_chunks(data, stream_key), status=status, **kwargs)
@@ -27,9 +27,13 @@ INSTALLED_APPS = [
     'apps.users',
     'apps.jobs',
     'apps.payments',
+    'apps.monitoring',
+    'apps.tasks',
+    'apps.analytics',
 ]
 
 MIDDLEWARE = [
+    'apps.monitoring.middleware.InstrumentationMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -67,6 +71,23 @@ DATABASES = {
     }
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Cache odpowiedzi publicznych endpointow ofert. Przy wielu workerach ustaw
+    # wspoldzielony backend, np. FileBasedCache albo DatabaseCache (createcachetable).
+    'jobs': {
+        'BACKEND': config('JOBS_CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('JOBS_CACHE_LOCATION', default='fluffy-jobs'),
+        'TIMEOUT': config('JOBS_CACHE_TIMEOUT', default=300, cast=int),
+        'OPTIONS': {
+            'MAX_ENTRIES': config('JOBS_CACHE_MAX_ENTRIES', default=5000, cast=int),
+        },
+    },
+}
+JOBS_CACHE_ALIAS = 'jobs'
+
 AUTH_USER_MODEL = 'users.User'
 
 AUTHENTICATION_BACKENDS = [
@@ -91,19 +112,65 @@ STATICFILES_DIRS = [
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# CV sa strumieniowane na dysk (apps.jobs.resumes); naglowek sendfile oddaje wysylke serwerowi www
+RESUME_MAX_UPLOAD_SIZE = config('RESUME_MAX_UPLOAD_SIZE', default=10 * 1024 * 1024, cast=int)
+RESUME_ALLOWED_EXTENSIONS = ['.pdf', '.doc', '.docx']
+RESUME_SENDFILE_HEADER = config('RESUME_SENDFILE_HEADER', default='')
+RESUME_SENDFILE_PREFIX = config('RESUME_SENDFILE_PREFIX', default='/protected/')
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.users.authentication.ClaimsJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # orjson, gdy jest zainstalowany; bez niego zwykly JSONRenderer (fluffy_jobs.renderers)
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'fluffy_jobs.renderers.FastJSONRenderer',
     ],
 }
+# Dlugie listy (np. /api/jobs/saved/ids/) wysylane strumieniowo paczkami po tyle elementow
+JSON_STREAM_CHUNK_SIZE = config('JSON_STREAM_CHUNK_SIZE', default=500, cast=int)
+
+JOBS_PAGE_SIZE = config('JOBS_PAGE_SIZE', default=20, cast=int)
+JOBS_MAX_PAGE_SIZE = config('JOBS_MAX_PAGE_SIZE', default=100, cast=int)
+JOBS_SAVED_STATE_MAX_IDS = config('JOBS_SAVED_STATE_MAX_IDS', default=2000, cast=int)
+# Wyswietlenia ofert buforowane w pamieci procesu i zapisywane paczkami (apps.jobs.counters)
+JOBS_VIEW_FLUSH_INTERVAL = config('JOBS_VIEW_FLUSH_INTERVAL', default=10, cast=int)
+JOBS_VIEW_FLUSH_MAX_PENDING = config('JOBS_VIEW_FLUSH_MAX_PENDING', default=1000, cast=int)
+# Podobne oferty (apps.jobs.similar): szerokosc haszowanych wektorow TF-IDF, dlugosc list
+# i okno, w ktorym zmiany ofert zbiera jedno przeliczenie
+JOBS_SIMILAR_DIMENSIONS = config('JOBS_SIMILAR_DIMENSIONS', default=1024, cast=int)
+JOBS_SIMILAR_TOP_K = config('JOBS_SIMILAR_TOP_K', default=10, cast=int)
+JOBS_SIMILAR_REFRESH_WINDOW = config('JOBS_SIMILAR_REFRESH_WINDOW', default=30, cast=int)
+# Gorna granica pamieci na wektory przy przeliczeniu (~8 KB na aktywna oferte przy 1024 wymiarach)
+JOBS_SIMILAR_MAX_MATRIX_MB = config('JOBS_SIMILAR_MAX_MATRIX_MB', default=2048, cast=int)
+# Spersonalizowany feed (apps.jobs.feed): profil z tylu ostatnich zapisow, dlugosc rankingu
+# i czas, po ktorym ranking uwzgledni nowe oferty (zapis/usuniecie zapisu uniewaznia od razu)
+JOBS_FEED_PROFILE_SAVES = config('JOBS_FEED_PROFILE_SAVES', default=500, cast=int)
+JOBS_FEED_SIZE = config('JOBS_FEED_SIZE', default=100, cast=int)
+JOBS_FEED_CACHE_TIMEOUT = config('JOBS_FEED_CACHE_TIMEOUT', default=600, cast=int)
+# Statystyki wynagrodzen (apps.jobs.insights) z kolumnowego snapshotu w pamieci procesu,
+# odswiezanego przyrostowo nie czesciej niz co tyle sekund
+JOBS_INSIGHTS_REFRESH_INTERVAL = config('JOBS_INSIGHTS_REFRESH_INTERVAL', default=60, cast=int)
+JOBS_INSIGHTS_MAX_GROUPS = 20
+# Wyszukiwanie w promieniu (?near=<miasto>&radius_km=) po punktach lokalnego gazetteera
+JOBS_GEO_DEFAULT_RADIUS_KM = config('JOBS_GEO_DEFAULT_RADIUS_KM', default=25, cast=float)
+JOBS_GEO_MAX_RADIUS_KM = config('JOBS_GEO_MAX_RADIUS_KM', default=500, cast=float)
+
+# Krotki cache wierszy uzytkownikow dla tokenow bez claimow i leniwie doczytywanych pol
+AUTH_USER_CACHE_TTL = config('AUTH_USER_CACHE_TTL', default=30, cast=int)
+AUTH_USER_CACHE_MAX_ENTRIES = config('AUTH_USER_CACHE_MAX_ENTRIES', default=10000, cast=int)
+
+# Metryki per request wystawiane pod /metrics (format Prometheusa)
+METRICS_ENABLED = config('METRICS_ENABLED', default=True, cast=bool)
+METRICS_SAMPLE_RATE = config('METRICS_SAMPLE_RATE', default=1.0, cast=float)
+METRICS_SLOW_REQUEST_MS = config('METRICS_SLOW_REQUEST_MS', default=500, cast=int)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+METRICS_ALLOWED_IPS = config('METRICS_ALLOWED_IPS', default='127.0.0.1,::1', cast=lambda v: [s.strip() for s in v.split(',')])
 
 from datetime import timedelta
 SIMPLE_JWT = {
@@ -120,6 +187,7 @@ SIMPLE_JWT = {
     'JWK_URL': None,
     'LEEWAY': 0,
     'AUTH_HEADER_TYPES': ('Bearer',),
+    'TOKEN_REFRESH_SERIALIZER': 'apps.users.tokens.ClaimsTokenRefreshSerializer',
     'AUTH_HEADER_NAME': 'HTTP_AUTHORIZATION',
     'USER_ID_FIELD': 'id',
     'USER_ID_CLAIM': 'user_id',
@@ -147,3 +215,53 @@ GOOGLE_CLIENT_SECRET = config('GOOGLE_CLIENT_SECRET', default='')
 STRIPE_PUBLISHABLE_KEY = config('STRIPE_PUBLISHABLE_KEY', default='')
 STRIPE_SECRET_KEY = config('STRIPE_SECRET_KEY', default='')
 STRIPE_TEST_MODE = config('STRIPE_TEST_MODE', default=True, cast=bool)
+STRIPE_WEBHOOK_SECRET = config('STRIPE_WEBHOOK_SECRET', default='')
+STRIPE_WEBHOOK_TOLERANCE = 300
+# Zdarzenia z webhookow sa przetwarzane paczkami: jedno zadanie na okno (s)
+STRIPE_EVENTS_BATCH_WINDOW = config('STRIPE_EVENTS_BATCH_WINDOW', default=1, cast=int)
+STRIPE_EVENTS_BATCH_SIZE = 500
+
+# Wywolania do zewnetrznych API (widoki async, serwowane przez fluffy_jobs.asgi).
+# max_connections to limit rownoleglych zapytan do danego API w workerze,
+# pool_timeout - ile czekamy na wolne polaczenie zanim zwrocimy 503.
+# retries/backoff dotycza tylko GET; po failure_threshold kolejnych bledach
+# obwod jest otwarty przez reset_timeout sekund.
+OUTBOUND_HTTP = {
+    'google': {
+        'base_url': config('GOOGLE_API_BASE', default='https://www.googleapis.com'),
+        'timeout': config('GOOGLE_API_TIMEOUT', default=5, cast=float),
+        'pool_timeout': 1,
+        'max_connections': config('GOOGLE_API_MAX_CONNECTIONS', default=20, cast=int),
+        'retries': 2,
+        'backoff': 0.2,
+        'failure_threshold': 5,
+        'reset_timeout': 30,
+    },
+    'stripe': {
+        'base_url': config('STRIPE_API_BASE', default='https://api.stripe.com'),
+        'timeout': config('STRIPE_API_TIMEOUT', default=10, cast=float),
+        'pool_timeout': 2,
+        'max_connections': config('STRIPE_API_MAX_CONNECTIONS', default=10, cast=int),
+        'failure_threshold': 5,
+        'reset_timeout': 30,
+    },
+}
+
+# Kolejka zadan w tle (apps.tasks, worker: manage.py run_worker).
+# Zadania cykliczne: klucz -> nazwa zadania i odstep w sekundach
+TASKS_PERIODIC = {
+    'prune-finished-tasks': {'task': 'tasks.prune_finished', 'interval': 24 * 60 * 60},
+    # Siatka bezpieczenstwa, gdyby zadanie z webhooka nie doszlo do skutku
+    'process-stripe-events': {'task': 'payments.process_stripe_events', 'interval': 60},
+    'refresh-analytics': {'task': 'analytics.refresh_rollups', 'interval': 5 * 60},
+    'refresh-similar-jobs': {'task': 'jobs.refresh_similar_jobs', 'interval': 15 * 60},
+}
+
+# Agregaty dashboardu pracodawcy czytaja zdarzenia starsze niz LAG sekund (transakcje w locie)
+ANALYTICS_ROLLUP_LAG = config('ANALYTICS_ROLLUP_LAG', default=5, cast=int)
+ANALYTICS_MAX_DAYS = 90
+
+# Wyniki userinfo/tokeninfo z Google trzymane pod hashem tokenu; odwolany token
+# dziala jeszcze najwyzej tyle sekund
+GOOGLE_TOKEN_CACHE_TTL = config('GOOGLE_TOKEN_CACHE_TTL', default=300, cast=int)
+GOOGLE_TOKEN_CACHE_MAX_ENTRIES = config('GOOGLE_TOKEN_CACHE_MAX_ENTRIES', default=10000, cast=int)
@@ -0,0 +1,41 @@
+"""Small in-process cache with per-entry expiry, shared by the apps."""
+import threading
+import time
+
+
+class TTLCache:
+    """Short-TTL, per-process key/value cache with a size cap.
+
+    Callers store plain values (field dicts, API responses), never model
+    instances, so a request mutating what it read cannot leak into another.
+    """
+
+    def __init__(self, ttl, max_entries):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                # Najpierw wygasle, a jesli to nie wystarczy - najstarsze wpisy
+                now = time.monotonic()
+                self._entries = {key: entry for key, entry in self._entries.items() if entry[0] >= now}
+                while len(self._entries) >= self.max_entries:
+                    self._entries.pop(next(iter(self._entries)))
+            self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
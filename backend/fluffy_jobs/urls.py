@@ -9,6 +9,8 @@ urlpatterns = [
     path('api/users/', include('apps.users.urls')),
     path('api/payments/', include('apps.payments.urls')),
     path('api/jobs/', include('apps.jobs.urls')),
+    path('api/analytics/', include('apps.analytics.urls')),
+    path('metrics', include('apps.monitoring.urls')),
 ]
 
 if settings.DEBUG:
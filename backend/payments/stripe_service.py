@@ -1,6 +1,7 @@
 ﻿import stripe
 from django.conf import settings
 from typing import Dict, Any
+from apps.payments.models import Payment
 import logging
 
 logger = logging.getLogger(__name__)
@@ -39,15 +40,14 @@ class StripeService:
     
     def confirm_payment(self, payment_intent_id: str) -> bool:
         """Potwierdza płatność"""
-        try:
-            intent = stripe.PaymentIntent.retrieve(payment_intent_id)
-            return intent.status == 'succeeded'
-        except stripe.error.StripeError as e:
-            logger.error(f"Payment confirmation error: {str(e)}")
-            return False
+        return self.get_payment_status(payment_intent_id) == 'succeeded'
     
     def get_payment_status(self, payment_intent_id: str) -> str:
         """Pobiera status płatności"""
+        # Stan z webhookow (apps.payments.webhooks); Stripe tylko gdy webhook jeszcze nie doszedl
+        local = Payment.objects.filter(payment_intent_id=payment_intent_id).values_list('status', flat=True).first()
+        if local is not None:
+            return local
         try:
             intent = stripe.PaymentIntent.retrieve(payment_intent_id)
             return intent.status
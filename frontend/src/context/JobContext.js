@@ -25,6 +25,7 @@ export const JobProvider = ({ children }) => {
 
   useEffect(() => {
     if (isAuthenticated && user) {
+      loadSavedJobIds();
       loadSavedJobs();
     } else {
       setSavedJobs([]);
@@ -32,10 +33,25 @@ export const JobProvider = ({ children }) => {
     }
   }, [isAuthenticated, user]);
 
+  const loadSavedJobIds = async () => {
+    try {
+      // Lekka lista id - stan zakladek na kartach bez czekania na pelna liste
+      const response = await savedJobsAPI.getSavedJobIds();
+      setSavedJobIds(new Set(response.data.ids));
+    } catch (error) {
+      console.error('Error loading saved job ids:', error);
+    }
+  };
+
   const loadSavedJobs = async () => {
     try {
-      const response = await savedJobsAPI.getSavedJobs();
-      const savedJobsData = response.data;
+      // Lista zapisanych jest stronicowana kursorem - pobierz wszystkie strony
+      let response = await savedJobsAPI.getSavedJobs();
+      const savedJobsData = [...response.data.results];
+      while (response.data.next) {
+        response = await savedJobsAPI.getSavedJobsPage(response.data.next);
+        savedJobsData.push(...response.data.results);
+      }
       setSavedJobs(savedJobsData);
       
       const savedIds = new Set(savedJobsData.map(savedJob => savedJob.job.id));
@@ -49,6 +49,7 @@ export const authAPI = {
 
 export const jobsAPI = {
   getJobs: (params) => api.get('/jobs/', { params }),
+  searchJobs: (query, params) => api.get('/jobs/', { params: { ...params, q: query } }),
   getJob: (id) => api.get('/jobs/' + id + '/'),
   createJob: (jobData) => api.post('/jobs/', jobData),
   updateJob: (id, jobData) => api.put('/jobs/' + id + '/', jobData),
@@ -66,9 +67,12 @@ export const paymentsAPI = {
 
 export const savedJobsAPI = {
   getSavedJobs: () => api.get('/jobs/saved/'),
+  getSavedJobsPage: (url) => api.get(url),
   saveJob: (jobId) => api.post('/jobs/save/', { job_id: jobId }),
   unsaveJob: (jobId) => api.delete('/jobs/' + jobId + '/unsave/'),
-  checkSavedJob: (jobId) => api.get('/jobs/' + jobId + '/check-saved/'),
+  // Stan zakladek wszystkich kart z jednej listy id (JobContext.isJobSaved) zamiast zapytania per karta;
+  // przegladarka sama rewaliduje odpowiedz przez ETag / If-None-Match
+  getSavedJobIds: () => api.get('/jobs/saved/ids/'),
 };
 
 export default api;